@@ -8,7 +8,13 @@ import asyncio
 import os
 
 # import build functions
-from ptn.missionalertbot.database.database import build_database_on_startup, populate_commodities_table_on_startup
+from ptn.missionalertbot.database.database import build_database_on_startup, populate_commodities_table_on_startup, close_database_executors, \
+    backup_scheduler
+from ptn.missionalertbot.modules.HttpClient import close_http_session
+from ptn.missionalertbot.modules.ImageRenderer import image_renderer
+from ptn.missionalertbot.modules.ActionScheduler import scheduler
+from ptn.missionalertbot.modules.ChannelPool import channel_pool
+from ptn.missionalertbot.modules.Outbox import outbox
 
 # import bot Cogs
 from ptn.missionalertbot.botcommands.GeneralCommands import GeneralCommands
@@ -18,7 +24,7 @@ from ptn.missionalertbot.botcommands.DatabaseInteraction import DatabaseInteract
 from ptn.missionalertbot.botcommands.StockTracker import StockTracker
 
 # import bot object, token, production status
-from ptn.missionalertbot.constants import bot, TOKEN, _production, DATA_DIR
+from ptn.missionalertbot.constants import bot, TOKEN, _production, DATA_DIR, close_reddit
 
 print(f"Data dir is {DATA_DIR} from {os.path.join(os.getcwd(), 'ptn', 'missionalertbot', DATA_DIR, '.env')}")
 
@@ -38,7 +44,17 @@ async def missionalertbot():
         await bot.add_cog(CTeamCommands(bot))
         await bot.add_cog(DatabaseInteraction(bot))
         await bot.add_cog(StockTracker(bot))
-        await bot.start(TOKEN)
+        try:
+            await bot.start(TOKEN)
+        finally:
+            await channel_pool.stop()
+            await scheduler.stop()
+            await outbox.stop()
+            await close_http_session()
+            await close_reddit()
+            close_database_executors()
+            backup_scheduler.close()
+            image_renderer.close()
 
 
 if __name__ == '__main__':
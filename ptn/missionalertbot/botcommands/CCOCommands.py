@@ -3,7 +3,7 @@ Commands for use by CCOs
 
 """
 # import libraries
-import aiohttp
+import copy
 import traceback
 from time import strftime
 from typing import Union
@@ -33,6 +33,7 @@ from ptn.missionalertbot.database.database import commodities_all, find_mission,
 from ptn.missionalertbot.modules.DateString import get_mission_delete_hammertime, get_inactive_hammertime
 from ptn.missionalertbot.modules.Embeds import role_granted_embed, confirm_remove_role_embed, role_already_embed, confirm_grant_role_embed, please_wait_embed
 from ptn.missionalertbot.modules.ErrorHandler import on_app_command_error, on_generic_error, GenericError, CustomError
+from ptn.missionalertbot.modules.HttpClient import get_http_session
 from ptn.missionalertbot.modules.helpers import convert_str_to_float_or_int, check_command_channel, check_roles, check_training_mode, flexible_carrier_search_term
 from ptn.missionalertbot.modules.ImageHandling import assign_carrier_image
 from ptn.missionalertbot.modules.MissionGenerator import confirm_send_mission_via_button
@@ -174,7 +175,7 @@ async def cco_mission_complete(interaction, carrier, is_complete, message):
             return
 
     try:
-        mission_data = find_mission(carrier_data.carrier_long_name, "carrier")
+        mission_data = await find_mission(carrier_data.carrier_long_name, "carrier")
         if not mission_data:
             try:
                 raise CustomError(f"Search term `{carrier}` resolved to **{carrier_data.carrier_long_name}** but this carrier does not appear to have an active mission.")
@@ -392,7 +393,7 @@ class CCOCommands(commands.Cog):
 
             # find mission data for carrier
             try:
-                mission_data = find_mission(carrier_data.carrier_long_name, 'Carrier')
+                mission_data = await find_mission(carrier_data.carrier_long_name, 'Carrier')
                 if not mission_data:
                     raise CustomError(f"No active mission found for {carrier_data.carrier_long_name} ({carrier_data.carrier_identifier}).")
             except CustomError as e:
@@ -401,8 +402,8 @@ class CCOCommands(commands.Cog):
             # define the original mission_params
             mission_params = mission_data.mission_params
 
-            original_commodity = mission_params.commodity_name
-            original_type = mission_params.mission_type
+            # keep the mission as it was, so the edit only updates what it changes
+            original_params = copy.copy(mission_params)
 
             print("defined original mission parameters")
             mission_params.print_values()
@@ -426,7 +427,7 @@ class CCOCommands(commands.Cog):
             print("Defined new_mission_params:")
             mission_params.print_values()
 
-        await edit_active_mission(interaction, mission_params, original_commodity, original_type)
+        await edit_active_mission(interaction, mission_params, original_params)
 
         """
         1. perform checks on profit, pads, commodity
@@ -606,7 +607,7 @@ class CCOCommands(commands.Cog):
 
         # first check the webhook URL and name aren't in the DB already
         print("Looking up existing webhook data...")
-        webhook_data = find_webhook_from_owner(interaction.user.id)
+        webhook_data = await find_webhook_from_owner(interaction.user.id)
         if webhook_data:
             for webhook in webhook_data:
                 try:
@@ -626,19 +627,16 @@ class CCOCommands(commands.Cog):
 
         # check the webhook is valid
         try:
-            async with aiohttp.ClientSession() as session:
-                webhook = Webhook.from_url(webhook_url, session=session, client=bot)
+            webhook = Webhook.from_url(webhook_url, session=await get_http_session(), client=bot)
 
-                embed = discord.Embed(
-                    description="Verifying webhook...",
-                    color=constants.EMBED_COLOUR_QU
-                )
-
-                webhook_sent = await webhook.send(embed=embed, username='Pilots Trade Network', avatar_url=bot.user.avatar.url, wait=True)
+            embed = discord.Embed(
+                description="Verifying webhook...",
+                color=constants.EMBED_COLOUR_QU
+            )
 
-                webhook_msg = await webhook.fetch_message(webhook_sent.id)
+            webhook_sent = await webhook.send(embed=embed, username='Pilots Trade Network', avatar_url=bot.user.avatar.url, wait=True)
 
-                await webhook_msg.delete()
+            await webhook.delete_message(webhook_sent.id)
 
         except Exception as e: # webhook could not be sent
             embed = discord.Embed(
@@ -696,7 +694,7 @@ class CCOCommands(commands.Cog):
     async def webhooks_view(self, interaction: discord.Interaction):
         print(f"webhook view called by {interaction.user.display_name}")
 
-        webhook_data = find_webhook_from_owner(interaction.user.id)
+        webhook_data = await find_webhook_from_owner(interaction.user.id)
         if not webhook_data: # no webhooks to show
             embed = discord.Embed(
                 description=f"No webhooks found. You can add webhooks using `/cco webhook add`",
@@ -727,7 +725,7 @@ class CCOCommands(commands.Cog):
         print(f"{interaction.user.display_name} called webhook delete for {webhook_name}")
 
         # find the webhook
-        webhook_data = find_webhook_by_name(interaction.user.id, webhook_name)
+        webhook_data = await find_webhook_by_name(interaction.user.id, webhook_name)
 
         if webhook_data:
             try:
@@ -794,10 +792,10 @@ class CCOCommands(commands.Cog):
 
                 fccode = carrier_data.carrier_identifier
 
-                capi_response = capi(fccode)
+                capi_response = await capi(fccode)
                 print(f"capi response: {capi_response.status_code}")
                 if capi_response.status_code != 200:
-                    r = oauth_new(fccode)
+                    r = await oauth_new(fccode)
                     oauth_response = r.json()
                     print(f"capi_enable response {r.status_code} - {oauth_response}")
                     if 'token' in oauth_response:
@@ -852,7 +850,7 @@ class CCOCommands(commands.Cog):
                 await _update_carrier_capi(carrier_data.pid, 1)
 
                 # check if the carrier is being tracked for WMM
-                wmm_data: WMMData = find_wmm_carrier(carrier_data.carrier_identifier, 'cid')
+                wmm_data: WMMData = await find_wmm_carrier(carrier_data.carrier_identifier, 'cid')
 
                 if wmm_data:
                     # update the WMM database
@@ -925,7 +923,7 @@ class CCOCommands(commands.Cog):
                     await _update_carrier_capi(carrier_data.pid, 0)
 
                     # check if the carrier is being tracked for WMM
-                    wmm_data: WMMData = find_wmm_carrier(carrier_data.carrier_identifier, 'cid')
+                    wmm_data: WMMData = await find_wmm_carrier(carrier_data.carrier_identifier, 'cid')
 
                     if wmm_data:
                         # update the WMM database
@@ -985,7 +983,7 @@ class CCOCommands(commands.Cog):
                 return await interaction.edit_original_response(embed=carrier_error_embed)
 
             # check if carrier is being tracked already
-            wmm_data: WMMData = find_wmm_carrier(carrier_data.carrier_identifier, 'cid')
+            wmm_data: WMMData = await find_wmm_carrier(carrier_data.carrier_identifier, 'cid')
 
             if wmm_data:
                 # carrier is already being tracked, notify user
@@ -1054,7 +1052,7 @@ class CCOCommands(commands.Cog):
                     continue
 
                 # check if carrier is being tracked already
-                wmm_data: WMMData = find_wmm_carrier(carrier_data.carrier_identifier, 'cid')
+                wmm_data: WMMData = await find_wmm_carrier(carrier_data.carrier_identifier, 'cid')
 
                 if not wmm_data:
                     # carrier is already being tracked, notify user
@@ -23,7 +23,7 @@ from ptn.missionalertbot.constants import bot, cmentor_role, admin_role, cc_role
     roleapps_channel, verified_role, fc_complete_emoji, event_organiser_role, advisor_role
 
 # import local modules
-from ptn.missionalertbot.database.database import carrier_db
+from ptn.missionalertbot.database.database import carrier_db_executor
 from ptn.missionalertbot.modules.ErrorHandler import on_app_command_error, GenericError, on_generic_error, CustomError
 from ptn.missionalertbot.modules.helpers import check_roles, _regex_alphanumeric_with_hyphens, _cc_owner_check, _cc_role_create_check, \
     _cc_create_channel, _cc_role_create, _cc_assign_permissions, _cc_db_enter, _remove_cc_role_from_owner, _cc_role_delete, _openclose_community_channel, \
@@ -425,16 +425,15 @@ class CTeamCommands(commands.Cog):
 
 
         # check if we're in a community channel
-        carrier_db.execute(f"SELECT * FROM community_carriers WHERE "
-                        f"channelid = {interaction.channel.id}")
-        community_carrier = CommunityCarrierData(carrier_db.fetchone())
+        community_carrier = CommunityCarrierData(await carrier_db_executor.query_one(
+            "SELECT * FROM community_carriers WHERE channelid = ?", (interaction.channel.id,)))
         # if not, we return a notice and then try the db purge action
         if not community_carrier:
             embed = discord.Embed(description=f"This does not appear to be a community channel. Running purge task instead.", color=constants.EMBED_COLOUR_ERROR)
             await interaction.response.send_message(embed=embed, ephemeral=True)
             # this purges database entries with invalid channel ids so users aren't stuck with ghost channels if e.g. it was manually deleted
-            carrier_db.execute(f"SELECT * FROM community_carriers")
-            community_carriers = [CommunityCarrierData(carrier) for carrier in carrier_db.fetchall()]
+            rows = await carrier_db_executor.query(f"SELECT * FROM community_carriers")
+            community_carriers = [CommunityCarrierData(carrier) for carrier in rows]
             for carrier in community_carriers:
                 if not bot.get_channel(carrier.channel_id):
                     print(f"Could not find channel for owner {carrier.owner_id}, deleting from db")
@@ -443,7 +442,7 @@ class CTeamCommands(commands.Cog):
                                                     f"\nDeleting associated channel role.", color=constants.EMBED_COLOUR_QU)
                     await interaction.followup.send(embed=embed, ephemeral=True)
                     try:
-                        carrier_db.execute(f"DELETE FROM community_carriers WHERE channelid = {carrier.channel_id}")
+                        await carrier_db_executor.execute("DELETE FROM community_carriers WHERE channelid = ?", (carrier.channel_id,))
                         owner = interaction.guild.get_member(carrier.owner_id)
                         embed = await _remove_cc_role_from_owner(interaction, owner) # this returns an embed but we'll only use it to pass into the next function
                         await _cc_role_delete(interaction, carrier.role_id, embed) # this returns an embed but we won't use it
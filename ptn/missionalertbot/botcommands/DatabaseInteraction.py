@@ -29,8 +29,8 @@ from ptn.missionalertbot.constants import bot, cmentor_role, admin_role, cteam_b
     admin_role, mod_role, bot_spam_channel, fc_complete_emoji, get_guild, channel_cco_general_chat, advisor_role
 
 # local modules
-from ptn.missionalertbot.database.database import find_nominee_with_id, carrier_db, CarrierDbFields, find_carrier, backup_database, \
-    add_carrier_to_database, find_carriers_mult, find_commodity, find_community_carrier, CCDbFields, wmm_db
+from ptn.missionalertbot.database.database import find_nominee_with_id, carrier_db_executor, CarrierDbFields, find_carrier, backup_database, \
+    add_carrier_to_database, find_carriers_mult, find_commodity, find_community_carrier, CCDbFields, wmm_db_executor
 from ptn.missionalertbot.modules.ErrorHandler import on_app_command_error, CustomError, on_generic_error, GenericError
 from ptn.missionalertbot.modules.helpers import check_roles, check_command_channel, _regex_alphanumeric_with_hyphens, extract_carrier_ident_strings, \
     _regex_alphanumeric_only
@@ -152,7 +152,7 @@ class DatabaseInteraction(commands.Cog):
         author = interaction.user
 
         # check whether user has any nominations
-        nominees_data = find_nominee_with_id(userid)
+        nominees_data = await find_nominee_with_id(userid)
         if not nominees_data:
             embed = discord.Embed(title="Failed: Remove Nominee from Database",
                                   description=f'No results for user with ID {userid}',
@@ -196,25 +196,25 @@ class DatabaseInteraction(commands.Cog):
         # we need to 1: get a list of unique pillars then 2: send only one instance of each unique pillar to nom_count_user
 
         # 1: get a list of unique pillars
-        carrier_db.execute(f"SELECT DISTINCT pillarid FROM nominees")
-        nominees_data = [NomineesData(nominees) for nominees in carrier_db.fetchall()]
+        rows = await carrier_db_executor.query(f"SELECT DISTINCT pillarid FROM nominees")
+        nominees_data = [NomineesData(nominees) for nominees in rows]
         for nominees in nominees_data:
             print(f"Iterating for {nominees.pillar_id}...")
 
             # 2: pass each unique pillar through to the counting function to retrieve the number of times they appear in the table
 
-            def nom_count_user(pillarid):
+            async def nom_count_user(pillarid):
                 """
                 Counts how many active nominations a nominee has.
                 """
-                nominees_data = find_nominee_with_id(pillarid)
+                nominees_data = await find_nominee_with_id(pillarid)
 
                 count = len(nominees_data)
                 print(f"{count} for {pillarid}")
 
                 return count
 
-            count = nom_count_user(nominees.pillar_id)
+            count = await nom_count_user(nominees.pillar_id)
             print(f"{nominees.pillar_id} has {count}")
 
             # only show those with a count >= the number the user specified
@@ -266,7 +266,7 @@ class DatabaseInteraction(commands.Cog):
 
         # look up specified user and return every entry for them as embed fields. TODO: This will break after too many nominations, would need to be paged.
         # if an empty list is returned, update the embed description and color
-        nominees_data = find_nominee_with_id(userid)
+        nominees_data = await find_nominee_with_id(userid)
         if nominees_data:
             for nominees in nominees_data:
                 try:
@@ -313,10 +313,10 @@ class DatabaseInteraction(commands.Cog):
 
             # get all carriers from database
             # TODO: paginate this for future-proofing
-            carrier_db.execute(f"""
+            rows = await carrier_db_executor.query(f"""
                 SELECT * from carriers
                                """)
-            carrier_data: CarrierData = [CarrierData(carrier) for carrier in carrier_db.fetchall()]
+            carrier_data: CarrierData = [CarrierData(carrier) for carrier in rows]
 
             # check if owner exists on server
             carrier: CarrierData
@@ -388,7 +388,7 @@ class DatabaseInteraction(commands.Cog):
             embed = _add_common_embed_fields(embed, carrier_data, interaction)
             return await interaction.response.send_message(embed=embed, ephemeral=True)
 
-        backup_database('carriers')  # backup the carriers database before going any further
+        await backup_database('carriers')  # backup the carriers database before going any further
 
         # now generate a string to use for the carrier's channel name based on its full (long) name
         stripped_name = _regex_alphanumeric_with_hyphens(full_name)
@@ -509,8 +509,8 @@ class DatabaseInteraction(commands.Cog):
 
         print(f'Carrier List requested by user: {ctx.author}')
 
-        carrier_db.execute(f"SELECT * FROM carriers")
-        carriers = [CarrierData(carrier) for carrier in carrier_db.fetchall()]
+        rows = await carrier_db_executor.query(f"SELECT * FROM carriers")
+        carriers = [CarrierData(carrier) for carrier in rows]
 
         def chunk(chunk_list, max_size=10):
             """
@@ -628,8 +628,8 @@ class DatabaseInteraction(commands.Cog):
 
         print(f'WMM list requested by user: {ctx.author}')
 
-        wmm_db.execute(f"SELECT * FROM wmm")
-        carriers = [WMMData(carrier) for carrier in wmm_db.fetchall()]
+        rows = await wmm_db_executor.query(f"SELECT * FROM wmm")
+        carriers = [WMMData(carrier) for carrier in rows]
 
         carrier: WMMData
 
@@ -969,9 +969,8 @@ class DatabaseInteraction(commands.Cog):
         msg_channel_id = interaction.channel.id
 
         # look for a match for the ID in the community carrier database
-        carrier_db.execute(f"SELECT * FROM community_carriers WHERE "
-                        f"channelid = {msg_channel_id}")
-        community_carrier_data = CommunityCarrierData(carrier_db.fetchone())
+        community_carrier_data = CommunityCarrierData(await carrier_db_executor.query_one(
+            "SELECT * FROM community_carriers WHERE channelid = ?", (msg_channel_id,)))
 
         if community_carrier_data:
             embed = discord.Embed(title="COMMUNITY CHANNEL",
@@ -984,9 +983,8 @@ class DatabaseInteraction(commands.Cog):
             return # if it was a Community Carrier, we're done and gone. Otherwise we keep looking.
 
         # now look for a match for the channel name in the carrier DB
-        carrier_db.execute(f"SELECT * FROM carriers WHERE "
-                        f"discordchannel = '{msg_channel_name}' ;")
-        carrier_data = CarrierData(carrier_db.fetchone())
+        carrier_data = CarrierData(await carrier_db_executor.query_one(
+            "SELECT * FROM carriers WHERE discordchannel = ?", (msg_channel_name,)))
 
         if not carrier_data.discord_channel:
             print(f"/info failed, {interaction.channel} doesn't seem to be a carrier channel")
@@ -1047,8 +1045,8 @@ class DatabaseInteraction(commands.Cog):
     @commands.has_any_role(cmentor_role(), admin_role())
     async def cc_list(self, ctx):
 
-        carrier_db.execute(f"SELECT * FROM community_carriers")
-        community_carriers = [CommunityCarrierData(carrier) for carrier in carrier_db.fetchall()]
+        rows = await carrier_db_executor.query(f"SELECT * FROM community_carriers")
+        community_carriers = [CommunityCarrierData(carrier) for carrier in rows]
 
         def chunk(chunk_list, max_size=10):
             """
@@ -1165,7 +1163,7 @@ class DatabaseInteraction(commands.Cog):
     @commands.has_any_role(cmentor_role(), admin_role())
     async def cc_owner(self, ctx, owner: discord.Member):
 
-        community_carrier_data = find_community_carrier(owner.id, CCDbFields.ownerid.name)
+        community_carrier_data = await find_community_carrier(owner.id, CCDbFields.ownerid.name)
         if community_carrier_data:
             # TODO: this should be fetchone() not fetchall but I can't make it work otherwise
             for community_carrier in community_carrier_data:
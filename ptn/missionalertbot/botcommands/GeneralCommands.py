@@ -12,6 +12,7 @@ import traceback
 # discord.py
 import discord
 from discord.app_commands import Group, describe, Choice
+from discord.errors import NotFound
 from discord.ext import commands
 from discord import app_commands
 
@@ -27,15 +28,20 @@ from ptn.missionalertbot.constants import bot, bot_command_channel, bot_dev_chan
 
 # local modules
 from ptn.missionalertbot.database.database import backup_database, find_carrier, find_mission, _is_carrier_channel, \
-    mission_db, carrier_db, carrier_db_lock, carriers_conn, find_nominator_with_id, delete_nominee_by_nominator, find_community_carrier, \
-    CCDbFields, find_opt_ins, Settings, print_settings_file
+    mission_db_executor, carrier_db_executor, find_nominator_with_id, delete_nominee_by_nominator, find_community_carrier, \
+    CCDbFields, find_opt_ins, Settings, print_settings_file, missions_summary_columns
 from ptn.missionalertbot.modules.Embeds import _is_mission_active_embed, _format_missions_embed, please_wait_embed
 from ptn.missionalertbot.modules.ErrorHandler import on_app_command_error, GenericError, CustomError, on_generic_error
 from ptn.missionalertbot.modules.helpers import bot_exit, check_roles, check_command_channel, unlock_mission_channel, lock_mission_channel, \
-    check_mission_channel_lock, list_active_locks
-from ptn.missionalertbot.modules.BackgroundTasks import lasttrade_cron, _monitor_reddit_comments, start_wmm_task, wmm_stock
+    check_mission_channel_lock, list_active_locks, channel_locks
+from ptn.missionalertbot.modules.BackgroundTasks import lasttrade_cron, _monitor_reddit_comments, start_wmm_task, wmm_stock, wal_checkpoint_task
 from ptn.missionalertbot.modules.MissionCleaner import check_trade_channels_on_startup
+from ptn.missionalertbot.modules.ActionScheduler import scheduler
+from ptn.missionalertbot.modules.ChannelIndex import channel_index
+from ptn.missionalertbot.modules.ChannelPool import channel_pool
+from ptn.missionalertbot.modules.Outbox import outbox
 from ptn.missionalertbot.modules.DateString import get_inactive_hammertime, get_formatted_date_string
+from ptn.missionalertbot.modules.StockHelpers import market_cache
 
 
 """
@@ -80,6 +86,7 @@ ping - admin
 /admin list_optins - admin/cco
 /admin lock release - admin/missions
 /admin lock acquire - admin/missions
+/admin lock list - admin/missions
 
 GENERAL - USER-FACING
 ission - mission
@@ -122,6 +129,8 @@ class GeneralCommands(commands.Cog):
     async def on_ready(self):
         # TODO: this should be moved to an on_setup hook
         print(f'{bot.user.name} version: {__version__} has connected to Discord!')
+        # index mission channels by name, the channel events below keep it up to date
+        channel_index.build()
         devchannel = bot.get_channel(bot_dev_channel())
         embed = discord.Embed(title="MISSION ALERT BOT ONLINE", description=f"<@{bot.user.id}> connected, version **{__version__}**.", color=constants.EMBED_COLOUR_OK)
         embed.set_image(url=random.choice(constants.hello_gifs))
@@ -130,6 +139,16 @@ class GeneralCommands(commands.Cog):
         # start the lasttrade_cron loop if not running
         if not lasttrade_cron.is_running():
             lasttrade_cron.start()
+        # start the WAL checkpoint loop if not running
+        if not wal_checkpoint_task.is_running():
+            wal_checkpoint_task.change_interval(seconds=int(constants.db_wal_checkpoint_interval))
+            wal_checkpoint_task.start()
+        # start sending the outbox, this does nothing if it's already running
+        outbox.start()
+        # start running scheduled actions such as channel deletions, resuming any from before a restart
+        scheduler.start()
+        # keep spare mission channels ready, if settings.txt asks for any
+        channel_pool.start()
         # start monitoring reddit comments if not running
         if not _monitor_reddit_comments.is_running():
             _monitor_reddit_comments.start()
@@ -150,18 +169,35 @@ class GeneralCommands(commands.Cog):
         print(f'Mission Alert Bot has disconnected from discord server, version: {__version__}.')
 
 
+    # channel listeners, to keep our index of mission channels up to date
+    @commands.Cog.listener()
+    async def on_guild_channel_create(self, channel):
+        channel_index.add(channel)
+
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel):
+        channel_index.remove(channel)
+
+
+    @commands.Cog.listener()
+    async def on_guild_channel_update(self, before, after):
+        channel_index.update(before, after)
+
+
     # pin listener
     @commands.Cog.listener()
-    async def on_guild_channel_pins_update(self, channel, last_pin):
-        print("on_guild_channel_pins_update triggered")
+    async def on_message(self, message: discord.Message):
         """
-        Delete the system message informing you a message was pinned in this channel
+        Delete the system message informing you a message was pinned in this channel, as it arrives
         Watches every public channel in the guild (discord)
         """
-        async for msg in channel.history(limit=200):
-            if msg.type is discord.MessageType.pins_add and msg.author == bot.user:
-                print(f"Detected bot pin notification message in {channel.name}, deleting")
-                await msg.delete()
+        if message.type is discord.MessageType.pins_add and message.author == bot.user:
+            print(f"Detected bot pin notification message in {message.channel.name}, deleting")
+            try:
+                await message.delete()
+            except NotFound:
+                pass # someone beat us to it
 
 
     """
@@ -250,7 +286,8 @@ class GeneralCommands(commands.Cog):
         )
     @app_commands.choices(setting = [
         Choice(name='WMM Auto Start', value='wmm_autostart'),
-        Choice(name='Stock Command ID', value='commandid_stock')
+        Choice(name='Stock Command ID', value='commandid_stock'),
+        Choice(name='Channel Pool Size', value='channel_pool_size')
     ])
     @check_roles(admin_roles)
     @check_command_channel(bot_command_channel())
@@ -270,7 +307,7 @@ class GeneralCommands(commands.Cog):
                 else:
                     value = value.title()
 
-            elif setting.value == 'commandid_stock':
+            elif setting.value in ['commandid_stock', 'channel_pool_size']:
                 try:
                     value = int(value)
                 except ValueError:
@@ -292,6 +329,8 @@ class GeneralCommands(commands.Cog):
             # apply to our global values
             constants.wmm_autostart = settings.wmm_autostart
             constants.commandid_stock = settings.commandid_stock
+            constants.channel_pool_size = settings.channel_pool_size
+            channel_pool.wake() # grow or shrink the pool to its new size
 
 
             print("reading new values")
@@ -331,10 +370,11 @@ class GeneralCommands(commands.Cog):
 
         else:
             try:
+                holder = channel_locks.holder(channelname)
                 await unlock_mission_channel(channelname)
                 print("Channel lock released")
                 embed = discord.Embed(
-                    description=f"🔓🔑 Forced release of channel lock for `{channelname}`",
+                    description=f"🔓🔑 Forced release of channel lock for `{channelname}` held by {holder}",
                     color=constants.EMBED_COLOUR_OK
                 )
                 spamchannel = bot.get_channel(bot_spam_channel())
@@ -368,10 +408,11 @@ class GeneralCommands(commands.Cog):
 
         else:
             try:
-                await lock_mission_channel(channelname)
+                # no lease: a manual lock stays until it's manually released
+                await lock_mission_channel(channelname, f"manual lock by <@{interaction.user.id}>", 'admin', timeout=5, lease=None)
                 print("Channel lock acquired")
                 embed = discord.Embed(
-                    description=f"🔐 Acquired forced lock for `{channelname}`. `/admin_release_channel_lock {channelname}` **MUST** be used for the mission channel to become available to <@{bot.user.id}>",
+                    description=f"🔐 Acquired forced lock for `{channelname}`. `/admin lock release {channelname}` **MUST** be used for the mission channel to become available to <@{bot.user.id}>",
                     color=constants.EMBED_COLOUR_OK
                 )
                 spamchannel = bot.get_channel(bot_spam_channel())
@@ -389,13 +430,12 @@ class GeneralCommands(commands.Cog):
     @lock_group.command(name='list', description='Display a list of all currently locked channels.')
     @check_roles(admin_roles)
     @check_command_channel(bot_command_channel())
-    async def admin_acquire_channel_lock(self, interaction: discord.Interaction):
+    async def admin_list_channel_locks(self, interaction: discord.Interaction):
         print(f"🔐 admin_list_channel_locks called by {interaction.user}")
-        locked_channels = {}
-        locked_channels = list_active_locks()
+        locks = list_active_locks()
 
         # Populate the embed with the locked channels
-        if not locked_channels:
+        if not locks:
             embed = discord.Embed(
                 description="🔓 No channels are currently locked.",
                 color=constants.EMBED_COLOUR_OK
@@ -404,14 +444,32 @@ class GeneralCommands(commands.Cog):
         else:
             embed = discord.Embed(
                 title="🔐 LOCKED CHANNELS",
-                description=f"⚠ <@{bot.user.id}> uses an `asyncio.Lock()` function to ensure bot actions affecting channels take place **in order** and **one at a time**. "
+                description=f"⚠ <@{bot.user.id}> locks channels to ensure bot actions affecting them take place **in order** and **one at a time**. "
                             "This prevents, e.g., a channel for a completed mission being deleted while a new mission is being created for that channel. "
                             "Channel locks rarely last more than a few seconds and should **only** be manually released if mission generation/completion is being "
-                            "improperly obstructed by an erroneously unreleased lock.",
+                            f"improperly obstructed by an erroneously unreleased lock. Locks are released automatically after {constants.CHANNEL_LOCK_LEASE} seconds "
+                            "unless they were acquired manually.",
                 color=constants.EMBED_COLOUR_WARNING
             )
-            for channel in locked_channels:
-                embed.add_field(name="Currently Locked:", value=f"`{channel}`", inline=False)
+            for lock in locks[:20]: # stay inside Discord's field limit
+                if lock.held:
+                    value = f"Held by {lock.owner} since <t:{int(lock.acquired_at)}:R>\n"
+                    value += f"Lease expires <t:{int(lock.lease_expires_at)}:R>" if lock.lease_expires_at else "No lease: must be released manually"
+                else:
+                    value = "Being handed to the next in queue"
+                for position, waiter in enumerate(lock.waiters, 1):
+                    value += f"\n{position}. {waiter.owner}, waiting since <t:{int(waiter.queued_at)}:R>"
+                embed.add_field(name=f"`{lock.channel}`", value=value[:1024], inline=False)
+
+        # how long locks have taken to get hold of since startup
+        buckets = [f"≤{bound}s" for bound in channel_locks.wait_buckets] + [f">{channel_locks.wait_buckets[-1]}s"]
+        for purpose, counts in channel_locks.wait_times.items():
+            value = " | ".join(f"{bucket}: {count}" for bucket, count in zip(buckets, counts))
+            if channel_locks.timeouts.get(purpose):
+                value += f"\nGave up waiting: {channel_locks.timeouts[purpose]}"
+            embed.add_field(name=f"⏱ Wait times: {purpose}", value=value, inline=False)
+        if channel_locks.expiries:
+            embed.add_field(name="⌛ Leases expired", value=str(channel_locks.expiries), inline=False)
 
         await interaction.response.send_message(embed=embed)
 
@@ -444,8 +502,8 @@ class GeneralCommands(commands.Cog):
     async def backup(self, interaction: discord.Interaction):
         print(f"{interaction.user} requested a manual DB backup")
         try:
-            backup_database('missions')
-            backup_database('carriers')
+            await backup_database('missions', wait=True)
+            await backup_database('carriers', wait=True)
         except Exception as e:
             error = f"Database backup failed: {e}"
             try:
@@ -468,7 +526,7 @@ class GeneralCommands(commands.Cog):
     @check_command_channel(bot_command_channel())
     async def admin_delete_mission(self, interaction: discord.Interaction, carrier: str):
         print(f"admin_delete_mission called by {interaction.user.display_name} ({interaction.user.id})")
-        mission_data = find_mission(carrier, "carrier")
+        mission_data = await find_mission(carrier, "carrier")
         if not mission_data:
             embed = discord.Embed(
                 description=f"❌ No trade missions found for carriers matching \"**{carrier}\"**.",
@@ -567,7 +625,9 @@ class GeneralCommands(commands.Cog):
                     title="WMM STOCK TRACKER STATUS",
                     description=f"✅ WMM background task is running.\n:chart_with_upwards_trend: Last check: {last_hammertime}."
                                 f"\n:hourglass_flowing_sand: Next scheduled check {next_hammertime}."
-                                f"\n:timer: Current check interval: {int(constants.wmm_interval/60)} minutes.",
+                                f"\n:timer: Current check interval: {int(constants.wmm_interval/60)} minutes."
+                                f"\n:floppy_disk: Market data cache: {market_cache.hit_rate():.0%} hit rate "
+                                f"({market_cache.hits} hits, {market_cache.misses} misses, {len(market_cache.entries)} carriers cached).",
                     color=constants.EMBED_COLOUR_OK
                 )
                 embed.set_footer(text="/cco wmm update can trigger updates outwith the above schedule.")
@@ -826,12 +886,12 @@ class GeneralCommands(commands.Cog):
         print(f'User has roles: {ctx.author.roles}')
 
         print(f'Generating full unloading mission list requested by: {ctx.author}')
-        mission_db.execute('''SELECT * FROM missions WHERE missiontype="unload";''')
-        unload_records = [MissionData(mission_data) for mission_data in mission_db.fetchall()]
+        rows = await mission_db_executor.query(f'''SELECT {missions_summary_columns} FROM missions WHERE missiontype="unload";''')
+        unload_records = [MissionData(mission_data) for mission_data in rows]
 
-        mission_db.execute('''SELECT * FROM missions WHERE missiontype="load";''')
+        rows = await mission_db_executor.query(f'''SELECT {missions_summary_columns} FROM missions WHERE missiontype="load";''')
         print(f'Generating full loading mission list requested by: {ctx.author}')
-        load_records = [MissionData(mission_data) for mission_data in mission_db.fetchall()]
+        load_records = [MissionData(mission_data) for mission_data in rows]
 
         # If used by a non-carrier owner, link the total mission count and point to trade alerts.
         if co_role not in ctx.author.roles:
@@ -872,12 +932,12 @@ class GeneralCommands(commands.Cog):
         print(f'User {interaction.user} asked for all active missions via /missions in {interaction.channel}.')
 
         print(f'Generating full unloading mission list requested by: {interaction.user}')
-        mission_db.execute('''SELECT * FROM missions WHERE missiontype="unload";''')
-        unload_records = [MissionData(mission_data) for mission_data in mission_db.fetchall()]
+        rows = await mission_db_executor.query(f'''SELECT {missions_summary_columns} FROM missions WHERE missiontype="unload";''')
+        unload_records = [MissionData(mission_data) for mission_data in rows]
 
-        mission_db.execute('''SELECT * FROM missions WHERE missiontype="load";''')
+        rows = await mission_db_executor.query(f'''SELECT {missions_summary_columns} FROM missions WHERE missiontype="load";''')
         print(f'Generating full loading mission list requested by: {interaction.user}')
-        load_records = [MissionData(mission_data) for mission_data in mission_db.fetchall()]
+        load_records = [MissionData(mission_data) for mission_data in rows]
 
         trade_channel = bot.get_channel(trade_alerts_channel())
         number_of_missions = len(load_records) + len(unload_records)
@@ -927,7 +987,7 @@ class GeneralCommands(commands.Cog):
 
         # now look to see if the carrier is on an active mission
         print("Looking for mission by channel ID match")
-        mission_data = find_mission(interaction.channel.id, "channelid")
+        mission_data = await find_mission(interaction.channel.id, "channelid")
         if not mission_data:
             # if there's no result, return an error
             embed = discord.Embed(
@@ -975,7 +1035,7 @@ class GeneralCommands(commands.Cog):
         spamchannel = bot.get_channel(bot_spam_channel())
 
         # first check this user has not already nominated the same person
-        nominees_data = find_nominator_with_id(interaction.user.id)
+        nominees_data = await find_nominator_with_id(interaction.user.id)
         if nominees_data:
             for nominees in nominees_data:
                 if nominees.pillar_id == user.id:
@@ -989,18 +1049,9 @@ class GeneralCommands(commands.Cog):
 
         # enter nomination into nominees db
         try:
-            print("Locking carrier db...")
-            await carrier_db_lock.acquire()
-            print("Carrier DB locked.")
-            try:
-                carrier_db.execute(''' INSERT INTO nominees VALUES(?, ?, ?) ''',
-                                (interaction.user.id, user.id, reason))
-                carriers_conn.commit()
-                print("Registered nomination to database")
-            finally:
-                print("Unlocking carrier db...")
-                carrier_db_lock.release()
-                print("Carrier DB unlocked.")
+            await carrier_db_executor.execute(''' INSERT INTO nominees VALUES(?, ?, ?) ''',
+                                              (interaction.user.id, user.id, reason))
+            print("Registered nomination to database")
         except Exception as e:
             await interaction.response.send_message("Sorry, something went wrong and developers have been notified.", ephemeral=True)
             # notify in bot_spam
@@ -1026,7 +1077,7 @@ class GeneralCommands(commands.Cog):
         print(f"{interaction.user} wants to un-nominate {user}")
 
         # find the nomination
-        nominees_data = find_nominator_with_id(interaction.user.id)
+        nominees_data = await find_nominator_with_id(interaction.user.id)
         if nominees_data:
             for nominees in nominees_data:
                 if nominees.pillar_id == user.id:
@@ -1059,7 +1110,7 @@ class GeneralCommands(commands.Cog):
         spamchannel = bot.get_channel(bot_spam_channel())
 
         # look for a match for the channel ID in the community carrier DB
-        community_carrier_data = find_community_carrier(msg_channel_id, CCDbFields.channelid.name)
+        community_carrier_data = await find_community_carrier(msg_channel_id, CCDbFields.channelid.name)
 
         if not community_carrier_data:
             # if there's no channel match, return an error
@@ -10,7 +10,6 @@ Stock tracker original code by DudeInCorner and Durzo
 import asyncio
 import json
 import re
-import requests
 from texttable import Texttable # TODO: remove this dependency
 import traceback
 
@@ -105,7 +104,7 @@ class StockTracker(commands.Cog):
 
             # decide what to say about EDMC in the response footer
             edmc_string = "Run EDMC for more accurate and up-to-date stock information."
-            mission_data = find_mission(carrier_data.carrier_long_name, "carrier")
+            mission_data = await find_mission(carrier_data.carrier_long_name, "carrier")
             if mission_data:
                 print(f"{carrier_data.carrier_long_name} is on a mission: {mission_data}")
                 mission_params: MissionParams = mission_data.mission_params
@@ -116,7 +115,7 @@ class StockTracker(commands.Cog):
             fcname = carrier_data.carrier_long_name
 
             try:
-                stn_data = get_fc_stock(carrier_data.carrier_identifier, source)
+                stn_data = await get_fc_stock(carrier_data.carrier_identifier, source)
                 print("Returned data from %s: %s" % ( carrier_data.carrier_identifier, stn_data ))
             except Exception as e:
                 try:
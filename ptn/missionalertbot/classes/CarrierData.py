@@ -35,6 +35,25 @@ class CarrierData:
                 response[key] = value
         return response
 
+    def to_row(self):
+        """
+        Formats the carrier data into a dictionary keyed by carriers table column, so CarrierData(to_row()) recreates it.
+
+        :returns: A dictionary of column names and values.
+        :rtype: dict
+        """
+        return {
+            'longname': self.carrier_long_name,
+            'shortname': self.carrier_short_name,
+            'cid': self.carrier_identifier,
+            'discordchannel': self.discord_channel,
+            'channelid': self.channel_id,
+            'ownerid': self.ownerid,
+            'lasttrade': self.lasttrade,
+            'p_ID': self.pid,
+            'capi': self.capi
+        }
+
     def __str__(self):
         """
         Overloads str to return a readable object
@@ -0,0 +1,146 @@
+# import libraries
+from collections import defaultdict
+import copy
+
+# import local classes
+from ptn.missionalertbot.classes.CarrierData import CarrierData
+
+
+class CarrierRegistry:
+
+    # carriers table columns we index, mapped to their CarrierData attribute
+    indexed_fields = {
+        'p_id': 'pid',
+        'cid': 'carrier_identifier',
+        'shortname': 'carrier_short_name',
+        'discordchannel': 'discord_channel',
+        'channelid': 'channel_id',
+        'ownerid': 'ownerid',
+        'longname': 'carrier_long_name'
+    }
+
+    # text columns where, like SQL LIKE '%term%', a fragment can match if there's no exact match
+    fragment_fields = ['longname', 'shortname', 'cid', 'discordchannel']
+
+    # carriers table columns we don't index, mapped to their CarrierData attribute; searched like SQL LIKE '%term%'
+    # by checking every carrier, as they're rarely searched on
+    scanned_fields = {
+        'lasttrade': 'lasttrade',
+        'capi': 'capi'
+    }
+
+    def __init__(self):
+        """
+        Class represents an in-memory copy of the carriers table with indexed lookups.
+
+        Every indexed field has an exact-match hash index, and longname also has a trigram index
+        so name fragments can be found without scanning every carrier.
+        Keys are case-insensitive to match SQLite's LIKE.
+        """
+        self.loaded = False
+        self.carriers = {} # pid: CarrierData
+        self.indexes = {field: defaultdict(set) for field in self.indexed_fields} # field: {key: {pid, ...}}
+        self.trigrams = defaultdict(set) # trigram: {pid, ...} for longname
+
+
+    @staticmethod
+    def _key(value):
+        return str(value).lower()
+
+
+    @staticmethod
+    def _trigrams(text):
+        text = text.lower()
+        return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+    def load(self, carriers):
+        """
+        Replace the registry contents with the given carriers.
+
+        :param list[CarrierData] carriers: Every carrier in the carriers table
+        """
+        self.carriers = {}
+        self.indexes = {field: defaultdict(set) for field in self.indexed_fields}
+        self.trigrams = defaultdict(set)
+        for carrier_data in carriers:
+            self.add(carrier_data)
+        self.loaded = True
+        print(f"Carrier registry loaded with {len(self.carriers)} carriers")
+
+
+    def add(self, carrier_data: CarrierData):
+        """
+        Add or replace a carrier in the registry.
+        """
+        if carrier_data.pid in self.carriers:
+            self.remove(carrier_data.pid)
+        self.carriers[carrier_data.pid] = carrier_data
+        for field, attribute in self.indexed_fields.items():
+            value = getattr(carrier_data, attribute)
+            if value is not None:
+                self.indexes[field][self._key(value)].add(carrier_data.pid)
+        for trigram in self._trigrams(carrier_data.carrier_long_name or ''):
+            self.trigrams[trigram].add(carrier_data.pid)
+
+
+    def remove(self, pid):
+        """
+        Remove a carrier from the registry by its database entry ID.
+        """
+        carrier_data = self.carriers.pop(pid, None)
+        if not carrier_data:
+            return
+        for field, attribute in self.indexed_fields.items():
+            value = getattr(carrier_data, attribute)
+            if value is None:
+                continue
+            key = self._key(value)
+            self.indexes[field][key].discard(pid)
+            if not self.indexes[field][key]:
+                del self.indexes[field][key]
+        for trigram in self._trigrams(carrier_data.carrier_long_name or ''):
+            self.trigrams[trigram].discard(pid)
+            if not self.trigrams[trigram]:
+                del self.trigrams[trigram]
+
+
+    def _fragment_matches(self, field, term):
+        attribute = self.indexed_fields[field]
+        if field == 'longname' and len(term) >= 3:
+            # narrow down to carriers containing every trigram of the term, then confirm the match
+            candidates = set.intersection(*[self.trigrams.get(trigram, set()) for trigram in self._trigrams(term)])
+        else:
+            candidates = self.carriers.keys()
+        return {pid for pid in candidates if term in self._key(getattr(self.carriers[pid], attribute) or '')}
+
+
+    def search(self, searchterm, searchfield):
+        """
+        Find carriers matching a search term in the given field.
+
+        Exact matches are returned if there are any. Otherwise text fields fall back to fragment matching.
+        Columns we don't index are fragment matched by checking every carrier.
+
+        :param searchterm: Search term to match
+        :param str searchfield: carriers table column to match against
+        :returns: Copies of matching carriers, ordered by database entry ID
+        :rtype: list[CarrierData]
+        """
+        field = searchfield.lower()
+        term = self._key(searchterm)
+        if field in self.scanned_fields:
+            attribute = self.scanned_fields[field]
+            # NULLs never match LIKE
+            pids = {pid for pid, carrier_data in self.carriers.items()
+                    if getattr(carrier_data, attribute) is not None and term in self._key(getattr(carrier_data, attribute))}
+            return [copy.copy(self.carriers[pid]) for pid in sorted(pids)]
+        pids = self.indexes[field].get(term)
+        if not pids and field in self.fragment_fields:
+            pids = self._fragment_matches(field, term)
+        # return copies so callers can't change our records by editing what they're given
+        return [copy.copy(self.carriers[pid]) for pid in sorted(pids or [])]
+
+
+    def __len__(self):
+        return len(self.carriers)
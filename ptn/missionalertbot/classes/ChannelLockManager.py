@@ -0,0 +1,207 @@
+# import libraries
+import asyncio
+from collections import deque
+import time
+
+
+class ChannelLock:
+
+    def __init__(self, channel):
+        """
+        Class represents the lock on one mission channel name: who holds it, since when, and who's queued for it.
+
+        :param str channel: The channel name
+        """
+        self.channel = channel
+        self.owner = None # description of the holder, e.g. "mission generation for P.T.N. Carrier"
+        self.purpose = None # what the holder is doing, used to group wait times
+        self.acquired_at = None # unix timestamp the holder got the lock
+        self.lease_expires_at = None # unix timestamp the lock is released automatically, None for no lease
+        self.waiters = deque() # ChannelLockWaiter, in order of arrival
+        self._expiry = None # asyncio.TimerHandle of the lease
+
+    @property
+    def held(self):
+        return self.owner is not None
+
+
+class ChannelLockWaiter:
+
+    def __init__(self, owner, purpose, lease, future):
+        """
+        Class represents a task queued for a channel lock.
+
+        :param str owner: Description of the task
+        :param str purpose: What the task is doing
+        :param float lease: Seconds the task may hold the lock, None for no lease
+        :param asyncio.Future future: Resolved when the lock is handed to the task
+        """
+        self.owner = owner
+        self.purpose = purpose
+        self.lease = lease
+        self.future = future
+        self.queued_at = time.time()
+
+
+class ChannelLockManager:
+
+    def __init__(self, lease, wait_buckets, on_expire=None):
+        """
+        Class represents the locks stopping a mission channel being created and deleted at the same time.
+
+        Locks are handed out strictly in the order they were asked for, each holder is recorded with when it got
+        the lock, and a holder that keeps the lock past its lease has it released for it, so one stuck task can't
+        stall every later mission for that carrier. How long each purpose waited is kept as a histogram.
+
+        :param float lease: Default seconds a lock may be held before it's released automatically
+        :param list wait_buckets: Upper bounds in seconds of the wait-time histogram buckets, in ascending order
+        :param on_expire: Optional callable taking the ChannelLock whose lease just ran out
+        """
+        self.lease = lease
+        self.wait_buckets = wait_buckets
+        self.on_expire = on_expire
+        self.locks = {} # channel name: ChannelLock, for channels that are held or queued for
+        self.wait_times = {} # purpose: list of counts, one per bucket plus one for longer waits
+        self.timeouts = {} # purpose: number of acquires that gave up waiting
+        self.expiries = 0 # number of leases that ran out
+
+
+    async def acquire(self, channel, owner, purpose, timeout=None, lease=...):
+        """
+        Wait our turn for a channel lock.
+
+        :param str channel: The channel name
+        :param str owner: Description of who wants the lock, used to release it and shown in /admin lock list
+        :param str purpose: What the lock is for e.g. 'generation', 'removal', used to group wait times
+        :param float timeout: Seconds to wait before giving up, None to wait forever
+        :param float lease: Seconds the lock may be held, None to hold it until released; defaults to self.lease
+        :raises asyncio.TimeoutError: If the lock wasn't ours within timeout
+        """
+        lease = self.lease if lease is ... else lease
+        lock = self.locks.setdefault(channel, ChannelLock(channel))
+        queued_at = time.time()
+
+        # only jump straight in if nobody is queued ahead of us
+        if not lock.held and not lock.waiters:
+            self._grant(lock, owner, purpose, lease)
+            self._record_wait(purpose, 0)
+            print(f"Channel lock acquired for {channel} by {owner}.")
+            return
+
+        print(f"Queued for channel lock on {channel} behind {lock.owner} and {len(lock.waiters)} other(s): {owner}")
+        waiter = ChannelLockWaiter(owner, purpose, lease, asyncio.get_running_loop().create_future())
+        lock.waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout=timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # the lock was handed to us as we gave up, so pass it on
+                self.release(channel, owner)
+            else:
+                waiter.future.cancel()
+                if waiter in lock.waiters:
+                    lock.waiters.remove(waiter)
+                self._forget_if_idle(lock)
+            if isinstance(e, asyncio.TimeoutError):
+                self.timeouts[purpose] = self.timeouts.get(purpose, 0) + 1
+                print(f"Gave up waiting for channel lock on {channel} after {timeout} seconds: {owner}")
+            raise
+
+        self._record_wait(purpose, time.time() - queued_at)
+        print(f"Channel lock acquired for {channel} by {owner} after {time.time() - queued_at:.1f} seconds.")
+
+
+    def release(self, channel, owner=None):
+        """
+        Release a channel lock and hand it to the next task queued for it.
+
+        :param str channel: The channel name
+        :param str owner: Only release the lock if this is who holds it; None releases it whoever holds it
+        :returns: True if the lock was released
+        :rtype: bool
+        """
+        lock = self.locks.get(channel)
+        if not lock or not lock.held:
+            print(f"Channel lock for {channel} isn't held, nothing to release.")
+            return False
+        if owner is not None and lock.owner != owner:
+            # most likely our lease ran out and someone else has the lock now, which isn't ours to release
+            print(f"Not releasing channel lock for {channel}: held by {lock.owner}, not {owner}.")
+            return False
+
+        print(f"Channel lock released for {channel} by {owner or 'force'} (held by {lock.owner} for {time.time() - lock.acquired_at:.1f} seconds).")
+        self._clear(lock)
+
+        # hand the lock to the first waiter that's still waiting
+        while lock.waiters:
+            waiter = lock.waiters.popleft()
+            if waiter.future.done():
+                continue
+            self._grant(lock, waiter.owner, waiter.purpose, waiter.lease)
+            waiter.future.set_result(True)
+            return True
+
+        self._forget_if_idle(lock)
+        return True
+
+
+    def is_locked(self, channel):
+        """
+        :param str channel: The channel name
+        :returns: Whether anyone holds the lock for a channel
+        :rtype: bool
+        """
+        lock = self.locks.get(channel)
+        return bool(lock and lock.held)
+
+
+    def holder(self, channel):
+        """
+        :param str channel: The channel name
+        :returns: Description of who holds the lock for a channel, or None
+        :rtype: str
+        """
+        lock = self.locks.get(channel)
+        return lock.owner if lock else None
+
+
+    def _grant(self, lock: ChannelLock, owner, purpose, lease):
+        lock.owner = owner
+        lock.purpose = purpose
+        lock.acquired_at = time.time()
+        if lease is not None:
+            lock.lease_expires_at = lock.acquired_at + lease
+            lock._expiry = asyncio.get_running_loop().call_later(lease, self._expire, lock, owner)
+
+
+    def _clear(self, lock: ChannelLock):
+        if lock._expiry:
+            lock._expiry.cancel()
+        lock.owner = lock.purpose = lock.acquired_at = lock.lease_expires_at = lock._expiry = None
+
+
+    def _expire(self, lock: ChannelLock, owner):
+        if lock.owner != owner:
+            return # released and re-acquired since the lease started
+        print(f"⚠ Lease on channel lock for {lock.channel} ran out, releasing it from {owner}.")
+        self.expiries += 1
+        if self.on_expire:
+            try:
+                self.on_expire(lock)
+            except Exception as e:
+                print(f"Error reporting expired channel lock: {e}")
+        self.release(lock.channel, owner)
+
+
+    def _forget_if_idle(self, lock: ChannelLock):
+        if not lock.held and not lock.waiters and self.locks.get(lock.channel) is lock:
+            del self.locks[lock.channel]
+
+
+    def _record_wait(self, purpose, seconds):
+        counts = self.wait_times.setdefault(purpose, [0] * (len(self.wait_buckets) + 1))
+        for index, bound in enumerate(self.wait_buckets):
+            if seconds <= bound:
+                counts[index] += 1
+                return
+        counts[-1] += 1
@@ -0,0 +1,69 @@
+# import libraries
+from collections import OrderedDict
+import os
+
+
+class ImageAssetCache:
+
+    def __init__(self, max_entries=64):
+        """
+        Class represents an in-memory cache of decoded images used to build mission images,
+        e.g. templates and carrier images already pasted into their template.
+
+        Each entry remembers the modification times of the files it was built from and is rebuilt if any of them change,
+        and the least recently used entry is evicted once max_entries is reached.
+
+        :param int max_entries: Maximum number of images to hold before evicting
+        """
+        self.max_entries = max_entries
+        self.entries = OrderedDict() # key: (source mtimes, PIL.Image)
+        self.hits = 0
+        self.misses = 0
+
+
+    def get(self, key, paths, build):
+        """
+        Return a cached image, building it if it's missing or any of its source files have changed.
+
+        :param tuple key: Identifies the image, e.g. ('discord', carrier short name). Carrier images use the short name second.
+        :param list[str] paths: The files the image is built from
+        :param build: A no-argument callable returning the PIL.Image to cache
+        :returns: A copy of the image, so callers can draw on it freely
+        :rtype: PIL.Image.Image
+        """
+        mtimes = tuple(os.path.getmtime(path) for path in paths)
+
+        entry = self.entries.get(key)
+        if entry and entry[0] == mtimes:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry[1].copy()
+
+        self.misses += 1
+        print(f"Image cache building {key}")
+        image = build()
+        image.load() # decode now, not on first use
+        self.entries[key] = (mtimes, image)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            evicted, _ = self.entries.popitem(last=False)
+            print(f"Image cache evicted {evicted}")
+        return image.copy()
+
+
+    def invalidate_carrier(self, carrier_short_name):
+        """
+        Drop every cached image built from a carrier's mission image.
+        """
+        for key in [key for key in self.entries if len(key) > 1 and key[1] == carrier_short_name]:
+            print(f"Image cache invalidated {key}")
+            del self.entries[key]
+
+
+    def __str__(self):
+        """
+        Overloads str to return a readable object
+
+        :rtype: str
+        """
+        return 'ImageAssetCache: Entries:{0} Hits:{1.hits} Misses:{1.misses}'.format(len(self.entries), self)
@@ -0,0 +1,113 @@
+# import libraries
+import asyncio
+from collections import OrderedDict
+import copy
+import time
+
+
+class MarketDataCache:
+
+    def __init__(self, ttls, max_entries=256):
+        """
+        Class represents an in-memory cache of fleet carrier market data, keyed by carrier ID and data source.
+
+        Entries expire after a per-source TTL, the least recently used entry is evicted once max_entries is reached,
+        and concurrent misses for the same key share a single fetch.
+
+        :param dict ttls: Seconds to keep data for, keyed by source name e.g. {'capi': 900, 'inara': 120}
+        :param int max_entries: Maximum number of entries to hold before evicting
+        """
+        self.ttls = ttls
+        self.max_entries = max_entries
+        self.entries = OrderedDict() # (carrier_id, source): (fetched_at, data)
+        self.in_flight = {} # (carrier_id, source): asyncio.Future
+        self.hits = 0
+        self.misses = 0
+
+
+    async def get(self, carrier_id, source, fetch, cacheable=bool):
+        """
+        Return market data for a carrier from the cache, or from fetch() if missing or expired.
+
+        :param str carrier_id: The carrier's identifier e.g. XXX-XXX
+        :param str source: The data source, must be a key of self.ttls
+        :param fetch: A no-argument callable returning a coroutine that fetches the data
+        :param cacheable: A callable deciding whether a fetched result should be stored, e.g. to skip errors
+        :returns: A copy of the cached or freshly fetched data, so callers can modify it freely
+        """
+        key = (carrier_id.upper(), source)
+
+        entry = self.entries.get(key)
+        if entry and time.monotonic() - entry[0] < self.ttls[source]:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            print(f"Market cache hit for {key}")
+            return copy.deepcopy(entry[1])
+
+        # someone else is already fetching this, wait for theirs instead of fetching again
+        if key in self.in_flight:
+            self.hits += 1
+            print(f"Market cache joining in-flight fetch for {key}")
+            in_flight = self.in_flight[key]
+            try:
+                return copy.deepcopy(await asyncio.shield(in_flight))
+            except asyncio.CancelledError:
+                if not in_flight.cancelled():
+                    raise # we were cancelled ourselves
+                # the fetch we joined was cancelled by its owner, so try again
+                self.hits -= 1
+                return await self.get(carrier_id, source, fetch, cacheable)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self.in_flight[key] = future
+        try:
+            data = await fetch()
+            if cacheable(data):
+                self._store(key, data)
+            future.set_result(data)
+            return copy.deepcopy(data)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception() # mark as retrieved so an unwaited future doesn't log an error
+            raise
+        finally:
+            del self.in_flight[key]
+
+
+    def _store(self, key, data):
+        self.entries[key] = (time.monotonic(), data)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            evicted, _ = self.entries.popitem(last=False)
+            print(f"Market cache evicted {evicted}")
+
+
+    def invalidate(self, carrier_id, source=None):
+        """
+        Drop cached data for a carrier, for one source or all of them.
+        """
+        for key in [key for key in self.entries if key[0] == carrier_id.upper() and (source is None or key[1] == source)]:
+            del self.entries[key]
+
+
+    def hit_rate(self):
+        """
+        :returns: The fraction of lookups served without a new fetch, 0 if there have been no lookups
+        :rtype: float
+        """
+        total = self.hits + self.misses
+        return self.hits / total if total else 0
+
+
+    def __str__(self):
+        """
+        Overloads str to return a readable object
+
+        :rtype: str
+        """
+        return 'MarketDataCache: Entries:{0} HitRate:{1:.0%} Hits:{2.hits} Misses:{2.misses}' \
+               .format(len(self.entries), self.hit_rate(), self)
@@ -1,3 +1,7 @@
+# import local classes
+from ptn.missionalertbot.classes.MissionParams import decode_mission_params
+
+
 class MissionData:
 
     def __init__(self, info_dict=None):
@@ -29,7 +33,24 @@ class MissionData:
         self.reddit_comment_id = info_dict.get('reddit_comment_id', None)
         self.reddit_comment_url = info_dict.get('reddit_comment_url', None)
         self.discord_alert_id = info_dict.get('discord_alert_id', None)
-        self.mission_params = info_dict.get('mission_params', None)
+        self.mission_params_raw = info_dict.get('mission_params', None) # stored form, decoded on first access
+        self._mission_params = None
+
+    @property
+    def mission_params(self):
+        """
+        The mission's MissionParams, decoded from the database the first time it's accessed.
+
+        :rtype: MissionParams
+        """
+        if self._mission_params is None and self.mission_params_raw:
+            print(f"Decoding mission_params for {self.carrier_name}")
+            self._mission_params = decode_mission_params(self.mission_params_raw)
+        return self._mission_params
+
+    @mission_params.setter
+    def mission_params(self, value):
+        self._mission_params = value
 
     def to_dictionary(self):
         """
@@ -1,14 +1,94 @@
+# import libraries
+import json
+import pickle
+
+# import local classes
 from ptn.missionalertbot.classes.CarrierData import CarrierData
 from ptn.missionalertbot.classes.ChannelDefs import ChannelDefs
 from ptn.missionalertbot._metadata import __version__
 
+
+# JSON types used in MissionParams.serialised_fields
+text = (str,)
+number = (int, float)
+
+
+# pickled rows from before we stored JSON; pickle protocol 2+ always starts with this byte, JSON never does
+def is_pickled_mission_params(stored):
+    return isinstance(stored, bytes) and stored[:1] == b'\x80'
+
+
+# rebuild MissionParams from the missions table's mission_params column
+def decode_mission_params(stored):
+    """
+    Rebuilds a MissionParams object from the missions table.
+
+    :param stored: The mission_params column value
+    :returns: MissionParams
+    """
+    if is_pickled_mission_params(stored):
+        return pickle.loads(stored)
+    return MissionParams.from_json(stored)
+
+
 class MissionParams:
     """
     A class to store all parameters relating to mission generation.
-    This class can be pickled into the missions database for later retrieval.
-    Note we cannot pickle discord.py weak objects e.g. interactions
+    This class is serialised to versioned JSON for the missions database, see to_json() and from_json().
+    Only the fields in serialised_fields are stored; embeds are rebuilt from them when needed.
     """
 
+    # bump this when the stored format changes, and add a migration from the previous version to migrations
+    schema_version = 2
+
+    # fields we store, with the JSON types each may hold (None is always allowed)
+    serialised_fields = {
+        'mission_version': text,
+        'returnflag': (bool,),
+        'training': (bool,),
+        'channel_defs': (dict,),
+        'channel_alerts_actual': (int,),
+        'role_ping_actual': (int,),
+        'carrier_name_search_term': text,
+        'commodity_search_term': text,
+        'system': text,
+        'station': text,
+        'profit_raw': text + number,
+        'profit': number,
+        'pads': text,
+        'demand_raw': text + number,
+        'demand': text + number,
+        'mission_type': text,
+        'edmc_off': (bool,),
+        'carrier_data': (dict,),
+        'commodity_name': text,
+        'cco_message_text': text,
+        'timestamp': number,
+        'reddit_title': text,
+        'reddit_body': text,
+        'reddit_post_id': text,
+        'reddit_post_url': text,
+        'reddit_comment_id': text,
+        'reddit_comment_url': text,
+        'discord_text': text,
+        'discord_msg_content': text,
+        'discord_alert_id': (int,),
+        'discord_msg_id': (int,),
+        'mission_temp_channel_id': (int,),
+        'notify_msg_id': (int,),
+        'webhook_urls': (list,),
+        'webhook_names': (list,),
+        'webhook_msg_ids': (list,),
+        'webhook_jump_urls': (list,),
+        'sendflags': (list,),
+        'booze_cruise': (bool,)
+    }
+
+    # functions converting a stored params dict from one schema version to the next, keyed by the version they convert from
+    migrations = {
+        1: lambda params: {field: value for field, value in params.items() if field not in ['reddit_img_name', 'discord_img_name']} # temp image files replaced by in-memory images
+    }
+
     def __init__(self, info_dict=None):
         """
         Class represents a mission object as returned from the database.
@@ -27,7 +107,7 @@ class MissionParams:
         self.training: bool = info_dict.get('training', False) # whether this is a training mission or not
         self.channel_defs: ChannelDefs = info_dict.get('channel_defs', None) # defines channels used by mission generator
         self.channel_alerts_actual: int = info_dict.get('channel_alerts_actual', None) # ID of alerts channel used when sending mission, as defined from ChannelDefs
-        self.role_ping_actual: int = info_dict.get('channel_alerts_actual', None) # ID of role ping used by bot when sending mission
+        self.role_ping_actual: int = info_dict.get('role_ping_actual', None) # ID of role ping used by bot when sending mission
         self.copypaste_embed = info_dict.get('copypaste_embed', None) # embed containing the copy/paste string for the command used
         self.carrier_name_search_term: str = info_dict.get('carrier_name_search_term', None) # the carrier name fragment to search for
         self.commodity_search_term: str = info_dict.get('commodity_search_term', None) # the commodity name fragment to search for
@@ -42,8 +122,8 @@ class MissionParams:
         self.edmc_off = info_dict.get('edmc_off', None) # whether the mission is EDMC off flagged
         self.carrier_data: CarrierData = info_dict.get('carrier_data', None) # carrier data class retrieved from db
         self.commodity_name: str = info_dict.get('commodity_name', None) # commodity name
-        self.reddit_img_name = info_dict.get('reddit_img_name', None) # the Reddit image file name
-        self.discord_img_name = info_dict.get('discord_img_name', None) # the Discord image file name
+        self.reddit_img: bytes = info_dict.get('reddit_img', None) # the rendered Reddit image as PNG bytes, not stored
+        self.discord_img: bytes = info_dict.get('discord_img', None) # the rendered Discord image as PNG bytes, not stored
         self.cco_message_text: str = info_dict.get('cco_message_text', None) # message text entered by user
         self.timestamp = info_dict.get('timestamp', None) # the posix time the mission was generated
         self.reddit_title: str = info_dict.get('reddit_title', None) # title for the subreddit post
@@ -55,6 +135,7 @@ class MissionParams:
         self.discord_text: str = info_dict.get('discord_text', None) # the text used for the trade alert sent to Discord
         self.discord_msg_content: str = info_dict.get('discord_msg_content', None) # non-embed content used to emphasise edmc-off
         self.discord_embeds = info_dict.get('discord_embeds', None) # embeds used for Discord channels/webhooks
+        self.progress = None # ProgressReporter for the command currently working on this mission, not stored
         self.discord_alert_id = info_dict.get('discord_alert_id', None) # the message ID of the Discord trade alerts entry
         self.discord_msg_id = info_dict.get('discord_msg_id', None) # ID of the message sent to the carrier channel
         self.mission_temp_channel_id = info_dict.get('mission_temp_channel_id', None) # the channel ID of the Discord carrier mission channel
@@ -89,8 +170,8 @@ class MissionParams:
             print(f"edmc_off: {self.edmc_off}")
             print(f"carrier_data: {self.carrier_data}")
             print(f"commodity_name: {self.commodity_name}")
-            print(f"reddit_img_name: {self.reddit_img_name}")
-            print(f"discord_img_name: {self.discord_img_name}")
+            print(f"reddit_img: {len(self.reddit_img) if self.reddit_img else None} bytes")
+            print(f"discord_img: {len(self.discord_img) if self.discord_img else None} bytes")
             print(f"cco_message_text: {self.cco_message_text}")
             print(f"timestamp: {self.timestamp}")
             print(f"reddit_title: {self.reddit_title}")
@@ -125,6 +206,62 @@ class MissionParams:
                 response[key] = value
         return response
 
+    def to_json(self):
+        """
+        Serialises the mission params for storage in the missions database.
+
+        Fields still at their default value are left out to keep rows small, apart from mission_version.
+
+        :returns: Compact UTF-8 JSON of the form {"v": schema_version, "p": {field: value}}
+        :rtype: bytes
+        :raises ValueError: if a field holds a value of the wrong type
+        """
+        defaults = vars(MissionParams())
+        params = {}
+        for field, types in self.serialised_fields.items():
+            value = getattr(self, field, None)
+            if field == 'channel_defs' and value is not None:
+                value = vars(value)
+            elif field == 'carrier_data' and value is not None:
+                value = value.to_row()
+            elif field != 'mission_version' and value == defaults[field]:
+                continue
+            if value is not None and not isinstance(value, types):
+                raise ValueError(f"MissionParams field {field} has unexpected type {type(value).__name__}")
+            params[field] = value
+        return json.dumps({'v': self.schema_version, 'p': params}, separators=(',', ':')).encode('utf-8')
+
+    @classmethod
+    def from_json(cls, data):
+        """
+        Rebuilds mission params from to_json() output, migrating older schema versions.
+
+        :param data: bytes or str as returned by to_json()
+        :returns: MissionParams
+        :raises ValueError: if the data isn't a schema we understand
+        """
+        stored = json.loads(data)
+        version, params = stored.get('v'), stored.get('p')
+        if not isinstance(version, int) or not isinstance(params, dict) or version > cls.schema_version:
+            raise ValueError(f"Unsupported MissionParams schema version {version}")
+        while version < cls.schema_version:
+            params = cls.migrations[version](params)
+            version += 1
+
+        for field, value in list(params.items()):
+            types = cls.serialised_fields.get(field)
+            if types is None:
+                print(f"Ignoring unknown MissionParams field {field}")
+                del params[field]
+            elif value is not None and not isinstance(value, types):
+                raise ValueError(f"MissionParams field {field} has unexpected type {type(value).__name__}")
+
+        if params.get('channel_defs') is not None:
+            params['channel_defs'] = ChannelDefs(**params['channel_defs'])
+        if params.get('carrier_data') is not None:
+            params['carrier_data'] = CarrierData(params['carrier_data'])
+        return cls(params)
+
     def __str__(self):
         """
         Overloads str to return a readable object
@@ -152,8 +289,8 @@ class MissionParams:
             f"edmc_off: {self.edmc_off}\n"
             f"carrier_data: {self.carrier_data}\n"
             f"commodity_name: {self.commodity_name}\n"
-            f"reddit_img_name: {self.reddit_img_name}\n"
-            f"discord_img_name: {self.discord_img_name}\n"
+            f"reddit_img: {len(self.reddit_img) if self.reddit_img else None} bytes\n"
+            f"discord_img: {len(self.discord_img) if self.discord_img else None} bytes\n"
             f"cco_message_text: {self.cco_message_text}\n"
             f"timestamp: {self.timestamp}\n"
             f"reddit_title: {self.reddit_title}\n"
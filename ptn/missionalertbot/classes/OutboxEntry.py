@@ -0,0 +1,43 @@
+# import libraries
+import json
+
+
+class OutboxEntry:
+
+    def __init__(self, info_dict=None):
+        """
+        Class represents an external send waiting in the outbox, as returned from the database.
+
+        :param sqlite.Row info_dict: A single row from the sqlite query.
+        """
+        if info_dict:
+            # Convert the sqlite3.Row object to a dictionary
+            info_dict = dict(info_dict)
+        else:
+            info_dict = dict()
+
+        self.entry_id = info_dict.get('id', None)
+        self.idempotency_key = info_dict.get('idempotency_key', None)
+        self.kind = info_dict.get('kind', None)
+        self.payload = json.loads(info_dict['payload']) if info_dict.get('payload') else {}
+        self.status = info_dict.get('status', None)
+        self.attempts = info_dict.get('attempts', 0)
+        self.next_attempt = info_dict.get('next_attempt', None)
+        self.last_error = info_dict.get('last_error', None)
+        self.created = info_dict.get('created', None)
+
+    def __str__(self):
+        """
+        Overloads str to return a readable object
+
+        :rtype: str
+        """
+        return 'OutboxEntry: ID:{0.entry_id} Key:{0.idempotency_key} Kind:{0.kind} Status:{0.status} Attempts:{0.attempts}'.format(self)
+
+    def __bool__(self):
+        """
+        Override the __bool__ method to return a bool if we have an entry
+
+        :rtype: bool
+        """
+        return self.entry_id is not None
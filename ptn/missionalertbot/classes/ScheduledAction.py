@@ -0,0 +1,40 @@
+# import libraries
+import json
+
+
+class ScheduledAction:
+
+    def __init__(self, info_dict=None):
+        """
+        Class represents a delayed action waiting to be run, as returned from the database.
+
+        :param sqlite.Row info_dict: A single row from the sqlite query.
+        """
+        if info_dict:
+            # Convert the sqlite3.Row object to a dictionary
+            info_dict = dict(info_dict)
+        else:
+            info_dict = dict()
+
+        self.action_id = info_dict.get('id', None)
+        self.idempotency_key = info_dict.get('idempotency_key', None)
+        self.kind = info_dict.get('kind', None)
+        self.payload = json.loads(info_dict['payload']) if info_dict.get('payload') else {}
+        self.due = info_dict.get('due', None)
+        self.created = info_dict.get('created', None)
+
+    def __str__(self):
+        """
+        Overloads str to return a readable object
+
+        :rtype: str
+        """
+        return 'ScheduledAction: ID:{0.action_id} Key:{0.idempotency_key} Kind:{0.kind} Due:{0.due}'.format(self)
+
+    def __bool__(self):
+        """
+        Override the __bool__ method to return a bool if we have an action
+
+        :rtype: bool
+        """
+        return self.action_id is not None
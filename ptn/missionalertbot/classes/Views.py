@@ -27,13 +27,14 @@ from ptn.missionalertbot.classes.CommunityCarrierData import CommunityCarrierDat
 
 # import local modules
 from ptn.missionalertbot.database.database import delete_nominee_from_db, delete_carrier_from_db, _update_carrier_details_in_database, find_carrier, CarrierDbFields, \
-    mission_db, missions_conn, add_carrier_to_database, carrier_db, _update_carrier_capi
+    mission_db_executor, add_carrier_to_database, carrier_db_executor, _update_carrier_capi
 from ptn.missionalertbot.modules.DateString import get_mission_delete_hammertime, get_formatted_date_string
 from ptn.missionalertbot.modules.Embeds import _configure_all_carrier_detail_embed, _generate_cc_notice_embed, role_removed_embed, role_granted_embed, cc_renamed_embed, \
     _add_common_embed_fields, orphaned_carrier_summary_embed
 from ptn.missionalertbot.modules.ErrorHandler import GenericError, on_generic_error, CustomError, AsyncioTimeoutError
 from ptn.missionalertbot.modules.helpers import _remove_cc_manager
 from ptn.missionalertbot.modules.MissionCleaner import _cleanup_completed_mission
+from ptn.missionalertbot.modules.RedditCommentRouter import comment_router
 from ptn.missionalertbot.modules.StockHelpers import capi
 
 
@@ -284,8 +285,8 @@ class MissionDeleteView(View):
         spamchannel = bot.get_channel(bot_spam_channel())
         print(f"Trying manual mission delete for {self.mission_data.carrier_name}")
         try:
-            mission_db.execute(f'''DELETE FROM missions WHERE carrier LIKE (?)''', ('%' + self.mission_data.carrier_name + '%',))
-            missions_conn.commit()
+            await mission_db_executor.execute(f'''DELETE FROM missions WHERE carrier LIKE (?)''', ('%' + self.mission_data.carrier_name + '%',))
+            comment_router.mission_removed(self.mission_data.reddit_post_id)
             embed = discord.Embed(
                 description=f"Deleted mission for {self.mission_data.carrier_name}.",
                 color=constants.EMBED_COLOUR_OK
@@ -1105,8 +1106,8 @@ class ConfirmCAPISync(View):
         await interaction.response.edit_message(embed=embed, view=None)
 
         # check fleet carrier capi status
-        carrier_db.execute(f"SELECT * FROM carriers")
-        carriers = [CarrierData(carrier) for carrier in carrier_db.fetchall()]
+        rows = await carrier_db_executor.query(f"SELECT * FROM carriers")
+        carriers = [CarrierData(carrier) for carrier in rows]
 
         carrier: CarrierData
 
@@ -1117,7 +1118,11 @@ class ConfirmCAPISync(View):
         for carrier in carriers:
             if not carrier.capi: # don't need to sync those already enabled
                 print("⏩ Processing %s (%s)" % ( carrier.carrier_long_name, carrier.carrier_identifier ))
-                capi_response = capi(carrier.carrier_identifier) # query CAPI
+                try:
+                    capi_response = await capi(carrier.carrier_identifier) # query CAPI
+                except Exception as e:
+                    print(f"Couldn't query CAPI for {carrier.carrier_identifier}: {e}")
+                    continue
                 print(f"capi response: {capi_response.status_code}")
                 if capi_response.status_code == 200: # positive response, update the carrier db
                     await _update_carrier_capi(carrier.pid, 1)
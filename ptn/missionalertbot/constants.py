@@ -67,10 +67,99 @@ bot = commands.Bot(command_prefix='m.', intents=discord.Intents.all())
 API_HOST = os.getenv('API_HOST')
 API_TOKEN = os.getenv('API_TOKEN')
 
+# shared HTTP client settings for Inara and cAPI requests
+HTTP_TIMEOUT = 30 # total seconds allowed for a single request
+HTTP_CONNECT_TIMEOUT = 10 # seconds allowed to establish a connection
+HTTP_POOL_LIMIT = 20 # max open connections across all hosts
+HTTP_POOL_LIMIT_PER_HOST = 6 # max open connections to any one host
+HTTP_KEEPALIVE_TIMEOUT = 60 # seconds to keep an idle connection open for reuse
+HTTP_RETRIES = 2 # retries after the first attempt for connection errors and retryable statuses
+HTTP_RETRY_STATUSES = [429, 502, 503, 504] # statuses worth retrying; 418 (cAPI maintenance) and 500 (stockbot error) are not
+HTTP_BACKOFF_BASE = 1 # seconds, doubled for each retry before jitter
+
+# database access threads
+DB_READER_THREADS = 4 # reader threads per database; writes always go through a single writer thread
+DB_JOURNAL_MODES = ['DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF'] # valid values for db_journal_mode
+DB_SYNCHRONOUS_MODES = ['OFF', 'NORMAL', 'FULL', 'EXTRA'] # valid values for db_synchronous
+
+# database backup settings
+BACKUP_INTERVAL = 600 # seconds; edits within this long of the last backup share one backup at the end of it
+BACKUP_RETENTION_COUNT = 200 # most backups kept per database
+BACKUP_RETENTION_DAYS = 30 # backups older than this are deleted, except the newest
+
+# mission image settings
+DISCORD_MISSION_IMAGE_SIZE = (430, 430) # Discord mission images are scaled to fit this for our embed width
+IMAGE_CACHE_MAX_ENTRIES = 64 # decoded templates and carrier bases kept in memory by each render worker
+IMAGE_RENDER_WORKERS = 2 # processes rendering mission images
+IMAGE_RENDER_QUEUE_SIZE = 8 # render jobs allowed to wait for a free worker before new ones are turned away
+IMAGE_RENDER_TIMEOUT = 30 # seconds before a render job is abandoned
+
+# webhook delivery settings
+WEBHOOK_CONCURRENCY = 10 # webhooks we talk to at once for a single mission
+WEBHOOK_RATE_LIMIT_RETRIES = 2 # extra attempts for a webhook still rate limited after discord.py's own retries
+
+# reddit posting settings
+REDDIT_WEBSOCKET_TIMEOUT = 10 # seconds to wait for an image post to be submitted and reddit to tell us its ID
+REDDIT_OWN_POST_LOOKUP_LIMIT = 5 # how many of the bot account's newest posts to check for one we couldn't get the ID of
+REDDIT_OWN_POST_LOOKUP_ATTEMPTS = 3 # times to check them, reddit can take a moment to list a new post
+REDDIT_OWN_POST_LOOKUP_INTERVAL = 2 # seconds between checks
+
+# outbox settings, for external sends made in the background
+OUTBOX_WORKERS = 2 # outbox entries sent at once
+OUTBOX_POLL_INTERVAL = 60 # most seconds a worker sleeps before checking for due entries, new entries wake it sooner
+OUTBOX_SEND_TIMEOUT = 120 # seconds a single attempt may take before it's treated as failed
+OUTBOX_MAX_ATTEMPTS = 8 # attempts before an entry is given up on
+OUTBOX_BACKOFF_BASE = 30 # seconds before the first retry, doubled for each retry after
+OUTBOX_BACKOFF_MAX = 3600 # longest wait between retries, in seconds
+OUTBOX_RETENTION_DAYS = 7 # sent and failed entries are deleted after this long
+
+# action scheduler settings, for delayed actions such as mission channel deletion
+SCHEDULER_MAX_SLEEP = 300 # longest the scheduler sleeps between checks for due actions, in seconds
+CHANNEL_POOL_PREFIX = 'mab-pool-' # names of spare mission channels waiting in the channel pool start with this
+CHANNEL_POOL_REFILL_SPACING = 10 # seconds between channel pool creations, so refilling never competes with mission generation
+CATEGORY_CHANNEL_LIMIT = 50 # most channels Discord allows in a category; the pool never fills past it
+ORPHAN_DELETE_SPACING = 2 # seconds between deletions of orphaned mission channels found on startup, to stay clear of Discord's rate limits
+
+# progress message settings, for commands reporting their steps in a single edited message
+PROGRESS_EDIT_INTERVAL = 2 # least seconds between edits of one progress message, steps in between are batched
+PROGRESS_CHANNEL_EDIT_SPACING = 1 # least seconds between progress message edits in any one channel
+
+# mission channel lock settings
+CHANNEL_LOCK_LEASE = 300 # seconds a channel lock may be held before it's released automatically
+CHANNEL_LOCK_WAIT_BUCKETS = [1, 5, 20, 60, 120] # upper bounds in seconds of the lock wait-time histogram shown in /admin lock list
+
+# seconds each mission cleanup step may take; the steps run at the same time, so a slow one only holds up itself
+CLEANUP_STEP_TIMEOUTS = {
+    'alert': 15, # delete the trade alert
+    'notice': 15, # tell the carrier channel the mission's over
+    'reddit': 10, # queue the Reddit post update
+    'webhooks': 10, # queue the webhook updates
+    'database': 30, # remove the mission from the database
+    'pins': 30, # unpin the mission's messages
+    'owner_dm': 15 # tell the carrier owner, if someone else closed their mission
+}
+
+# market data cache settings, shared by /stock and WMM tracking
+MARKET_CACHE_TTL = {
+    'capi': 900, # cAPI data only refreshes hourly anyway
+    'inara': 120 # Inara updates whenever a CMDR docks with EDMC running, so keep this short
+}
+MARKET_CACHE_MAX_ENTRIES = 256 # least recently used carriers are evicted past this
+
+# reddit comment monitoring settings
+REDDIT_TITLE_CACHE_SIZE = 512 # reddit post titles to keep for comments on completed missions' posts
+
 
 # default settings.txt values
 wmm_autostart = False
 commandid_stock = None
+db_journal_mode = 'WAL' # readers don't block the writer and vice versa
+db_synchronous = 'NORMAL' # safe with WAL; only fsyncs at checkpoints
+db_cache_size = -16000 # page cache per connection; negative values are KiB, so 16MB
+db_mmap_size = 67108864 # bytes of each database to memory-map for reads, 64MB
+db_busy_timeout = 10000 # ms a connection waits on a locked database before raising
+db_wal_checkpoint_interval = 300 # seconds between WAL checkpoints
+channel_pool_size = 0 # spare hidden mission channels to keep ready in the trade category, 0 to turn the pool off
 
 
 # Production variables
@@ -269,6 +358,11 @@ wmm_interval = 3600 # 1 hour
 # define sorting key for FCs without stock
 wmm_no_stock_key = "ZZZ_NO_STOCK"
 
+# define WMM stock fetch concurrency limits
+wmm_fetch_workers = 8 # max carriers being fetched at once per WMM tick
+wmm_capi_concurrency = 4 # max simultaneous requests to our cAPI host
+wmm_inara_concurrency = 2 # max simultaneous requests to Inara (be nice to Inara)
+
 # random gifs and images
 
 byebye_gifs = [
@@ -580,13 +674,32 @@ nomination_immune = [cpillar_role(), cmentor_role(), admin_role(), mod_role(), b
 admin_roles = [admin_role(), dev_role(), advisor_role()]
 
 
+# our shared reddit instance, kept for the life of the bot so its session and OAuth token are reused
+_reddit: asyncpraw.Reddit = None
+
+
 async def get_reddit():
     """
-    Return reddit instance
+    Return reddit instance, creating it if needed
     discord.py complains if an async resource is not initialized
     inside async
     """
-    return asyncpraw.Reddit('bot1')
+    global _reddit
+    if _reddit is None:
+        print("Creating shared Reddit client")
+        _reddit = asyncpraw.Reddit('bot1')
+    return _reddit
+
+
+async def close_reddit():
+    """
+    Close the shared reddit instance on shutdown
+    """
+    global _reddit
+    if _reddit is not None:
+        print("Closing shared Reddit client")
+        await _reddit.close()
+    _reddit = None
 
 
 async def get_overwrite_perms():
@@ -0,0 +1,178 @@
+"""
+BackupScheduler.py
+
+Takes database snapshots in the background using sqlite's online backup API.
+
+Edits ask for a backup instead of making one. The first request for a database is snapshotted straight away,
+then any further requests within constants.BACKUP_INTERVAL are coalesced into a single snapshot at the end of
+that interval. Old snapshots are pruned according to constants.BACKUP_RETENTION_COUNT and BACKUP_RETENTION_DAYS.
+
+Depends on: constants
+"""
+
+# import libraries
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import glob
+import os
+import sqlite3
+import time
+import traceback
+
+# import local constants
+import ptn.missionalertbot.constants as constants
+
+# import local modules
+from ptn.missionalertbot.modules.DateString import get_formatted_date_string
+
+
+class BackupScheduler:
+
+    def __init__(self, database_names):
+        """
+        Class represents the background backup task for our databases.
+
+        :param list[str] database_names: Short names of the databases we can back up e.g. ['carriers', 'missions']
+        """
+        self.database_names = database_names
+        self.last_snapshot = {} # name: time.monotonic() of the last snapshot started
+        self.pending = {} # name: asyncio.Task waiting to take the next snapshot
+        self._thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix='db-backup')
+
+
+    def request(self, database_name):
+        """
+        Ask for a snapshot of a database. Returns immediately, the snapshot is taken on the backup thread.
+
+        :param str database_name: The database to back up
+        """
+        if database_name not in self.database_names:
+            raise ValueError(f'Unknown DB backup handling for: {database_name}')
+
+        if database_name in self.pending:
+            print(f"Backup of {database_name} already scheduled, coalescing")
+            return
+
+        # snapshot now if we haven't recently, otherwise wait for the rest of the interval
+        last = self.last_snapshot.get(database_name)
+        delay = 0 if last is None else max(0, last + constants.BACKUP_INTERVAL - time.monotonic())
+        print(f"Scheduling backup of {database_name} in {int(delay)}s")
+        self.pending[database_name] = asyncio.create_task(self._snapshot_later(database_name, delay))
+
+
+    async def _snapshot_later(self, database_name, delay):
+        await asyncio.sleep(delay)
+        # anything requested from here on needs a new snapshot
+        del self.pending[database_name]
+        try:
+            await self.snapshot_now(database_name)
+        except Exception as e:
+            print(f"Scheduled backup of {database_name} failed: {e}")
+            traceback.print_exc()
+
+
+    async def snapshot_now(self, database_name):
+        """
+        Take a snapshot immediately and wait for it to finish.
+
+        :param str database_name: The database to back up
+        :returns: Path to the snapshot
+        :rtype: str
+        """
+        self.last_snapshot[database_name] = time.monotonic()
+        return await asyncio.get_running_loop().run_in_executor(self._thread, self.snapshot, database_name)
+
+
+    def snapshot(self, database_name):
+        """
+        Copy a database to .backup/db_name.datetimestamp.db, write its SQL dump, and prune old snapshots.
+
+        Uses sqlite's backup API, so the copy is consistent even with writes happening on other connections.
+        Runs on whatever thread calls it; use request() or snapshot_now() from the event loop.
+
+        :param str database_name: The database to back up
+        :returns: Path to the snapshot
+        :rtype: str
+        """
+        dt_file_string = get_formatted_date_string()[1]
+        db_path = os.path.join(constants.DB_PATH, f'{database_name}.db')
+        backup_path = os.path.join(constants.BACKUP_DB_PATH, f'{database_name}.{dt_file_string}.db')
+        os.makedirs(constants.BACKUP_DB_PATH, exist_ok=True)
+
+        source = sqlite3.connect(db_path, timeout=int(constants.db_busy_timeout) / 1000)
+        destination = sqlite3.connect(backup_path)
+        try:
+            source.backup(destination)
+            print(f'Backed up {database_name}.db to {backup_path}')
+            # dump from the snapshot rather than the live database, so the dump matches the backup exactly
+            try:
+                write_sql_dump(database_name, destination)
+            except Exception as e:
+                print(f"Error writing SQL dump for {database_name}: {e}")
+        finally:
+            destination.close()
+            source.close()
+
+        self.prune(database_name)
+        return backup_path
+
+
+    def prune(self, database_name):
+        """
+        Delete old snapshots of a database, keeping the newest BACKUP_RETENTION_COUNT and dropping any older than
+        BACKUP_RETENTION_DAYS. The newest snapshot is always kept.
+
+        :param str database_name: The database to prune snapshots for
+        """
+        # our timestamped filenames sort oldest to newest
+        snapshots = sorted(glob.glob(os.path.join(constants.BACKUP_DB_PATH, f'{database_name}.*.db')), reverse=True)
+        cutoff = (datetime.now() - timedelta(days=constants.BACKUP_RETENTION_DAYS)).timestamp()
+
+        for index, path in enumerate(snapshots):
+            if index == 0:
+                continue
+            if index >= constants.BACKUP_RETENTION_COUNT or os.path.getmtime(path) < cutoff:
+                try:
+                    os.remove(path)
+                    print(f"Pruned old backup {path}")
+                except OSError as e:
+                    print(f"Error pruning backup {path}: {e}")
+
+
+    def close(self):
+        """
+        Take any snapshots still waiting on their interval, then stop the backup thread.
+        """
+        pending = list(self.pending)
+        for task in self.pending.values():
+            task.cancel()
+        self.pending = {}
+        self._thread.shutdown(wait=True)
+
+        for database_name in pending:
+            print(f"Taking pending backup of {database_name} before shutdown")
+            try:
+                self.snapshot(database_name)
+            except Exception as e:
+                print(f"Backup of {database_name} on shutdown failed: {e}")
+
+
+# dump db to .sql file
+def write_sql_dump(database_name, connection):
+    """
+    Dumps a database to a .sql text file we can recreate it from. Only the latest state is kept.
+
+    Statements are streamed to a temporary file as iterdump() yields them, then moved into place,
+    so a dump is never held in memory and a failed dump never replaces a good one.
+
+    :param str database_name: The DB name, used to name the dump file
+    :param sqlite3.Connection connection: The connection to dump from
+    """
+    os.makedirs(constants.SQL_PATH, exist_ok=True)
+    dump_path = f'{constants.SQL_PATH}/{database_name}_dump.sql'
+    temp_path = f'{dump_path}.tmp'
+    with open(temp_path, 'w') as f:
+        for line in connection.iterdump():
+            f.write(f'{line}\n')
+    os.replace(temp_path, dump_path)
@@ -0,0 +1,160 @@
+"""
+DbExecutor.py
+
+Runs sqlite work on background threads so disk latency never blocks the event loop.
+
+Each database gets one writer thread, so writes are applied one at a time in the order they're submitted,
+and a small pool of reader threads so lookups can run alongside a write. Every thread keeps its own connection.
+
+Depends on: constants
+"""
+
+# import libraries
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import sqlite3
+import threading
+
+# import local constants
+import ptn.missionalertbot.constants as constants
+
+
+def configure_connection(connection):
+    """
+    Applies our settings.txt journal and performance pragmas to a sqlite connection.
+
+    :param sqlite3.Connection connection: The connection to configure
+    :returns: The same connection
+    :rtype: sqlite3.Connection
+    """
+    journal_mode = str(constants.db_journal_mode).upper()
+    if journal_mode not in constants.DB_JOURNAL_MODES:
+        print(f"⚠ Invalid db_journal_mode {journal_mode}, using WAL")
+        journal_mode = 'WAL'
+    synchronous = str(constants.db_synchronous).upper()
+    if synchronous not in constants.DB_SYNCHRONOUS_MODES:
+        print(f"⚠ Invalid db_synchronous {synchronous}, using NORMAL")
+        synchronous = 'NORMAL'
+
+    connection.execute(f"PRAGMA busy_timeout = {int(constants.db_busy_timeout)}")
+    connection.execute(f"PRAGMA journal_mode = {journal_mode}")
+    connection.execute(f"PRAGMA synchronous = {synchronous}")
+    connection.execute(f"PRAGMA cache_size = {int(constants.db_cache_size)}")
+    connection.execute(f"PRAGMA mmap_size = {int(constants.db_mmap_size)}")
+    return connection
+
+
+class DatabaseExecutor:
+
+    def __init__(self, db_path, name, readers=None):
+        """
+        Class represents the background threads used to access one sqlite database.
+
+        :param str db_path: Path to the database file
+        :param str name: Short name of the database, used to name threads e.g. 'missions'
+        :param int readers: Number of reader threads, defaults to constants.DB_READER_THREADS
+        """
+        self.db_path = db_path
+        self.name = name
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f'{name}-db-writer')
+        self._readers = ThreadPoolExecutor(max_workers=readers or constants.DB_READER_THREADS, thread_name_prefix=f'{name}-db-reader')
+
+
+    def _connection(self):
+        # one connection per thread, opened the first time that thread is used
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            # only ever used by this thread, but close() needs to reach it from another one
+            connection = sqlite3.connect(self.db_path, check_same_thread=False)
+            connection.row_factory = sqlite3.Row
+            configure_connection(connection)
+            self._local.connection = connection
+            with self._connections_lock:
+                self._connections.append(connection)
+        return connection
+
+
+    def _read(self, function, *args):
+        return function(self._connection(), *args)
+
+
+    def _write(self, function, *args):
+        connection = self._connection()
+        try:
+            result = function(connection, *args)
+            connection.commit()
+            return result
+        except:
+            connection.rollback()
+            raise
+
+
+    async def read(self, function, *args):
+        """
+        Run function(connection, *args) on a reader thread.
+        """
+        return await asyncio.get_running_loop().run_in_executor(self._readers, self._read, function, *args)
+
+
+    async def write(self, function, *args):
+        """
+        Run function(connection, *args) on the writer thread as a single transaction.
+        Changes are committed if it returns, and rolled back if it raises.
+        """
+        return await asyncio.get_running_loop().run_in_executor(self._writer, self._write, function, *args)
+
+
+    async def query(self, sql, params=()):
+        """
+        Run a SELECT statement on a reader thread.
+
+        :returns: All matching rows
+        :rtype: list[sqlite3.Row]
+        """
+        return await self.read(lambda connection: connection.execute(sql, params).fetchall())
+
+
+    async def query_one(self, sql, params=()):
+        """
+        Run a SELECT statement on a reader thread.
+
+        :returns: The first matching row, or None
+        :rtype: sqlite3.Row
+        """
+        return await self.read(lambda connection: connection.execute(sql, params).fetchone())
+
+
+    async def execute(self, sql, params=()):
+        """
+        Run and commit a single write statement on the writer thread.
+
+        :returns: The rowid of the last inserted row
+        :rtype: int
+        """
+        return await self.write(lambda connection: connection.execute(sql, params).lastrowid)
+
+
+    async def checkpoint(self, mode='PASSIVE'):
+        """
+        Run a WAL checkpoint on the writer thread, copying committed pages from the WAL back into the database file.
+
+        :param str mode: PASSIVE, FULL, RESTART or TRUNCATE
+        :returns: (busy, WAL pages, pages checkpointed)
+        :rtype: tuple
+        """
+        return await self.write(lambda connection: tuple(connection.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()))
+
+
+    def close(self):
+        """
+        Stop the threads and close their connections.
+        """
+        self._writer.shutdown(wait=True)
+        self._readers.shutdown(wait=True)
+        with self._connections_lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections = []
@@ -28,11 +28,14 @@ from datetime import timezone
 
 # local classes
 from ptn.missionalertbot.classes.CarrierData import CarrierData
+from ptn.missionalertbot.classes.CarrierRegistry import CarrierRegistry
 from ptn.missionalertbot.classes.Commodity import Commodity
 from ptn.missionalertbot.classes.MissionData import MissionData
-from ptn.missionalertbot.classes.MissionParams import MissionParams
+from ptn.missionalertbot.classes.MissionParams import MissionParams, is_pickled_mission_params
 from ptn.missionalertbot.classes.CommunityCarrierData import CommunityCarrierData
 from ptn.missionalertbot.classes.NomineesData import NomineesData
+from ptn.missionalertbot.classes.OutboxEntry import OutboxEntry
+from ptn.missionalertbot.classes.ScheduledAction import ScheduledAction
 from ptn.missionalertbot.classes.WebhookData import WebhookData
 from ptn.missionalertbot.classes.WMMData import WMMData
 
@@ -40,6 +43,8 @@ from ptn.missionalertbot.classes.WMMData import WMMData
 import ptn.missionalertbot.constants as constants
 from ptn.missionalertbot.constants import bot
 from ptn.missionalertbot.database.Commodities import commodities_all
+from ptn.missionalertbot.database.BackupScheduler import BackupScheduler
+from ptn.missionalertbot.database.DbExecutor import DatabaseExecutor, configure_connection
 
 # local modules
 from ptn.missionalertbot.modules.DateString import get_formatted_date_string
@@ -63,6 +68,13 @@ class Settings:
     def __init__(self):
         self.wmm_autostart = constants.wmm_autostart
         self.commandid_stock = constants.commandid_stock
+        self.db_journal_mode = constants.db_journal_mode
+        self.db_synchronous = constants.db_synchronous
+        self.db_cache_size = constants.db_cache_size
+        self.db_mmap_size = constants.db_mmap_size
+        self.db_busy_timeout = constants.db_busy_timeout
+        self.db_wal_checkpoint_interval = constants.db_wal_checkpoint_interval
+        self.channel_pool_size = constants.channel_pool_size
 
     def read_settings_file(self, file_path = constants.SETTINGS_FILE_PATH):
         # method to read settings from file and update class attributes
@@ -110,6 +122,13 @@ def create_settings_file():
         # save these values back to our global Settings class
         constants.wmm_autostart = settings.wmm_autostart
         constants.commandid_stock = settings.commandid_stock
+        constants.db_journal_mode = settings.db_journal_mode
+        constants.db_synchronous = settings.db_synchronous
+        constants.db_cache_size = settings.db_cache_size
+        constants.db_mmap_size = settings.db_mmap_size
+        constants.db_busy_timeout = settings.db_busy_timeout
+        constants.db_wal_checkpoint_interval = settings.db_wal_checkpoint_interval
+        constants.channel_pool_size = settings.channel_pool_size
     except Exception as e:
         print(f"Error creating settings file: {str(e)}")
         traceback.print_exc()
@@ -120,6 +139,7 @@ create_settings_file()
 # connect to sqlite carrier database
 carriers_conn = sqlite3.connect(constants.CARRIERS_DB_PATH)
 carriers_conn.row_factory = sqlite3.Row
+configure_connection(carriers_conn)
 carrier_db = carriers_conn.cursor()
 
 # carrier database creation
@@ -178,6 +198,7 @@ nominess_table_columns = ['nominatorid', 'pillarid', 'note']
 # connect to sqlite missions database
 missions_conn = sqlite3.connect(constants.MISSIONS_DB_PATH)
 missions_conn.row_factory = sqlite3.Row
+configure_connection(missions_conn)
 mission_db = missions_conn.cursor()
 
 # missions database creation
@@ -205,11 +226,41 @@ missions_table_create = '''
 missions_tables_columns = ['carrier', 'cid', 'channelid', 'commodity', 'missiontype', 'system', 'station',\
     'profit', 'pad', 'demand', 'rp_text', 'reddit_post_id', 'reddit_post_url', 'reddit_comment_id',\
     'reddit_comment_url', 'discord_alert_id', 'mission_params']
+# columns needed to list missions, for queries that don't need the whole row
+missions_summary_columns = 'carrier, channelid, commodity, missiontype, system, station, profit, pad, demand'
+
+# outbox of external sends (Reddit, webhooks) waiting to be made, see modules/Outbox.py
+outbox_table_create = '''
+    CREATE TABLE outbox(
+        "id"	INTEGER PRIMARY KEY AUTOINCREMENT,
+        "idempotency_key"	TEXT NOT NULL UNIQUE,
+        "kind"	TEXT NOT NULL,
+        "payload"	TEXT NOT NULL,
+        "status"	TEXT NOT NULL DEFAULT 'pending',
+        "attempts"	INTEGER NOT NULL DEFAULT 0,
+        "next_attempt"	REAL NOT NULL,
+        "last_error"	TEXT,
+        "created"	REAL NOT NULL
+    )
+    '''
+
+# delayed actions (e.g. channel deletions) waiting to be run, see modules/ActionScheduler.py
+scheduled_actions_table_create = '''
+    CREATE TABLE scheduled_actions(
+        "id"	INTEGER PRIMARY KEY AUTOINCREMENT,
+        "idempotency_key"	TEXT NOT NULL UNIQUE,
+        "kind"	TEXT NOT NULL,
+        "payload"	TEXT NOT NULL,
+        "due"	REAL NOT NULL,
+        "created"	REAL NOT NULL
+    )
+    '''
 
 
 # connect to sqlite wmm database
 wmm_conn = sqlite3.connect(constants.WMM_DB_PATH)
 wmm_conn.row_factory = sqlite3.Row
+configure_connection(wmm_conn)
 wmm_db = wmm_conn.cursor()
 
 # wmm database creation
@@ -226,64 +277,66 @@ wmm_table_create = '''
 
 wmm_table_columns = ['carrier', 'cid', 'location', 'notify', 'capi']
 
-# We need some locks while we wait on the DB queries
-carrier_db_lock = asyncio.Lock()
-mission_db_lock = asyncio.Lock()
-wmm_db_lock = asyncio.Lock()
+# background threads for database access, so our database functions don't block the event loop
+carrier_db_executor = DatabaseExecutor(constants.CARRIERS_DB_PATH, 'carriers')
+mission_db_executor = DatabaseExecutor(constants.MISSIONS_DB_PATH, 'missions')
+wmm_db_executor = DatabaseExecutor(constants.WMM_DB_PATH, 'wmm')
 
+db_executors = {
+    'carriers': carrier_db_executor,
+    'missions': mission_db_executor,
+    'wmm': wmm_db_executor
+}
 
-# dump db to .sql file
-def dump_database_test(database_name):
-    print("Called dump_database_test")
+
+# stop database threads on shutdown, letting any queued writes finish first
+def close_database_executors():
+    for name, executor in db_executors.items():
+        print(f"Closing {name} database executor")
+        executor.close()
+
+
+# copy committed pages from each database's WAL file back into the main database file
+async def checkpoint_databases():
     """
-    Dumps the database object to a .sql text file while backing up the database. Used just to get something we can
-    recreate the database from.  This will only store the last state and should periodically be committed to the repo
-    from the bot.
-    :param str database_name: The DB name to connect against.
-    :returns: None
-    :raises ValueError: if the db name is unknown
+    Runs a passive WAL checkpoint on every database. Passive checkpoints never wait on readers or writers,
+    so anything they can't copy yet is picked up by the next run.
+
+    :rtype: None
     """
-    # We only have 2 databases today, carriers and missions, though this could really just be 2 tables in a single
-    # database at some stage.
-
-    if database_name == 'missions':
-        connection = missions_conn
-    elif database_name == 'carriers':
-        connection = carriers_conn
-    elif database_name == 'wmm':
-        connection = wmm_conn
-    else:
-        raise ValueError(f'Unknown DB dump handling for: {database_name}')
+    for name, executor in db_executors.items():
+        try:
+            busy, wal_pages, checkpointed = await executor.checkpoint()
+            print(f"Checkpointed {name} database: {checkpointed}/{wal_pages} WAL pages (busy: {busy})")
+        except Exception as e:
+            print(f"Error checkpointing {name} database: {e}")
+
 
-    os.makedirs(constants.SQL_PATH, exist_ok=True)
-    with open(f'{constants.SQL_PATH}/{database_name}_dump.sql', 'w') as f:
-        for line in connection.iterdump():
-            f.write(line)
+# in-memory copy of the carriers table for fast lookups, kept in sync by our carrier write functions
+carrier_registry = CarrierRegistry()
+
+
+# background snapshots of our databases, requested whenever we're about to change something
+backup_scheduler = BackupScheduler(list(db_executors))
 
 
 # function to backup database
-def backup_database(database_name):
+async def backup_database(database_name, wait=False):
     print("Called backup_database")
     """
     Creates a backup of the requested database into .backup/db_name.datetimestamp.db
 
+    By default this only requests a backup, which is taken in the background and coalesced with any other
+    requests for the same database within constants.BACKUP_INTERVAL.
+
     :param str database_name: The database name to back up
+    :param bool wait: Take the backup now and wait for it to finish, e.g. for manual backups
     :rtype: None
     """
-    dt_file_string = get_formatted_date_string()[1]
-    print(dt_file_string)
-
-    db_path = (os.path.join(constants.DB_PATH, f'{database_name}.db'))
-    print(f"DB Path: {db_path}")
-    backup_path = (os.path.join(constants.BACKUP_DB_PATH, f'{database_name}.{dt_file_string}.db'))
-    print(f"Backup Path: {backup_path}")
-
-    shutil.copy(db_path, backup_path)
-    print(f'Backed up {database_name}.db at {dt_file_string}')
-    try:
-      dump_database_test(database_name)
-    except Exception as e:
-        print(e)
+    if wait:
+        await backup_scheduler.snapshot_now(database_name)
+    else:
+        backup_scheduler.request(database_name)
 
 
 # function to check if a given table exists in a given database
@@ -358,7 +411,7 @@ def create_missing_column(table, column, db_name, db_obj, db_conn, type):
     print(f'{column} column missing from {db_name} database, inserting...')
 
     # backup existing database
-    backup_database(table)
+    backup_scheduler.snapshot(db_name)
 
     statement = f'''ALTER TABLE {table} ADD COLUMN {column} {type}'''
 
@@ -388,6 +441,8 @@ def build_database_on_startup():
         'community_carriers': {'obj': carrier_db, 'create': community_carriers_table_create},
         'nominees': {'obj': carrier_db, 'create': nominees_table_create},
         'missions': {'obj': mission_db, 'create': missions_table_create},
+        'outbox': {'obj': mission_db, 'create': outbox_table_create},
+        'scheduled_actions': {'obj': mission_db, 'create': scheduled_actions_table_create},
         'wmm': {'obj': wmm_db, 'create': wmm_table_create}
     }
 
@@ -426,6 +481,39 @@ def build_database_on_startup():
         else:
             print(f'{column_name} exists, do nothing')
 
+    migrate_mission_params_on_startup()
+
+    reset_running_outbox_entries_on_startup()
+
+    load_carrier_registry()
+
+
+# anything the outbox was in the middle of sending when we last stopped needs sending again
+def reset_running_outbox_entries_on_startup():
+    reset = missions_conn.execute("UPDATE outbox SET status = 'pending' WHERE status = 'running'").rowcount
+    missions_conn.commit()
+    print(f"Reset {reset} interrupted outbox entries to pending" if reset else "No interrupted outbox entries")
+
+
+# convert any pickled mission_params left from older versions to our JSON format
+def migrate_mission_params_on_startup():
+    rows = missions_conn.execute("SELECT carrier, mission_params FROM missions").fetchall()
+    pickled = [row for row in rows if is_pickled_mission_params(row['mission_params'])]
+    if not pickled:
+        print("No pickled mission_params to migrate")
+        return
+
+    print(f"Migrating {len(pickled)} pickled mission_params to JSON")
+    backup_scheduler.snapshot('missions')
+    for row in pickled:
+        try:
+            serialised_mission_params = pickle.loads(row['mission_params']).to_json()
+            missions_conn.execute("UPDATE missions SET mission_params = ? WHERE carrier = ?", (serialised_mission_params, row['carrier']))
+            print(f"Migrated mission_params for {row['carrier']}")
+        except Exception as e:
+            print(f"❌ Could not migrate mission_params for {row['carrier']}, leaving it pickled: {e}")
+    missions_conn.commit()
+
 
 # populate commodities database on fresh install
 def populate_commodities_table_on_startup():
@@ -477,31 +565,23 @@ async def add_carrier_to_database(short_name, long_name, carrier_id, channel, ch
     :param int channel_id: The discord channel ID for the carrier
     :returns: None
     """
-    await carrier_db_lock.acquire()
-    try:
-        carrier_db.execute(''' INSERT INTO carriers VALUES(NULL, ?, ?, ?, ?, ?, ?, strftime('%s','now'), ?) ''',
-                           (short_name, long_name, carrier_id, channel, channel_id, owner_id, 0))
-        carriers_conn.commit()
-        print(f'Added {long_name} to database')
-    finally:
-        carrier_db_lock.release()
+    pid = await carrier_db_executor.execute(
+        ''' INSERT INTO carriers VALUES(NULL, ?, ?, ?, ?, ?, ?, strftime('%s','now'), ?) ''',
+        (short_name, long_name, carrier_id, channel, channel_id, owner_id, 0)
+    )
+    await _refresh_carrier_registry([pid])
+    print(f'Added {long_name} to database')
 
 
 # add a webhook to the database
 async def add_webhook_to_database(owner_id, webhook_url, webhook_name):
     print("Called add_webhook_to_database")
-    await carrier_db_lock.acquire()
-    print("Carrier DB locked.")
     try:
-        carrier_db.execute(''' INSERT INTO webhooks VALUES(?, ?, ?) ''',
-                        (owner_id, webhook_url, webhook_name))
-        carriers_conn.commit()
+        await carrier_db_executor.execute(''' INSERT INTO webhooks VALUES(?, ?, ?) ''',
+                                          (owner_id, webhook_url, webhook_name))
         print(f"Successfully added webhook {webhook_url} to database for {owner_id} with name {webhook_name}")
     except Exception as e:
         print(e)
-    finally:
-        carrier_db_lock.release()
-        print("Carrier DB unlocked.")
 
 
 # carrier edit function
@@ -512,11 +592,12 @@ async def _update_carrier_details_in_database(carrier_data, original_name):
     :param CarrierData carrier_data: The carrier data to write
     :param str original_name: The original carrier name, needed so we can find it in the database
     """
-    backup_database('carriers')  # backup the carriers database before going any further
+    await backup_database('carriers')  # backup the carriers database before going any further
 
-    # TODO: Write to the database
-    await carrier_db_lock.acquire()
-    try:
+    def _update(connection):
+        # note which carriers we're about to change so we can refresh them in the registry
+        updated_pids = [row['p_ID'] for row in connection.execute(
+            "SELECT p_ID FROM carriers WHERE longname LIKE (?)", (f'%{original_name}%',)).fetchall()]
 
         data = (
             carrier_data.carrier_short_name,
@@ -528,55 +609,43 @@ async def _update_carrier_details_in_database(carrier_data, original_name):
             f'%{original_name}%'
         )
         # Handy number to print out what the database connection is actually doing
-        carriers_conn.set_trace_callback(print)
-        carrier_db.execute(
+        connection.set_trace_callback(print)
+        connection.execute(
             ''' UPDATE carriers
             SET shortname=?, longname=?, cid=?, discordchannel=?, channelid=?, ownerid=?
             WHERE longname LIKE (?) ''', data
         )
+        return updated_pids
 
-        carriers_conn.commit()
-    finally:
-        carrier_db_lock.release()
+    updated_pids = await carrier_db_executor.write(_update)
+    await _refresh_carrier_registry(updated_pids)
 
 
 # update carrier last trade time
 async def _update_carrier_last_trade(pid):
-    await carrier_db_lock.acquire()
-    try:
-        carrier_db.execute(
-            ''' UPDATE carriers
-            SET lasttrade=strftime('%s','now')
-            WHERE p_ID=? ''', ( [ pid ] ))
-        carriers_conn.commit()
-    finally:
-        carrier_db_lock.release()
+    await carrier_db_executor.execute(
+        ''' UPDATE carriers
+        SET lasttrade=strftime('%s','now')
+        WHERE p_ID=? ''', ( [ pid ] ))
+    await _refresh_carrier_registry([pid])
 
 
 # update carrier cAPI flag
 async def _update_carrier_capi(pid, capi):
     print("Setting capi to %s for carrier ID %s" % ( capi, pid ))
-    await carrier_db_lock.acquire()
-    try:
-        carrier_db.execute('''
-            UPDATE carriers
-            SET capi=?
-            WHERE p_ID=?
-            ''', ( [ capi, pid ] ))
-        carriers_conn.commit()
-    finally:
-        carrier_db_lock.release()
+    await carrier_db_executor.execute('''
+        UPDATE carriers
+        SET capi=?
+        WHERE p_ID=?
+        ''', ( [ capi, pid ] ))
+    await _refresh_carrier_registry([pid])
 
 
 # function to remove a carrier
 async def delete_carrier_from_db(p_id):
     carrier = find_carrier(p_id, CarrierDbFields.p_id.name)
-    try:
-        await carrier_db_lock.acquire()
-        carrier_db.execute(f"DELETE FROM carriers WHERE p_ID = {p_id}")
-        carriers_conn.commit()
-    finally:
-        carrier_db_lock.release()
+    await carrier_db_executor.execute("DELETE FROM carriers WHERE p_ID = ?", (p_id,))
+    carrier_registry.remove(carrier.pid)
     # archive the removed carrier's image by appending date and time of deletion to it
     try:
         shutil.move(f'images/{carrier.carrier_short_name}.png',
@@ -590,47 +659,27 @@ async def delete_carrier_from_db(p_id):
 # function to remove a webhook
 async def delete_webhook_by_name(userid, webhook_name):
     print(f"Attempting to delete {userid} {webhook_name} match.")
-    try:
-        await carrier_db_lock.acquire()
-        query = f"DELETE FROM webhooks WHERE webhook_owner_id = ? AND webhook_name = ?"
-        carrier_db.execute(query, (userid, webhook_name))
-        carriers_conn.commit()
-        return print("Deleted")
-    finally:
-        carrier_db_lock.release()
+    query = f"DELETE FROM webhooks WHERE webhook_owner_id = ? AND webhook_name = ?"
+    await carrier_db_executor.execute(query, (userid, webhook_name))
+    return print("Deleted")
 
 
 # function to remove a community carrier
 async def delete_community_carrier_from_db(ownerid):
-    try:
-        await carrier_db_lock.acquire()
-        carrier_db.execute(f"DELETE FROM community_carriers WHERE ownerid = {ownerid}")
-        carriers_conn.commit()
-    finally:
-        carrier_db_lock.release()
+    await carrier_db_executor.execute("DELETE FROM community_carriers WHERE ownerid = ?", (ownerid,))
     return
 
 
 # remove a nominee from the database
 async def delete_nominee_from_db(pillarid):
-    try:
-        await carrier_db_lock.acquire()
-        carrier_db.execute(f"DELETE FROM nominees WHERE pillarid = {pillarid}")
-        carriers_conn.commit()
-    finally:
-        carrier_db_lock.release()
+    await carrier_db_executor.execute("DELETE FROM nominees WHERE pillarid = ?", (pillarid,))
     return
 
 
 # function to remove a nominee
 async def delete_nominee_by_nominator(nomid, pillarid):
     print(f"Attempting to delete {nomid} {pillarid} match.")
-    try:
-        await carrier_db_lock.acquire()
-        carrier_db.execute(f"DELETE FROM nominees WHERE nominatorid = {nomid} AND pillarid = {pillarid}")
-        carriers_conn.commit()
-    finally:
-        carrier_db_lock.release()
+    await carrier_db_executor.execute("DELETE FROM nominees WHERE nominatorid = ? AND pillarid = ?", (nomid, pillarid))
     return print("Deleted")
 
 
@@ -643,6 +692,26 @@ def _delete_all_from_database(database):
     """
     carrier_db.execute(f"DELETE FROM {database}")
     carriers_conn.commit()
+    if database == 'carriers':
+        carrier_registry.load([])
+
+
+# load the carriers table into the carrier registry
+def load_carrier_registry():
+    carrier_db.execute("SELECT * FROM carriers")
+    carrier_registry.load([CarrierData(carrier) for carrier in carrier_db.fetchall()])
+
+
+# reload specific carriers into the registry after they've been written to the database
+async def _refresh_carrier_registry(pids):
+    if not carrier_registry.loaded:
+        return # it'll get everything when it loads
+    for pid in pids:
+        carrier = await carrier_db_executor.query_one("SELECT * FROM carriers WHERE p_ID = ?", (pid,))
+        if carrier:
+            carrier_registry.add(CarrierData(carrier))
+        else:
+            carrier_registry.remove(pid)
 
 
 # function to search for a carrier
@@ -655,11 +724,13 @@ def find_carrier(searchterm, searchfield):
     :returns: A single CarrierData object
     :rtype: CarrierData
     """
-    # TODO: This needs to check an exact not a `LIKE`
-    carrier_db.execute(
-        f"SELECT * FROM carriers WHERE {searchfield} LIKE (?)", (f'%{searchterm}%',)
-        )
-    carrier_data = CarrierData(carrier_db.fetchone())
+    if not carrier_registry.loaded:
+        load_carrier_registry()
+
+    # exact match first, then fragment match for text fields; the registry holds every carrier, so this never
+    # touches the database
+    carriers = carrier_registry.search(searchterm, searchfield)
+    carrier_data = carriers[0] if carriers else CarrierData()
     print(f"FC {carrier_data.pid} is {carrier_data.carrier_long_name} {carrier_data.carrier_identifier} called by "
           f"shortname {carrier_data.carrier_short_name} with channel #{carrier_data.discord_channel} called "
           f"from find_carrier.")
@@ -677,10 +748,12 @@ def find_carriers_mult(searchterm, searchfield):
     :returns: A list of carrier data objects
     :rtype: list[CarrierData]
     """
-    carrier_db.execute(
-        f"SELECT * FROM carriers WHERE {searchfield} LIKE (?) AND shortname != ownerid", (f'%{searchterm}%',)
-    )
-    carrier_data = [CarrierData(carrier) for carrier in carrier_db.fetchall()]
+    if not carrier_registry.loaded:
+        load_carrier_registry()
+
+    # skip opt-in markers, which use the owner's ID as their shortname
+    carrier_data = [carrier for carrier in carrier_registry.search(searchterm, searchfield)
+                    if str(carrier.carrier_short_name) != str(carrier.ownerid)]
     for carrier in carrier_data:
         print(f"FC {carrier.pid} is {carrier.carrier_long_name} {carrier.carrier_identifier} called by "
               f"shortname {carrier.carrier_short_name} with channel <#{carrier.channel_id}> "
@@ -693,10 +766,10 @@ def find_opt_ins():
     """
     Returns all carriers matching the opt-in marker designation.
     """
-    carrier_db.execute(
-        f"SELECT * FROM carriers WHERE cid LIKE (?)", (f'%{constants.OPT_IN_ID}%',)
-    )
-    carrier_data = [CarrierData(carrier) for carrier in carrier_db.fetchall()]
+    if not carrier_registry.loaded:
+        load_carrier_registry()
+
+    carrier_data = carrier_registry.search(constants.OPT_IN_ID, CarrierDbFields.cid.name)
     for carrier in carrier_data:
         print(f"FC {carrier.pid} is {carrier.carrier_long_name} {carrier.carrier_identifier} called by "
               f"shortname {carrier.carrier_short_name} with channel <#{carrier.channel_id}> "
@@ -705,7 +778,7 @@ def find_opt_ins():
     return carrier_data
 
 
-def find_webhook_from_owner(ownerid):
+async def find_webhook_from_owner(ownerid):
     """
     Returns owner ID, webhook URL and webhook name matching the nominee's user ID
 
@@ -713,9 +786,8 @@ def find_webhook_from_owner(ownerid):
     :returns: A list of webhook data objects
     :rtype: list[WebhookData]
     """
-    carrier_db.execute(f"SELECT * FROM webhooks WHERE "
-                       f"webhook_owner_id = {ownerid} ")
-    webhook_data = [WebhookData(webhooks) for webhooks in carrier_db.fetchall()]
+    rows = await carrier_db_executor.query("SELECT * FROM webhooks WHERE webhook_owner_id = ?", (ownerid,))
+    webhook_data = [WebhookData(webhooks) for webhooks in rows]
     for webhooks in webhook_data:
         print(f"{webhooks.webhook_owner_id} owns {webhooks.webhook_url} called {webhooks.webhook_name}"
               f" called from find_webhook_from_owner.")
@@ -723,7 +795,7 @@ def find_webhook_from_owner(ownerid):
     return webhook_data
 
 
-def find_webhook_by_name(ownerid, name): # TODO: why doesn't this work?
+async def find_webhook_by_name(ownerid, name): # TODO: why doesn't this work?
     print("Called find_webhook_by_name")
     """
     Returns owner ID, webhook URL and webhook name matching the nominee's user ID
@@ -734,8 +806,7 @@ def find_webhook_by_name(ownerid, name): # TODO: why doesn't this work?
     """
     try:
         query = f"SELECT * FROM webhooks WHERE webhook_owner_id = ? AND webhook_name = ?"
-        carrier_db.execute(query, (ownerid, name))
-        webhook_data = WebhookData(carrier_db.fetchone())
+        webhook_data = WebhookData(await carrier_db_executor.query_one(query, (ownerid, name)))
         print(f"Found {webhook_data}")
         return webhook_data
     except Exception as e:
@@ -743,7 +814,7 @@ def find_webhook_by_name(ownerid, name): # TODO: why doesn't this work?
         return
 
 
-def find_community_carrier(searchterm, searchfield):
+async def find_community_carrier(searchterm, searchfield):
     """
     Returns channel owner and role matching the ownerid
 
@@ -752,9 +823,8 @@ def find_community_carrier(searchterm, searchfield):
     :returns: A list of community carrier data objects
     :rtype: list[CommunityCarrierData]
     """
-    carrier_db.execute(f"SELECT * FROM community_carriers WHERE "
-                       f"{searchfield} = {searchterm} ")
-    community_carrier_data = [CommunityCarrierData(community_carrier) for community_carrier in carrier_db.fetchall()]
+    rows = await carrier_db_executor.query(f"SELECT * FROM community_carriers WHERE {searchfield} = ?", (searchterm,))
+    community_carrier_data = [CommunityCarrierData(community_carrier) for community_carrier in rows]
     for community_carrier in community_carrier_data:
         print(f"{community_carrier.owner_id} owns channel {community_carrier.channel_id}"
               f" called from find_community_carrier.")
@@ -762,7 +832,7 @@ def find_community_carrier(searchterm, searchfield):
     return community_carrier_data
 
 
-def find_nominee_with_id(pillarid):
+async def find_nominee_with_id(pillarid):
     """
     Returns nominee, nominator and note matching the nominee's user ID
 
@@ -770,9 +840,8 @@ def find_nominee_with_id(pillarid):
     :returns: A list of nominees data objects
     :rtype: list[NomineesData]
     """
-    carrier_db.execute(f"SELECT * FROM nominees WHERE "
-                       f"pillarid = {pillarid} ")
-    nominees_data = [NomineesData(nominees) for nominees in carrier_db.fetchall()]
+    rows = await carrier_db_executor.query("SELECT * FROM nominees WHERE pillarid = ?", (pillarid,))
+    nominees_data = [NomineesData(nominees) for nominees in rows]
     for nominees in nominees_data:
         print(f"{nominees.pillar_id} nominated by {nominees.nom_id} for reason {nominees.note}"
               f" called from find_nominee_with_id.")
@@ -780,7 +849,7 @@ def find_nominee_with_id(pillarid):
     return nominees_data
 
 
-def find_nominator_with_id(nomid):
+async def find_nominator_with_id(nomid):
     """
     Returns nominee, nominator and note matching the nominator's user ID
 
@@ -788,9 +857,8 @@ def find_nominator_with_id(nomid):
     :returns: A list of nominees data objects
     :rtype: list[NomineesData]
     """
-    carrier_db.execute(f"SELECT * FROM nominees WHERE "
-                       f"nominatorid = {nomid} ")
-    nominees_data = [NomineesData(nominees) for nominees in carrier_db.fetchall()]
+    rows = await carrier_db_executor.query("SELECT * FROM nominees WHERE nominatorid = ?", (nomid,))
+    nominees_data = [NomineesData(nominees) for nominees in rows]
     for nominees in nominees_data:
         print(f"{nominees.nom_id} nominated {nominees.pillar_id} for reason {nominees.note}"
               f" called from find_nominee_with_id.")
@@ -799,7 +867,7 @@ def find_nominator_with_id(nomid):
 
 
 # search the mission database
-def find_mission(searchterm, searchfield):
+async def find_mission(searchterm, searchfield):
     print("called find_mission")
     """
     Searches the mission database for ongoing missions
@@ -808,9 +876,8 @@ def find_mission(searchterm, searchfield):
     :param str searchfield: the DB column to match against
     :returns: list[mission data]
     """
-    mission_db.execute(f'''SELECT * FROM missions WHERE {searchfield} LIKE (?)''',
-                        (f'%{searchterm}%',))
-    row = mission_db.fetchone()
+    row = await mission_db_executor.query_one(f'''SELECT * FROM missions WHERE {searchfield} LIKE (?)''',
+                                              (f'%{searchterm}%',))
 
     # check whether a mission exists
     if row is None:
@@ -821,14 +888,7 @@ def find_mission(searchterm, searchfield):
         mission_data = MissionData(row)
         print(f'Found mission data: {mission_data}')
 
-    # unpickle the mission_params object if it exists
-    if mission_data.mission_params:
-        print("Found mission_params, enumerating...")
-        mission_data.mission_params = pickle.loads(mission_data.mission_params)
-        mission_data.mission_params.print_values()
-    else:
-        print("No mission_params found")
-
+    # mission_params is decoded when first accessed, as many callers only need the columns above
     return mission_data
 
 
@@ -840,14 +900,10 @@ async def _update_mission_in_database(mission_params):
 
     :param mission_params The new mission data to write
     """
-    backup_database('missions')  # backup the carriers database before going any further
+    await backup_database('missions')  # backup the carriers database before going any further
 
-    # TODO: Write to the database
-    print("Getting mission db lock...")
-    await mission_db_lock.acquire()
-
-    print("Pickling mission_params...")
-    pickled_mission_params = pickle.dumps(mission_params)
+    print("Serialising mission_params...")
+    serialised_mission_params = mission_params.to_json()
 
     try:
         data = (
@@ -867,12 +923,9 @@ async def _update_mission_in_database(mission_params):
             mission_params.reddit_comment_id,
             mission_params.reddit_comment_url,
             mission_params.discord_alert_id,
-            pickled_mission_params,
+            serialised_mission_params,
             mission_params.carrier_data.carrier_long_name
         )
-        # Handy number to print out what the database connection is actually doing
-        missions_conn.set_trace_callback(print)
-
         # define our SQL update statement
         statement = """
         UPDATE missions
@@ -897,18 +950,164 @@ async def _update_mission_in_database(mission_params):
         """
 
         print("Executing update...")
-        mission_db.execute(statement, data)
-        print("Committing...")
-        missions_conn.commit()
+        await mission_db_executor.execute(statement, data)
     except Exception as e:
         print(e)
     finally:
-        print("Releasing mission_db lock")
-        mission_db_lock.release()
         print("Completed _update_mission_in_database")
         return
 
 
+"""
+Outbox
+"""
+
+
+# queue an external send
+async def add_outbox_entry(idempotency_key, kind, payload):
+    """
+    Adds an entry to the outbox, unless one with the same idempotency key already exists.
+
+    :param str idempotency_key: Identifies this send, so queueing it twice only sends it once
+    :param str kind: Which outbox handler sends it
+    :param dict payload: What the handler needs, must be JSON serialisable
+    :returns: True if the entry was added, False if it was already queued
+    :rtype: bool
+    """
+    now = datetime.now(tz=timezone.utc).timestamp()
+    added = await mission_db_executor.write(lambda connection: connection.execute(
+        ''' INSERT OR IGNORE INTO outbox (idempotency_key, kind, payload, next_attempt, created) VALUES(?, ?, ?, ?, ?) ''',
+        (idempotency_key, kind, json.dumps(payload), now, now)
+    ).rowcount)
+    return bool(added)
+
+
+# take the next outbox entry that's due
+async def claim_outbox_entry():
+    """
+    Marks the oldest due outbox entry as running and returns it. Claims go through our single writer thread,
+    so no two workers ever get the same entry.
+
+    :returns: The claimed entry, or None if nothing is due
+    :rtype: OutboxEntry
+    """
+    now = datetime.now(tz=timezone.utc).timestamp()
+
+    def _claim(connection):
+        row = connection.execute(''' SELECT * FROM outbox WHERE status = 'pending' AND next_attempt <= ? ORDER BY next_attempt, id LIMIT 1 ''',
+                                 (now,)).fetchone()
+        if row:
+            connection.execute(''' UPDATE outbox SET status = 'running' WHERE id = ? ''', (row['id'],))
+        return row
+
+    row = await mission_db_executor.write(_claim)
+    return OutboxEntry(row) if row else None
+
+
+# when the next outbox entry is due
+async def next_outbox_attempt():
+    """
+    :returns: The unix time the next pending outbox entry is due, or None if there are none
+    :rtype: float
+    """
+    row = await mission_db_executor.query_one(''' SELECT MIN(next_attempt) AS next_attempt FROM outbox WHERE status = 'pending' ''')
+    return row['next_attempt'] if row else None
+
+
+# record the result of an outbox attempt
+async def _update_outbox_entry(entry: OutboxEntry):
+    """
+    Writes an entry's status, payload and retry details back to the outbox.
+
+    :param OutboxEntry entry: The entry to update
+    """
+    await mission_db_executor.execute(
+        ''' UPDATE outbox SET status = ?, payload = ?, attempts = ?, next_attempt = ?, last_error = ? WHERE id = ? ''',
+        (entry.status, json.dumps(entry.payload), entry.attempts, entry.next_attempt, entry.last_error, entry.entry_id)
+    )
+
+
+# clear old finished outbox entries
+async def prune_outbox(older_than):
+    """
+    Deletes sent and failed outbox entries created before a given time.
+
+    :param float older_than: Unix time
+    :returns: Number of entries deleted
+    :rtype: int
+    """
+    return await mission_db_executor.write(lambda connection: connection.execute(
+        ''' DELETE FROM outbox WHERE status IN ('sent', 'failed') AND created < ? ''', (older_than,)
+    ).rowcount)
+
+
+"""
+Scheduled actions
+"""
+
+
+# schedule a delayed action
+async def add_scheduled_action(idempotency_key, kind, payload, due, replace=True):
+    """
+    Stores an action to be run at a given time.
+
+    :param str idempotency_key: Identifies this action, so there's only ever one of it scheduled
+    :param str kind: Which scheduled action handler runs it
+    :param dict payload: What the handler needs, must be JSON serialisable
+    :param float due: Unix time the action should run at
+    :param bool replace: If the action is already scheduled, move it to this time; otherwise leave it as it is
+    :returns: True if the action was stored, False if it was already scheduled and replace was False
+    :rtype: bool
+    """
+    now = datetime.now(tz=timezone.utc).timestamp()
+    if replace:
+        sql = ''' INSERT INTO scheduled_actions (idempotency_key, kind, payload, due, created) VALUES(?, ?, ?, ?, ?)
+                  ON CONFLICT(idempotency_key) DO UPDATE SET kind = excluded.kind, payload = excluded.payload, due = excluded.due '''
+    else:
+        sql = ''' INSERT OR IGNORE INTO scheduled_actions (idempotency_key, kind, payload, due, created) VALUES(?, ?, ?, ?, ?) '''
+    added = await mission_db_executor.write(lambda connection: connection.execute(
+        sql, (idempotency_key, kind, json.dumps(payload), due, now)
+    ).rowcount)
+    return bool(added)
+
+
+# find one scheduled action
+async def find_scheduled_action(idempotency_key):
+    """
+    :param str idempotency_key: The action's key
+    :returns: The action, or None if it isn't scheduled
+    :rtype: ScheduledAction
+    """
+    row = await mission_db_executor.query_one(''' SELECT * FROM scheduled_actions WHERE idempotency_key = ? ''', (idempotency_key,))
+    return ScheduledAction(row) if row else None
+
+
+# every scheduled action
+async def list_scheduled_actions():
+    """
+    :returns: Every scheduled action, soonest first
+    :rtype: list[ScheduledAction]
+    """
+    rows = await mission_db_executor.query(''' SELECT * FROM scheduled_actions ORDER BY due ''')
+    return [ScheduledAction(row) for row in rows]
+
+
+# remove an action once it's been run
+async def delete_scheduled_action(idempotency_key, due):
+    """
+    Deletes a scheduled action, unless it's been moved to a different time since it was read.
+
+    :param str idempotency_key: The action's key
+    :param float due: The due time the action was run for
+    :returns: True if the action was deleted
+    :rtype: bool
+    """
+    deleted = await mission_db_executor.write(lambda connection: connection.execute(
+        ''' DELETE FROM scheduled_actions WHERE idempotency_key = ? AND due = ? ''', (idempotency_key, due)
+    ).rowcount)
+    return bool(deleted)
+
+
 # check if a carrier is for a registered PTN fleet carrier
 async def _is_carrier_channel(carrier_data):
     if not carrier_data.discord_channel:
@@ -926,11 +1125,11 @@ async def find_commodity(mission_params, interaction):
 
     print(f'Searching for commodity against match "{mission_params.commodity_search_term}" requested by {interaction.user.display_name}')
 
-    carrier_db.execute(
+    rows = await carrier_db_executor.query(
         f"SELECT * FROM commodities WHERE commodity LIKE (?)",
         (f'%{mission_params.commodity_search_term}%',))
 
-    commodities = [Commodity(commodity) for commodity in carrier_db.fetchall()]
+    commodities = [Commodity(commodity) for commodity in rows]
     commodity = None
     if not commodities:
         mission_params.returnflag = False 
@@ -998,7 +1197,7 @@ async def find_commodity(mission_params, interaction):
 
 
 # WMM find carrier
-def find_wmm_carrier(searchterm, searchfield):
+async def find_wmm_carrier(searchterm, searchfield):
     print("called find_wmm_carrier for %s (%s)" % ( searchterm, searchfield ))
     """
     Searches the wmm database for a single matching entry
@@ -1007,9 +1206,8 @@ def find_wmm_carrier(searchterm, searchfield):
     :param str searchfield: the DB column to match against
     :returns: class instance WMMData
     """
-    wmm_db.execute(f'''SELECT * FROM wmm WHERE {searchfield} LIKE (?)''',
-                        (f'%{searchterm}%',))
-    row = wmm_db.fetchone()
+    row = await wmm_db_executor.query_one(f'''SELECT * FROM wmm WHERE {searchfield} LIKE (?)''',
+                                          (f'%{searchterm}%',))
 
     # check whether row exists
     if row is None:
@@ -1023,7 +1221,7 @@ def find_wmm_carrier(searchterm, searchfield):
 
 
 # wmm fetch all carriers
-def _fetch_wmm_carriers():
+async def _fetch_wmm_carriers():
     """
     Fetches all actively tracked WMM carriers from the DB.
 
@@ -1031,10 +1229,10 @@ def _fetch_wmm_carriers():
     """
     print("Called _fetch_wmm_carriers")
     sql = "SELECT * FROM wmm"
-    wmm_db.execute(sql)
+    rows = await wmm_db_executor.query(sql)
 
     # instantiate into WMMData
-    wmm_carriers = [WMMData(wmm_carrier) for wmm_carrier in wmm_db.fetchall()]
+    wmm_carriers = [WMMData(wmm_carrier) for wmm_carrier in rows]
 
     return wmm_carriers
 
@@ -1048,24 +1246,14 @@ async def _add_to_wmm_db(carrier, cid, location, ownerid, capi):
     values = [carrier, cid, location, ownerid, None, capi]
 
     # write to database
-    try:
-        await wmm_db_lock.acquire()
-        wmm_db.execute(sql, values)
-        wmm_conn.commit()
-    finally:
-        wmm_db_lock.release()
+    await wmm_db_executor.execute(sql, values)
 
 
 # WMM remove carrier
 async def _remove_from_wmm_db(cid):
     print("Called _remove_from_wmm_db for %s" % ( cid ))
-    try:
-        await wmm_db_lock.acquire()
-        sql = "DELETE FROM wmm WHERE cid = (?)"
-        wmm_db.execute(sql, (cid,))
-        wmm_conn.commit()
-    finally:
-        wmm_db_lock.release()
+    sql = "DELETE FROM wmm WHERE cid = (?)"
+    await wmm_db_executor.execute(sql, (cid,))
     return print("Deleted")
 
 
@@ -1101,28 +1289,20 @@ async def _update_wmm_carrier(wmm_data: WMMData):
     # notification status is a list, so we need to transform it into json before storing it in the db
     notification_status = json.dumps(wmm_data.notification_status) if wmm_data.notification_status else None
 
-    await wmm_db_lock.acquire()
-
-    try:
-
-        values = (
-            wmm_data.carrier_location,
-            notification_status,
-            wmm_data.capi,
-            wmm_data.carrier_identifier
-        )
-
-        sql = '''
-            UPDATE wmm
-            SET location = ?,
-                notify = ?,
-                capi = ?
-            WHERE cid = ?
-        '''
+    values = (
+        wmm_data.carrier_location,
+        notification_status,
+        wmm_data.capi,
+        wmm_data.carrier_identifier
+    )
 
-        wmm_db.execute(sql, values)
-        wmm_conn.commit()
-        print("WMM carrier updated.")
+    sql = '''
+        UPDATE wmm
+        SET location = ?,
+            notify = ?,
+            capi = ?
+        WHERE cid = ?
+    '''
 
-    finally:
-        wmm_db_lock.release()
\ No newline at end of file
+    await wmm_db_executor.execute(sql, values)
+    print("WMM carrier updated.")
\ No newline at end of file
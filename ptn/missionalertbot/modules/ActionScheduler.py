@@ -0,0 +1,178 @@
+"""
+ActionScheduler.py
+
+Runs delayed actions, such as deleting a mission channel a while after its mission ends, without a sleeping
+coroutine for each one.
+
+Actions are stored in the scheduled_actions table of the missions database with the unix time they're due, so a
+restart carries on with the time that was left rather than starting every timer again. A single dispatcher keeps
+the due times in a heap and sleeps until the soonest one, or until a new action is scheduled. Each action has an
+idempotency key, so there's only ever one of it scheduled: scheduling it again moves it, or leaves it be.
+
+Each kind of action has a handler registered with @scheduled_action_handler. A handler is given the action's
+payload. Actions are only removed from the database once their handler has finished, so one interrupted by a
+restart is run again on startup; handlers should be safe to run twice.
+
+Depends on: constants, database
+"""
+
+# import libraries
+import asyncio
+from datetime import datetime, timezone
+import heapq
+import traceback
+
+# import local constants
+import ptn.missionalertbot.constants as constants
+
+# import local modules
+from ptn.missionalertbot.database.database import add_scheduled_action, find_scheduled_action, list_scheduled_actions, delete_scheduled_action
+
+
+# kind: async handler function taking the action's payload
+scheduled_action_handlers = {}
+
+
+def scheduled_action_handler(kind):
+    """
+    Register the function that runs a kind of scheduled action.
+
+    :param str kind: The action kind
+    """
+    def register(function):
+        scheduled_action_handlers[kind] = function
+        return function
+    return register
+
+
+class ActionScheduler:
+
+    def __init__(self):
+        """
+        Class represents the dispatcher running our scheduled actions when they're due.
+        """
+        self._heap = [] # (due, idempotency_key), may hold stale entries for actions since moved or run
+        self._running = {} # idempotency_key: asyncio.Task
+        self._task = None
+        self._wake = asyncio.Event()
+
+
+    def start(self):
+        """
+        Start the dispatcher, if it isn't running already. It picks up everything already in the database.
+        """
+        if self._task and not self._task.done():
+            return
+        print("Starting action scheduler")
+        self._task = asyncio.create_task(self._dispatch())
+
+
+    async def stop(self):
+        """
+        Stop the dispatcher on shutdown. Anything not yet run, or interrupted, is run after the next startup.
+        """
+        tasks = ([self._task] if self._task else []) + list(self._running.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+        self._running = {}
+
+
+    async def schedule(self, idempotency_key, kind, payload, delay, replace=True):
+        """
+        Schedule an action to run after a delay.
+
+        :param str idempotency_key: Identifies this action, so there's only ever one of it scheduled
+        :param str kind: Which handler runs it
+        :param dict payload: What the handler needs, must be JSON serialisable
+        :param float delay: Seconds from now to run it
+        :param bool replace: If the action is already scheduled, move it to the new time; otherwise leave it as it is
+        :returns: True if it was scheduled, False if it already was and replace was False
+        :rtype: bool
+        """
+        due = datetime.now(tz=timezone.utc).timestamp() + delay
+        scheduled = await add_scheduled_action(idempotency_key, kind, payload, due, replace)
+        if scheduled:
+            print(f"Scheduled {idempotency_key} in {int(delay)} seconds")
+            heapq.heappush(self._heap, (due, idempotency_key))
+            self._wake.set()
+        else:
+            print(f"{idempotency_key} is already scheduled")
+        return scheduled
+
+
+    async def _dispatch(self):
+        try:
+            actions = await list_scheduled_actions()
+            print(f"Resuming {len(actions)} scheduled actions")
+            for action in actions:
+                heapq.heappush(self._heap, (action.due, action.idempotency_key))
+        except Exception as e:
+            print(f"Couldn't load scheduled actions: {e}")
+            traceback.print_exc()
+
+        while True:
+            try:
+                now = datetime.now(tz=timezone.utc).timestamp()
+                while self._heap and self._heap[0][0] <= now:
+                    due, key = heapq.heappop(self._heap)
+                    if key in self._running:
+                        continue # it'll check for a new due time when it's done
+                    self._running[key] = asyncio.create_task(self._run(key))
+
+                delay = constants.SCHEDULER_MAX_SLEEP
+                if self._heap:
+                    delay = min(delay, max(0, self._heap[0][0] - now))
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # never let a hiccup kill the dispatcher
+                print(f"Action scheduler error: {e}")
+                traceback.print_exc()
+                await asyncio.sleep(constants.SCHEDULER_MAX_SLEEP)
+
+
+    async def _run(self, key):
+        try:
+            action = await find_scheduled_action(key)
+            if not action:
+                return # already run
+            if action.due > datetime.now(tz=timezone.utc).timestamp():
+                heapq.heappush(self._heap, (action.due, key)) # moved to later since this entry was pushed
+                return
+
+            handler = scheduled_action_handlers.get(action.kind)
+            print(f"⏰ Running scheduled action {key}")
+            try:
+                if handler is None:
+                    raise LookupError(f"No scheduled action handler for {action.kind}")
+                await handler(action.payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # handlers report their own errors, so we don't retry
+                print(f"❌ Scheduled action {key} failed: {e}")
+                traceback.print_exc()
+
+            if not await delete_scheduled_action(key, action.due):
+                # scheduled again while it ran, so run it again at the new time
+                action = await find_scheduled_action(key)
+                if action:
+                    heapq.heappush(self._heap, (action.due, key))
+                    self._wake.set()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Action scheduler error running {key}: {e}")
+            traceback.print_exc()
+        finally:
+            self._running.pop(key, None)
+
+
+scheduler = ActionScheduler()
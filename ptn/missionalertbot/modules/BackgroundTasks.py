@@ -14,6 +14,7 @@ if __name__ == "__main__":
 # import libraries
 import asyncio
 from collections import defaultdict, Counter
+from contextlib import aclosing
 from datetime import datetime, timezone, timedelta
 import json
 import traceback
@@ -25,7 +26,6 @@ from discord.ext import tasks
 
 # import local classes
 from ptn.missionalertbot.classes.CarrierData import CarrierData
-from ptn.missionalertbot.classes.MissionData import MissionData
 from ptn.missionalertbot.classes.WMMData import WMMData
 
 # import local constants
@@ -34,10 +34,11 @@ from ptn.missionalertbot.constants import get_reddit, reddit_channel, sub_reddit
     bot_spam_channel, cco_color_role, commodities_wmm, channel_cco_wmm_supplies, channel_wmm_stock
 
 # import local modules
-from ptn.missionalertbot.database.database import CarrierDbFields, carrier_db, mission_db, find_carrier, bot, _fetch_wmm_carriers, \
-    _update_wmm_carrier, _update_carrier_capi
+from ptn.missionalertbot.database.database import carrier_db_executor, bot, _fetch_wmm_carriers, \
+    _update_wmm_carrier, _update_carrier_capi, checkpoint_databases
 from ptn.missionalertbot.modules.helpers import clear_history
-from ptn.missionalertbot.modules.StockHelpers import capi, get_fc_stock, chunk, notify_wmm_owner
+from ptn.missionalertbot.modules.RedditCommentRouter import comment_router
+from ptn.missionalertbot.modules.StockHelpers import fetch_wmm_stock, chunk, notify_wmm_owner, market_cache
 
 
 # monitor reddit comments
@@ -52,6 +53,8 @@ async def _monitor_reddit_comments():
             # establish a comment stream to the subreddit using async praw
             reddit = await get_reddit()
             subreddit = await reddit.subreddit(sub_reddit())
+            # catch up on anything missed while the stream was down
+            await comment_router.load()
             async for comment in subreddit.stream.comments(skip_existing=True):
                 print(f"New reddit comment: {comment}. Is_submitter is {comment.is_submitter}")
                 # ignore comments from the bot / post author
@@ -59,39 +62,30 @@ async def _monitor_reddit_comments():
                     # log some data
                     print(f"{comment.author} wrote:\n {comment.body}\nAt: {comment.permalink}\nIn: {comment.submission}")
 
-                    # get a submission object so we can interrogate it for the parent post title
-                    submission = await reddit.submission(comment.submission)
+                    # find the mission and post title in memory
+                    mission, title = await comment_router.route(comment, reddit)
 
-                    # lookup the parent post ID with the mission database
-                    mission_db.execute(f"SELECT * FROM missions WHERE "
-                                    f"reddit_post_id = '{comment.submission}' ")
+                    if not mission:
+                        print("No active mission for this post, mission must be complete.")
 
-                    print('DB command ran, go fetch the result')
-                    mission_data = MissionData(mission_db.fetchone())
-
-                    if not mission_data:
-                        print("No match in mission DB, mission must be complete.")
-
-                        embed = discord.Embed(title=f"{submission.title}",
+                        content = None
+                        embed = discord.Embed(title=f"{title}",
                                             description=f"This mission is **COMPLETED**.\n\nComment by **{comment.author}**\n{comment.body}"
                                                         f"\n\nTo view this comment click here:\nhttps://www.reddit.com{comment.permalink}",
                                                         color=constants.EMBED_COLOUR_QU)
 
-                    elif mission_data:
-                        # mission is active, we'll get info from the db and ping the CCO
-                        print(f'Found mission data: {mission_data}')
-
-                        # now we need to lookup the carrier data in the db
-                        carrier_data = find_carrier(mission_data.carrier_name, CarrierDbFields.longname.name)
+                    else:
+                        # mission is active, ping the CCO
+                        print(f"Found mission for {mission['carrier']}")
 
                         # We can't easily moderate Reddit comments so we'll post it to a CCO-only channel
-
-                        await comment_channel.send(f"<@{carrier_data.ownerid}>, your Reddit trade post has received a new comment:")
-                        embed = discord.Embed(title=f"{submission.title}",
+                        content = f"<@{mission['owner_id']}>, your Reddit trade post has received a new comment:"
+                        embed = discord.Embed(title=f"{title}",
                                             description=f"This mission is **IN PROGRESS**.\n\nComment by **{comment.author}**\n{comment.body}"
                                                         f"\n\nTo view this comment click here:\nhttps://www.reddit.com{comment.permalink}",
                                                         color=constants.EMBED_COLOUR_REDDIT)
-                    await comment_channel.send(embed=embed)
+                    # one message per comment, so busy days don't queue us up behind Discord's rate limit
+                    await comment_channel.send(content=content, embed=embed)
                     print("Sent comment to channel")
         except Exception as e:
             print(f"Error while monitoring {sub_reddit()} for comments: {e}")
@@ -117,13 +111,13 @@ async def lasttrade_cron():
         lasttrade_max = now - timedelta(days=28)
         # get carriers who last traded >28 days ago
         # for owners with multiple carriers look at only the most recently used
-        carrier_db.execute(f'''
+        rows = await carrier_db_executor.query('''
                             SELECT p_ID, shortname, ownerid, lasttrade
                             FROM carriers c1
                             WHERE lasttrade = (SELECT MAX(lasttrade) FROM carriers c2 WHERE c1.ownerid = c2.ownerid)
-                            and lasttrade < {int(lasttrade_max.timestamp())}
-                            ''')
-        carriers = [CarrierData(carrier) for carrier in carrier_db.fetchall()]
+                            and lasttrade < ?
+                            ''', (int(lasttrade_max.timestamp()),))
+        carriers = [CarrierData(carrier) for carrier in rows]
         for carrier_data in carriers:
             # check roles on owners, remove/add as needed.
             last_traded = datetime.fromtimestamp(carrier_data.lasttrade).strftime('%Y-%m-%d %H:%M:%S')
@@ -155,6 +149,14 @@ async def lasttrade_cron():
         pass
 
 
+# WAL checkpoint task loop:
+# Periodically copy committed pages from the WAL files back into the databases so the WAL files don't keep growing.
+# The interval is set from settings.txt when the loop is started.
+@tasks.loop(seconds=300)
+async def wal_checkpoint_task():
+    await checkpoint_databases()
+
+
 # function to start WMM loop
 async def start_wmm_task():
     if wmm_stock.is_running():
@@ -177,7 +179,7 @@ async def wmm_stock(message, wmm_channel, ccochannel):
 
     #print(f"wmm_stock function start")
     # retrieve all WMM carriers
-    wmm_carriers = _fetch_wmm_carriers()
+    wmm_carriers = await _fetch_wmm_carriers()
 
     carrier: WMMData
 
@@ -199,153 +201,158 @@ async def wmm_stock(message, wmm_channel, ccochannel):
     wmm_stock = defaultdict(lambda: defaultdict(list))
     wmm_station_stock = defaultdict(lambda: defaultdict(Counter))
 
-    for carrier in wmm_carriers:
-        print(f"Interrogating {carrier} for stock...")
-        carrier_has_stock = False
-        # load our notification status as a list so we can use it later
-        notification_status = json.loads(carrier.notification_status) if carrier.notification_status else []
-        if carrier.capi:
-            print(f"Calling CAPI for {carrier.carrier_name}")
-            capi_response = capi(carrier.carrier_identifier)
-            stn_data = capi_response.json()
-
-            print(f"capi response: {capi_response.status_code}")
-            if capi_response.status_code != 200:
-                # TODO handle missing carriers, auth errors etc.
-                print(f"Error from CAPI for {carrier.carrier_identifier}: {capi_response.status_code} - {stn_data}")
-                if capi_response.status_code == 500:
-                    # this is an internal stockbot api error, dont re-auth for this.
-                    print(f"Internal stockbot API error, someone check the logs")
+    # fetch all carriers concurrently and process each one as its market data arrives
+    async with aclosing(fetch_wmm_stock(wmm_carriers)) as wmm_results:
+        async for index, carrier, capi_status, capi_data, inara_data in wmm_results:
+            print(f"Interrogating {carrier} for stock...")
+            carrier_has_stock = False
+            # load our notification status as a list so we can use it later
+            notification_status = json.loads(carrier.notification_status) if carrier.notification_status else []
+            if carrier.capi:
+                stn_data = capi_data
+
+                print(f"capi response: {capi_status}")
+                if capi_status is None:
+                    # the request itself failed, details are logged by the fetch engine
                     continue
-                elif capi_response.status_code == 418:
-                    # capi is down for maintenance.
-                    await clear_history(wmm_channel)
-                    message = f"Bleep Bloop: Frontier API is down for maintenance, unable to retrieve stocks for all carriers. Retrying in 60 seconds."
-                    await wmm_channel.send(message)
-                    await asyncio.sleep(60)
-                    return
-                elif capi_response.status_code == 400 or capi_response.status_code == 401:
-                    print(f"cAPI auth failed for {carrier.carrier_name}")
-
-                    # User needs to re-auth. (400 = EGS, 401 = Expired Token)
-
-                    # remove CAPI flag from databases
-                    carrier.capi = 0
-                    await _update_wmm_carrier(carrier)
-                    await _update_carrier_capi(carrier.carrier_identifier, 0)
-
-                    embed = discord.Embed(
-                        description=f"<@{bot.user.id}> was unable to retrieve stock levels for {carrier.carrier_name} ({carrier.carrier_identifier}) from the Frontier API. "
-                                    "Please use `/cco capi enable` to re-enable authentication for this fleet carrier. Inara will be used to fetch stock levels until cAPI is re-enabled.",
-                        color = constants.EMBED_COLOUR_WARNING
-                    )
-
-                    message = f"<@{carrier.carrier_owner} Unable to send you a direct message relating to WMM tracking status. " \
-                              f"Your Frontier API authentication has expired for {carrier.carrier_name} ({carrier.carrier_identifier}). " \
-                              f"Please enable direct messages from <@{bot.user.id}> and use `/cco capi enable` to proceed."
-
-                    # notify the owner
-                    await notify_wmm_owner(carrier, embed, message)
+                elif capi_status != 200:
+                    # TODO handle missing carriers, auth errors etc.
+                    print(f"Error from CAPI for {carrier.carrier_identifier}: {capi_status} - {stn_data}")
+                    if capi_status == 500:
+                        # this is an internal stockbot api error, dont re-auth for this.
+                        print(f"Internal stockbot API error, someone check the logs")
+                        continue
+                    elif capi_status == 418:
+                        # capi is down for maintenance.
+                        await clear_history(wmm_channel)
+                        message = f"Bleep Bloop: Frontier API is down for maintenance, unable to retrieve stocks for all carriers. Retrying in 60 seconds."
+                        await wmm_channel.send(message)
+                        await asyncio.sleep(60)
+                        return
+                    elif capi_status == 400 or capi_status == 401:
+                        print(f"cAPI auth failed for {carrier.carrier_name}")
+
+                        # User needs to re-auth. (400 = EGS, 401 = Expired Token)
+
+                        # remove CAPI flag from databases
+                        carrier.capi = 0
+                        await _update_wmm_carrier(carrier)
+                        await _update_carrier_capi(carrier.carrier_identifier, 0)
+
+                        embed = discord.Embed(
+                            description=f"<@{bot.user.id}> was unable to retrieve stock levels for {carrier.carrier_name} ({carrier.carrier_identifier}) from the Frontier API. "
+                                        "Please use `/cco capi enable` to re-enable authentication for this fleet carrier. Inara will be used to fetch stock levels until cAPI is re-enabled.",
+                            color = constants.EMBED_COLOUR_WARNING
+                        )
+
+                        message = f"<@{carrier.carrier_owner} Unable to send you a direct message relating to WMM tracking status. " \
+                                  f"Your Frontier API authentication has expired for {carrier.carrier_name} ({carrier.carrier_identifier}). " \
+                                  f"Please enable direct messages from <@{bot.user.id}> and use `/cco capi enable` to proceed."
+
+                        # notify the owner
+                        await notify_wmm_owner(carrier, embed, message)
                     
+                    else:
+                        # all other unknown errors.
+                        print(f"Unknown error from CAPI, see above for details.")
+                        continue
                 else:
-                    # all other unknown errors.
-                    print(f"Unknown error from CAPI, see above for details.")
+                    carrier_name = f"**{carrier.carrier_name} ({carrier.carrier_identifier})**"
+                    market_updated = ''
+
+            # this catches the case where we remove the cAPI flag above if auth fails.
+            # the fetch engine has already retrieved Inara data for this case.
+            if not carrier.capi:
+                stn_data = inara_data
+                if not stn_data:
+                    print(f"no inara market data for {carrier.carrier_identifier}")
                     continue
-            else:
-                carrier_name = f"**{carrier.carrier_name} ({carrier.carrier_identifier})**"
-                market_updated = ''
-
-        # this catches the case where we remove the cAPI flag above if auth fails.
-        if not carrier.capi:
-            stn_data = get_fc_stock(carrier.carrier_identifier, 'inara')
-            if not stn_data:
-                print(f"no inara market data for {carrier.carrier_identifier}")
+                carrier_name = stn_data['full_name'].upper()
+                stn_data['currentStarSystem'] = stn_data['name'].title()
+                stn_data['market'] = {'commodities': stn_data['commodities']}
+                try:
+                    utc_time = datetime.strptime(stn_data['market_updated'].split('(')[1][0:-1], "%d %b %Y, %I:%M%p")
+                    market_updated = "(As of <t:%d:R>)" % utc_time.timestamp()
+                except:
+                    market_updated = "(As of %s)" % stn_data['market_updated']
+                    pass
+
+            if 'market' not in stn_data:
+                print(f"No market data for {carrier.carrier_identifier}")
                 continue
-            carrier_name = stn_data['full_name'].upper()
-            stn_data['currentStarSystem'] = stn_data['name'].title()
-            stn_data['market'] = {'commodities': stn_data['commodities']}
-            try:
-                utc_time = datetime.strptime(stn_data['market_updated'].split('(')[1][0:-1], "%d %b %Y, %I:%M%p")
-                market_updated = "(As of <t:%d:R>)" % utc_time.timestamp()
-            except:
-                market_updated = "(As of %s)" % stn_data['market_updated']
-                pass
-
-        if 'market' not in stn_data:
-            print(f"No market data for {carrier.carrier_identifier}")
-            continue
-
-        current_system = stn_data['currentStarSystem']
-        current_station = carrier.carrier_location
-        # populate active WMM systems
-        wmm_stations.add((current_system, current_station))
-
-        # now we interrogate the carrier's stock levels
-        com_data = stn_data['market']['commodities']
-        print("Market data for %s: %s" % ( carrier.carrier_name, com_data ))
-
-        # check for if market is empty
-        if not com_data:
-            # TODO: how should this look?
-            content[(current_system, current_station)].append("**%s** - %s (%s) has no current market data. please visit the carrier with EDMC running" % (
-                carrier.carrier_name, current_system, current_station)
-            )
-            continue
 
-        # iterate through commodities
-        for com in com_data:
-            # skip if not a WMM commodity
-            if com['name'].title() not in commodities_wmm:
+            current_system = stn_data['currentStarSystem']
+            current_station = carrier.carrier_location
+            # populate active WMM systems
+            wmm_stations.add((current_system, current_station))
+
+            # now we interrogate the carrier's stock levels
+            com_data = stn_data['market']['commodities']
+            print("Market data for %s: %s" % ( carrier.carrier_name, com_data ))
+
+            # check for if market is empty
+            if not com_data:
+                # TODO: how should this look?
+                content[(current_system, current_station)].append("**%s** - %s (%s) has no current market data. please visit the carrier with EDMC running" % (
+                    carrier.carrier_name, current_system, current_station)
+                )
                 continue
 
-            # if carrier has stock of the commodity
-            if com['stock'] == 0:
-                continue
-            print("Found stock for %s" % (com['name']))
-            carrier_has_stock = True
-            wmm_station_stock[current_system][current_station][com['name'].lower()] += int(com['stock'])
-
-            low_stock_msg = ''
-            # if commodity stock is low 
-            if int(com['stock']) < 1000:
-                low_stock_msg = " - LOW STOCK"
-
-                # Notify the owner once per commodity per wmm_tracking session.
-                print("Notification status: %s" % (notification_status))
-                if com['name'] not in notification_status:
-                    print(f"Generating low stock warning for {carrier.carrier_name} to DM to owner")
+            # iterate through commodities
+            for com in com_data:
+                # skip if not a WMM commodity
+                if com['name'].title() not in commodities_wmm:
+                    continue
+
+                # if carrier has stock of the commodity
+                if com['stock'] == 0:
+                    continue
+                print("Found stock for %s" % (com['name']))
+                carrier_has_stock = True
+                wmm_station_stock[current_system][current_station][com['name'].lower()] += int(com['stock'])
+
+                low_stock_msg = ''
+                # if commodity stock is low 
+                if int(com['stock']) < 1000:
+                    low_stock_msg = " - LOW STOCK"
+
+                    # Notify the owner once per commodity per wmm_tracking session.
+                    print("Notification status: %s" % (notification_status))
+                    if com['name'] not in notification_status:
+                        print(f"Generating low stock warning for {carrier.carrier_name} to DM to owner")
                     
-                    embed = discord.Embed(
-                        description=f"📉 Your fleet carrier {carrier.carrier_name} ({carrier.carrier_identifier}) is low on %s - %s remaining." 
-                                        % ( com['name'], com['stock'] ),
-                        color=constants.EMBED_COLOUR_WARNING
-                    )
-
-                    message = f"<@{carrier.carrier_owner}>: Your fleet carrier {carrier.carrier_name} ({carrier.carrier_identifier}) is low on %s - %s remaining.\n\n" \
-                                f"*Please enable direct messages from <@{bot.user.id}> to receive these alerts via DM.*" % ( com['name'], com['stock'] )
+                        embed = discord.Embed(
+                            description=f"📉 Your fleet carrier {carrier.carrier_name} ({carrier.carrier_identifier}) is low on %s - %s remaining." 
+                                            % ( com['name'], com['stock'] ),
+                            color=constants.EMBED_COLOUR_WARNING
+                        )
+
+                        message = f"<@{carrier.carrier_owner}>: Your fleet carrier {carrier.carrier_name} ({carrier.carrier_identifier}) is low on %s - %s remaining.\n\n" \
+                                    f"*Please enable direct messages from <@{bot.user.id}> to receive these alerts via DM.*" % ( com['name'], com['stock'] )
                     
-                    await notify_wmm_owner(carrier, embed, message)
+                        await notify_wmm_owner(carrier, embed, message)
 
-                    # tell the db we've notified for this commodity
-                    if not notification_status:
-                        notification_status = []
+                        # tell the db we've notified for this commodity
+                        if not notification_status:
+                            notification_status = []
 
-                    notification_status.append(com['name'])
-                    carrier.notification_status = notification_status
+                        notification_status.append(com['name'])
+                        carrier.notification_status = notification_status
 
-                    await _update_wmm_carrier(carrier)
+                        await _update_wmm_carrier(carrier)
 
-            wmm_stock[(current_system, current_station)][com['name']].append(
-                "%s x %s - %s (%s) - **%s** - Price: %s %s %s" % 
-                (com['name'], format(com['stock'], ','), current_system.upper(), current_station, carrier_name, format(com['buyPrice'], ','), low_stock_msg, market_updated)
-            )
+                # results arrive in completion order, so keep the carrier's index to sort on later
+                wmm_stock[(current_system, current_station)][com['name']].append((index,
+                    "%s x %s - %s (%s) - **%s** - Price: %s %s %s" % 
+                    (com['name'], format(com['stock'], ','), current_system.upper(), current_station, carrier_name, format(com['buyPrice'], ','), low_stock_msg, market_updated)
+                ))
 
-        # no stock at all
-        if not carrier_has_stock:
-            wmm_stock[(current_system, current_station)][constants.wmm_no_stock_key].append(
-                "**%s** - %s (%s) has no stock of any WMM commodity! %s" %
-                (carrier_name, current_system.upper(), current_station, market_updated)
-            )
+            # no stock at all
+            if not carrier_has_stock:
+                wmm_stock[(current_system, current_station)][constants.wmm_no_stock_key].append((index,
+                    "**%s** - %s (%s) has no stock of any WMM commodity! %s" %
+                    (carrier_name, current_system.upper(), current_station, market_updated)
+                ))
 
     for (system, station) in wmm_stations:
         content[(system, station)].append('-')
@@ -353,7 +360,7 @@ async def wmm_stock(message, wmm_channel, ccochannel):
             content[(system, station)].append(f"Could not find any carriers with stock in {system.upper()} ({station})")
         else:
             for _commodity, messages in sorted(wmm_stock[(system, station)].items()):
-                content[(system, station)] += messages
+                content[(system, station)] += [msg for _index, msg in sorted(messages)]
 
     try:
         wmm_updated = "<t:%d:R>" % datetime.now().timestamp()
@@ -385,6 +392,7 @@ async def wmm_stock(message, wmm_channel, ccochannel):
 
     print("Current list of stations:")
     print(wmm_station_stock)
+    print(market_cache)
 
     for system in sorted(wmm_station_stock):
         for station in sorted(wmm_station_stock[system]):
@@ -0,0 +1,98 @@
+"""
+ChannelIndex.py
+
+Finds mission channels by name without looping over a category's channels.
+
+The index maps channel names to channels for the categories mission channels live in (trade carriers and training).
+It's built from the guild cache when we connect and kept up to date from channel create, delete and update events,
+which GeneralCommands passes on to it.
+
+Depends on: constants
+"""
+
+# import discord.py
+import discord
+
+# import local constants
+from ptn.missionalertbot.constants import bot, trade_cat, training_cat
+
+
+class ChannelIndex:
+
+    def __init__(self):
+        """
+        Class represents the channels of our mission categories, indexed by name.
+        """
+        self.categories = {} # category ID: {channel name: {channel ID: channel}}
+
+
+    def build(self):
+        """
+        Index the mission categories from scratch, e.g. once we've connected.
+        """
+        self.categories = {}
+        for category_id in [trade_cat(), training_cat()]:
+            category = bot.get_channel(category_id)
+            if not category:
+                continue
+            self.categories[category_id] = {}
+            for channel in category.channels:
+                self.add(channel)
+        print(f"Indexed {sum(len(names) for names in self.categories.values())} channel names in {len(self.categories)} categories")
+
+
+    def find(self, category: discord.CategoryChannel, name):
+        """
+        Find a channel in a category by its name.
+
+        :param discord.CategoryChannel category: The category to look in
+        :param str name: The channel name
+        :returns: The channel, or None if there isn't one
+        :rtype: discord.abc.GuildChannel
+        """
+        if category.id not in self.categories:
+            # not one of ours, or we haven't connected yet
+            return discord.utils.get(category.channels, name=name)
+        channels = self.categories[category.id].get(name)
+        return next(iter(channels.values())) if channels else None
+
+
+    def add(self, channel: discord.abc.GuildChannel):
+        """
+        Index a new channel, if it's in one of our categories.
+
+        :param discord.abc.GuildChannel channel: The channel
+        """
+        names = self.categories.get(channel.category_id)
+        if names is not None:
+            names.setdefault(channel.name, {})[channel.id] = channel
+
+
+    def remove(self, channel: discord.abc.GuildChannel):
+        """
+        Forget a channel, e.g. once it's deleted.
+
+        :param discord.abc.GuildChannel channel: The channel as it was indexed
+        """
+        names = self.categories.get(channel.category_id)
+        if names is None:
+            return
+        channels = names.get(channel.name, {})
+        channels.pop(channel.id, None)
+        if not channels:
+            names.pop(channel.name, None)
+
+
+    def update(self, before: discord.abc.GuildChannel, after: discord.abc.GuildChannel):
+        """
+        Re-index a channel that's been renamed or moved.
+
+        :param discord.abc.GuildChannel before: The channel before the change
+        :param discord.abc.GuildChannel after: The channel after the change
+        """
+        if before.name != after.name or before.category_id != after.category_id:
+            self.remove(before)
+            self.add(after)
+
+
+channel_index = ChannelIndex()
@@ -0,0 +1,177 @@
+"""
+ChannelPool.py
+
+Keeps a few hidden mission channels ready in the trade carriers category, so mission generation can claim one with
+a single edit (name, topic and permissions at once) instead of creating a channel, syncing its permissions and then
+adding its owner.
+
+Pooled channels are named with constants.CHANNEL_POOL_PREFIX and only visible to the bot, so the pool picks them
+back up after a restart and the orphaned channel cleanup leaves them alone. The pool is refilled in the background,
+one channel at a time, to settings.txt's channel_pool_size; a size of 0 turns it off.
+
+Depends on: constants
+"""
+
+# import libraries
+import asyncio
+import secrets
+import traceback
+
+# import discord.py
+import discord
+
+# import local constants
+import ptn.missionalertbot.constants as constants
+from ptn.missionalertbot.constants import bot, trade_cat
+
+
+def is_pool_channel(channel):
+    """
+    :param discord.abc.GuildChannel channel: Any channel
+    :returns: Whether the channel is a spare one waiting in the pool
+    :rtype: bool
+    """
+    return channel.name.startswith(constants.CHANNEL_POOL_PREFIX)
+
+
+class ChannelPool:
+
+    def __init__(self):
+        """
+        Class represents our spare mission channels and the task keeping them topped up.
+        """
+        self.channel_ids = [] # spare channels in the trade carriers category, oldest first
+        self.claimed = 0
+        self.misses = 0 # claims made with the pool empty
+        self._task = None
+        self._wake = asyncio.Event()
+
+
+    @property
+    def size(self):
+        # settings.txt values are read as strings
+        try:
+            return max(0, int(constants.channel_pool_size))
+        except (TypeError, ValueError):
+            return 0
+
+
+    def start(self):
+        """
+        Start keeping the pool topped up, if we aren't already.
+        """
+        if self._task and not self._task.done():
+            return
+        print("Starting channel pool")
+        self._task = asyncio.create_task(self._refill())
+
+
+    def wake(self):
+        """
+        Tell the pool to check its size, e.g. after a channel was claimed or channel_pool_size changed.
+        """
+        self._wake.set()
+
+
+    async def stop(self):
+        """
+        Stop refilling on shutdown. Spare channels are left where they are and picked up again on next startup.
+        """
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+    async def claim(self, category: discord.CategoryChannel, name, topic, owner: discord.Member, overwrite: discord.PermissionOverwrite):
+        """
+        Turn a spare channel into a mission channel: name it, give it its topic, the category's permissions and its owner's.
+
+        :param discord.CategoryChannel category: The category the mission channel belongs in
+        :param str name: The mission channel name
+        :param str topic: The channel topic
+        :param discord.Member owner: The carrier owner
+        :param discord.PermissionOverwrite overwrite: The owner's permissions
+        :returns: The mission channel, or None if there's no spare channel for this category
+        :rtype: discord.TextChannel
+        """
+        if not self.size or category.id != trade_cat():
+            return None
+
+        while self.channel_ids:
+            channel = bot.get_channel(self.channel_ids.pop(0))
+            if not channel:
+                continue # deleted by hand since it was pooled
+            self.wake()
+            try:
+                overwrites = dict(category.overwrites)
+                overwrites[owner] = overwrite
+                await channel.edit(name=name, topic=topic, overwrites=overwrites)
+            except Exception as e:
+                # the orphaned channel cleanup skips pooled channels, so delete it ourselves; the refill loop replaces
+                # it, and the caller creates a channel instead
+                print(f"Couldn't claim pooled channel {channel.name}: {e}")
+                try:
+                    await channel.delete()
+                except Exception as e:
+                    # keep counting it as spare, so we don't add another in its place
+                    print(f"Couldn't delete unclaimable pooled channel {channel.name}: {e}")
+                    self.channel_ids.append(channel.id)
+                return None
+            self.claimed += 1
+            print(f"Claimed pooled channel {channel.id} as {name}, {len(self.channel_ids)} spare left")
+            return channel
+
+        self.misses += 1
+        print("Channel pool is empty")
+        return None
+
+
+    async def _refill(self):
+        await bot.wait_until_ready()
+        category = bot.get_channel(trade_cat())
+        # pick up the spare channels we left last time
+        self.channel_ids = [channel.id for channel in category.channels if is_pool_channel(channel)]
+        print(f"Found {len(self.channel_ids)} pooled channels")
+
+        while True:
+            try:
+                category = bot.get_channel(trade_cat())
+                if len(self.channel_ids) < self.size and len(category.channels) < constants.CATEGORY_CHANNEL_LIMIT:
+                    await self._add(category)
+                    await asyncio.sleep(constants.CHANNEL_POOL_REFILL_SPACING)
+                    continue
+                if len(self.channel_ids) > self.size:
+                    await self._remove()
+                    await asyncio.sleep(constants.CHANNEL_POOL_REFILL_SPACING)
+                    continue
+
+                await self._wake.wait()
+                self._wake.clear()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # never let a Discord hiccup kill the refill task
+                print(f"Channel pool error: {e}")
+                traceback.print_exc()
+                await asyncio.sleep(constants.CHANNEL_POOL_REFILL_SPACING)
+
+
+    async def _add(self, category: discord.CategoryChannel):
+        overwrites = {
+            category.guild.default_role: discord.PermissionOverwrite(view_channel=False),
+            category.guild.me: discord.PermissionOverwrite(view_channel=True, manage_channels=True, manage_roles=True)
+        }
+        channel = await category.create_text_channel(f"{constants.CHANNEL_POOL_PREFIX}{secrets.token_hex(3)}", overwrites=overwrites)
+        self.channel_ids.append(channel.id)
+        print(f"Added {channel.name} to channel pool, {len(self.channel_ids)}/{self.size} spare")
+
+
+    async def _remove(self):
+        channel = bot.get_channel(self.channel_ids.pop())
+        if channel:
+            await channel.delete()
+            print(f"Removed {channel.name} from channel pool, {len(self.channel_ids)}/{self.size} spare")
+
+
+channel_pool = ChannelPool()
@@ -27,11 +27,22 @@ from ptn.missionalertbot.classes.MissionParams import MissionParams
 
 # import local constants
 import ptn.missionalertbot.constants as constants
-from ptn.missionalertbot.constants import ptn_logo_discord
+from ptn.missionalertbot.constants import ptn_logo_discord, get_guild, mcomplete_id
 
 #import local modules
 from ptn.missionalertbot.database.database import find_mission
 
+# a class to hold all our Discord embeds
+class DiscordEmbeds:
+    def __init__(self, buy_embed, sell_embed, info_embed, help_embed, owner_text_embed, webhook_info_embed):
+        self.buy_embed = buy_embed
+        self.sell_embed = sell_embed
+        self.info_embed = info_embed
+        self.help_embed = help_embed
+        self.owner_text_embed = owner_text_embed
+        self.webhook_info_embed = webhook_info_embed
+
+
 # confirm edit mission embed
 def _confirm_edit_mission_embed(mission_params: MissionParams):
     """
@@ -55,7 +66,7 @@ def _confirm_edit_mission_embed(mission_params: MissionParams):
 async def _is_mission_active_embed(carrier_data):
     print("Called _is_mission_active_embed")
     # look to see if the carrier is on an active mission
-    mission_data = find_mission(carrier_data.carrier_long_name, "carrier")
+    mission_data = await find_mission(carrier_data.carrier_long_name, "carrier")
 
     if not mission_data:
         # if there's no result, make our embed tell the user this
@@ -349,4 +360,144 @@ def please_wait_embed():
         description="⏳ Please wait a moment...",
         color=constants.EMBED_COLOUR_QU
     )
-    return embed
\ No newline at end of file
+    return embed
+
+
+# embeds for a mission's carrier channel message and webhook messages
+async def return_discord_channel_embeds(mission_params: MissionParams):
+    carrier_data: CarrierData = mission_params.carrier_data
+    print("Called return_discord_channel_embeds")
+    # generates embeds used for the PTN carrier channel as well as any webhooks
+
+    # define owner avatar
+    guild: discord.Guild = await get_guild()
+    owner: discord.Member = guild.get_member(carrier_data.ownerid)
+    owner_name = owner.display_name
+    owner_avatar = owner.display_avatar
+    pads = "**LARGE**" if 'l' in mission_params.pads.lower() else "**MEDIUM**"
+
+    # define embed content
+    print("Define buy embed")
+    if mission_params.mission_type == 'load': # embeds for a loading mission
+        buy_description=f"📌 Station: **{mission_params.station.upper()}**" \
+                        f"\n🛬 Landing Pad: {pads}" \
+                        f"\n🌟 System: **{mission_params.system.upper()}**" \
+                        f"\n📦 Commodity: **{mission_params.commodity_name.upper()}**"
+
+        buy_thumb = constants.ICON_BUY_FROM_STATION
+
+        sell_description=f"🎯 Fleet Carrier: **{carrier_data.carrier_long_name}**" \
+                         f"\n🔢 Carrier ID: **{carrier_data.carrier_identifier}**" \
+                         f"\n💰 Profit: **{mission_params.profit}K PER TON**" \
+                         f"\n📥 Demand: **{mission_params.demand}K TONS**"
+
+        sell_thumb = constants.ICON_SELL_TO_CARRIER
+
+        embed_colour = constants.EMBED_COLOUR_LOADING
+
+    else: # embeds for an unloading mission
+        buy_description=f"🎯 Fleet Carrier: **{carrier_data.carrier_long_name}**" \
+                        f"\n🔢 Carrier ID: **{carrier_data.carrier_identifier}**" \
+                        f"\n🌟 System: **{mission_params.system.upper()}**" \
+                        f"\n📦 Commodity: **{mission_params.commodity_name.upper()}**" \
+                         f"\n📤 Supply: **{mission_params.demand}K TONS**"
+
+        buy_thumb = constants.ICON_BUY_FROM_CARRIER
+
+        sell_description=f"📌 Station: **{mission_params.station.upper()}**" \
+                         f"\n🛬 Landing Pad: {pads}" \
+                         f"\n💰 Profit: **{mission_params.profit}K PER TON**" \
+
+        sell_thumb = constants.ICON_SELL_TO_STATION
+
+        embed_colour = constants.EMBED_COLOUR_UNLOADING
+
+    print("Define sell embed")
+    # desc used by the local PTN additional info embed
+    if constants.commandid_stock:
+        stock_string = f"</stock:{constants.commandid_stock}>"
+    else:
+        stock_string = "`/stock`"
+    additional_info_description = f"💎 Carrier Owner: <@{carrier_data.ownerid}>" \
+                                  f"\n🔤 Carrier information: </info:849040914948554766>" \
+                                  f"\n📊 Stock information: {stock_string}\n\n"
+
+    print("Define help embed (local)")
+    # desc used by the local PTN help embed
+    if mission_params.edmc_off:
+        edmc_text = "\n\n🤫 This mission is flagged **EDMC-OFF**. Please disable/quit **all journal reporting apps** such as EDMC, EDDiscovery, etc."
+    else:
+        edmc_text = f"\n\n:warning: cAPI stock is updated once per hour. Run [EDMC](https://github.com/EDCD/EDMarketConnector/wiki/Installation-&-Setup) " \
+                    f"and use `/stock source:Inara` for more frequent stock updates."
+    help_description = f"✅ Use </mission complete:{mcomplete_id()}> in this channel if the mission is completed, or unable to be completed (e.g. because of a station price change, or supply exhaustion)." \
+                       f"\n\n💡 Need help? Here's our [complete guide to PTN trade missions](https://pilotstradenetwork.com/fleet-carrier-trade-missions/).{edmc_text}"
+
+    print("Define descs")
+    # desc used for sending cco_message_text
+    owner_text_description = mission_params.cco_message_text
+
+    # desc used by the webhook additional info embed
+    webhook_info_description = f"💎 Carrier Owner: <@{carrier_data.ownerid}>" \
+                               f"\n🔤 [PTN Discord](https://discord.gg/ptn)" \
+                                "\n💡 [PTN trade mission guide](https://pilotstradenetwork.com/fleet-carrier-trade-missions/)"
+
+    print("Define embed objects")
+    buy_embed = discord.Embed(
+        title="BUY FROM",
+        description=buy_description,
+        color=embed_colour
+    )
+    buy_embed.set_image(url=constants.BLANKLINE_400PX)
+    buy_embed.set_thumbnail(url=buy_thumb)
+
+    sell_embed = discord.Embed(
+        title="SELL TO",
+        description=sell_description,
+        color=embed_colour
+    )
+    sell_embed.set_image(url=constants.BLANKLINE_400PX)
+    sell_embed.set_thumbnail(url=sell_thumb)
+
+    info_embed = discord.Embed(
+        title="ADDITIONAL INFORMATION",
+        description=additional_info_description,
+        color=embed_colour
+    )
+    info_embed.set_image(url=constants.BLANKLINE_400PX)
+    info_embed.set_thumbnail(url=owner_avatar)
+
+    help_embed = discord.Embed(
+        description=help_description,
+        color=embed_colour
+    )
+    help_embed.set_image(url=constants.BLANKLINE_400PX)
+
+    owner_text_embed = discord.Embed(
+        title=f"MESSAGE FROM CARRIER OWNER",
+        description=owner_text_description,
+        color=constants.EMBED_COLOUR_RP
+    )
+    owner_text_embed.set_image(url=constants.BLANKLINE_400PX)
+    owner_text_embed.set_thumbnail(url=constants.ICON_DATA)
+
+    webhook_info_embed = discord.Embed(
+        title="ADDITIONAL INFORMATION",
+        description=webhook_info_description,
+        color=embed_colour
+    )
+    webhook_info_embed.set_image(url=constants.BLANKLINE_400PX)
+    webhook_info_embed.set_thumbnail(url=owner_avatar)
+
+    print("instantiate DiscordEmbeds class")
+    discord_embeds = DiscordEmbeds(buy_embed, sell_embed, info_embed, help_embed, owner_text_embed, webhook_info_embed)
+
+    mission_params.discord_embeds = discord_embeds
+
+    return discord_embeds
+
+
+# the embeds sent to a mission's webhooks
+def webhook_mission_embeds(discord_embeds: DiscordEmbeds, mission_params: MissionParams):
+    webhook_embeds = [discord_embeds.buy_embed, discord_embeds.sell_embed, discord_embeds.webhook_info_embed]
+    if mission_params.cco_message_text: webhook_embeds.append(discord_embeds.owner_text_embed)
+    return webhook_embeds
@@ -0,0 +1,103 @@
+"""
+HttpClient.py
+
+A shared async HTTP client for talking to Inara, our cAPI host and Discord webhooks.
+
+One aiohttp session is kept for the life of the bot so connections are pooled and kept alive
+between requests, instead of paying a new TCP/TLS handshake every call.
+
+Depends on: constants
+"""
+
+# import libraries
+import aiohttp
+import asyncio
+import json
+import random
+
+# import local constants
+import ptn.missionalertbot.constants as constants
+
+
+# our shared session, created on first use as aiohttp needs a running event loop
+_http_session: aiohttp.ClientSession = None
+
+
+class HttpResponse:
+    """
+    A fully-read HTTP response. The body is read before the connection is returned to the pool,
+    so callers can use it like a requests.Response without holding the connection open.
+    """
+    def __init__(self, status_code, content, url):
+        self.status_code = status_code
+        self.content = content
+        self.url = url
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self):
+        return json.loads(self.content)
+
+    def __str__(self):
+        return f"HttpResponse: {self.status_code} from {self.url}"
+
+
+async def get_http_session():
+    """
+    Return the shared aiohttp session, creating it if needed.
+    """
+    global _http_session
+    if _http_session is None or _http_session.closed:
+        print("Creating shared HTTP session")
+        connector = aiohttp.TCPConnector(
+            limit=constants.HTTP_POOL_LIMIT,
+            limit_per_host=constants.HTTP_POOL_LIMIT_PER_HOST,
+            keepalive_timeout=constants.HTTP_KEEPALIVE_TIMEOUT
+        )
+        timeout = aiohttp.ClientTimeout(total=constants.HTTP_TIMEOUT, connect=constants.HTTP_CONNECT_TIMEOUT)
+        _http_session = aiohttp.ClientSession(connector=connector, timeout=timeout, headers={'User-Agent': 'PTNStockBot'})
+    return _http_session
+
+
+async def close_http_session():
+    """
+    Close the shared aiohttp session on shutdown.
+    """
+    global _http_session
+    if _http_session is not None and not _http_session.closed:
+        print("Closing shared HTTP session")
+        await _http_session.close()
+    _http_session = None
+
+
+async def http_get(url, params=None, headers=None, retries=None):
+    """
+    GET a URL using the shared session.
+
+    Connection errors, timeouts and retryable status codes (constants.HTTP_RETRY_STATUSES) are retried
+    with exponential backoff and full jitter. Any other status is returned to the caller to handle.
+
+    :returns: HttpResponse
+    :raises: aiohttp.ClientError or asyncio.TimeoutError if every attempt failed to get a response
+    """
+    retries = constants.HTTP_RETRIES if retries is None else retries
+    session = await get_http_session()
+
+    for attempt in range(retries + 1):
+        try:
+            async with session.get(url, params=params, headers=headers) as r:
+                response = HttpResponse(r.status, await r.read(), url)
+            if response.status_code not in constants.HTTP_RETRY_STATUSES or attempt == retries:
+                return response
+            print(f"HTTP {response.status_code} from {url}, retrying ({attempt + 1}/{retries})")
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            if attempt == retries:
+                print(f"HTTP request to {url} failed after {retries + 1} attempts: {e}")
+                raise
+            print(f"HTTP request to {url} failed ({e}), retrying ({attempt + 1}/{retries})")
+
+        # full jitter: sleep somewhere between 0 and our exponential backoff ceiling
+        await asyncio.sleep(random.uniform(0, constants.HTTP_BACKOFF_BASE * 2 ** attempt))
@@ -6,8 +6,10 @@ Dependencies: constants, database, DateString
 
 # import libraries
 import asyncio
+from contextlib import contextmanager
+import io
 import os
-from PIL import Image, ImageFont, ImageDraw
+from PIL import Image, ImageFont
 import random
 import shutil
 import tempfile
@@ -18,107 +20,67 @@ import discord
 
 # import local constants
 import ptn.missionalertbot.constants as constants
-from ptn.missionalertbot.constants import bot, REG_FONT, NAME_FONT, TITLE_FONT, NORMAL_FONT, FIELD_FONT, DISCORD_NAME_FONT, DISCORD_ID_FONT, mission_template_filename, bot_spam_channel
+from ptn.missionalertbot.constants import bot, mission_template_filename, bot_spam_channel
 
 # import local modules
 from ptn.missionalertbot.modules.DateString import get_formatted_date_string
 from ptn.missionalertbot.database.database import find_carrier, CarrierDbFields
 from ptn.missionalertbot.modules.helpers import flexible_carrier_search_term
-
-
-# function to overlay carrier image with background template for Reddit
-async def _overlay_reddit_mission_image(carrier_data):
-    print("Called reddit mission image overlay function")
-    """
-    template:       the background image with logo, frame elements etc
-    carrier_image:  the inset image optionally created by the Carrier Owner
-    """
-    reddit_template = Image.open(os.path.join(constants.RESOURCE_PATH, mission_template_filename(strftime('%B'))))
-    carrier_image_filename = carrier_data.carrier_short_name + '.png'
-    carrier_image = Image.open(os.path.join(constants.IMAGE_PATH, carrier_image_filename))
-    reddit_template.paste(carrier_image, (47,13))
-    return reddit_template
-
-
-# function to overlay carrier image with background template for Reddit
-async def _overlay_discord_mission_image(carrier_data):
-    print("Called discord mission image overlay function")
-    """
-    template:       the background image with logo, frame elements etc
-    carrier_image:  the inset image optionally created by the Carrier Owner
-    """
-    print("Defining path to template...")
-    discord_template = Image.open(os.path.join(constants.RESOURCE_PATH, constants.DISCORD_TEMPLATE))
-    print("Defining path to carrier image...")
-    carrier_image_filename = carrier_data.carrier_short_name + '.png'
-    carrier_image = Image.open(os.path.join(constants.IMAGE_PATH, carrier_image_filename))
-    print("Overlaying carrier image...")
-    discord_template.paste(carrier_image, (16, 0))
-    print("Returning overlaid template...")
-    return discord_template
+from ptn.missionalertbot.modules.ImageRenderer import image_renderer, mission_image_job, render_reddit_mission_image, render_discord_mission_image, \
+    render_reddit_preview
 
 
 # function to create image for Reddit
 async def create_carrier_reddit_mission_image(mission_params):
     print("Called Reddit mission image generator")
     """
-    Builds the carrier image and returns the relative path.
+    Builds the carrier image and returns it as PNG bytes.
     """
-
-    reddit_template = await _overlay_reddit_mission_image(mission_params.carrier_data)
-
-    image_editable = ImageDraw.Draw(reddit_template)
-
-    mission_action = 'LOADING' if mission_params.mission_type == 'load' else 'UNLOADING'
-    image_editable.text((46, 304), "PILOTS TRADE NETWORK", (255, 255, 255), font=TITLE_FONT)
-    image_editable.text((46, 327), f"CARRIER {mission_action} MISSION", (191, 53, 57), font=TITLE_FONT)
-    image_editable.text((46, 366), "FLEET CARRIER " + mission_params.carrier_data.carrier_identifier, (0, 217, 255), font=REG_FONT)
-    image_editable.text((46, 382), mission_params.carrier_data.carrier_long_name, (0, 217, 255), font=NAME_FONT)
-    image_editable.text((46, 439), "COMMODITY:", (255, 255, 255), font=FIELD_FONT)
-    image_editable.text((170, 439), mission_params.commodity_name.upper(), (255, 255, 255), font=NORMAL_FONT)
-    image_editable.text((46, 477), "SYSTEM:", (255, 255, 255), font=FIELD_FONT)
-    image_editable.text((170, 477), mission_params.system.upper(), (255, 255, 255), font=NORMAL_FONT)
-    image_editable.text((46, 514), "STATION:", (255, 255, 255), font=FIELD_FONT)
-    image_editable.text((170, 514), f"{mission_params.station.upper()} ({mission_params.pads.upper()} pads)", (255, 255, 255), font=NORMAL_FONT)
-    image_editable.text((46, 552), "PROFIT:", (255, 255, 255), font=FIELD_FONT)
-    image_editable.text((170, 552), f"{mission_params.profit}k per unit, {mission_params.demand}k units", (255, 255, 255), font=NORMAL_FONT)
-
-    # Check if this will work fine, we might need to delete=False and clean it ourselves
-    result_name = tempfile.NamedTemporaryFile(suffix='.png', delete=False)
-    print(f'Saving temporary Reddit mission file for carrier: {mission_params.carrier_data.carrier_long_name} to: {result_name.name}')
-    reddit_template.save(result_name.name)
-    return result_name.name
+    job = mission_image_job(mission_params, mission_template_filename(strftime('%B')))
+    image_bytes = await image_renderer.render(render_reddit_mission_image, job)
+    print(f'Rendered Reddit mission image for carrier: {mission_params.carrier_data.carrier_long_name} ({len(image_bytes)} bytes)')
+    return image_bytes
 
 
 # function to create image for Discord
 async def create_carrier_discord_mission_image(mission_params):
     print("Called Discord mission image generator")
     """
-    Builds the carrier image and returns the relative path.
+    Builds the carrier image and returns it as PNG bytes.
     """
+    job = mission_image_job(mission_params)
+    image_bytes = await image_renderer.render(render_discord_mission_image, job)
+    print(f'Rendered Discord mission image for carrier: {mission_params.carrier_data.carrier_long_name} ({len(image_bytes)} bytes)')
+    return image_bytes
 
-    discord_template = await _overlay_discord_mission_image(mission_params.carrier_data)
-
-    image_editable = ImageDraw.Draw(discord_template)
-
-    mission_action = 'LOADING: ' if mission_params.mission_type == 'load' else 'UNLOADING: '
-    print(mission_action)
 
-    image_editable.text((17, 283), mission_action + mission_params.carrier_data.carrier_long_name, (0, 217, 255), font=DISCORD_NAME_FONT)
-    image_editable.text((17, 315), "FLEET CARRIER " + mission_params.carrier_data.carrier_identifier, (0, 217, 255), font=DISCORD_ID_FONT)
-
-    # Check if this will work fine, we might need to delete=False and clean it ourselves
-    result_name = tempfile.NamedTemporaryFile(suffix='.png', delete=False)
-
-    print("Scaling image...")
+# wrap rendered image bytes for sending to Discord
+def image_file(image_bytes, filename="image.png"):
+    """
+    Returns a new discord.File reading from the given bytes. Each send needs its own File,
+    but BytesIO shares the underlying bytes object rather than copying it.
 
-    discord_template.thumbnail((430, 430)) # scale the image for our embed width, this is a bit lazy since we should have it the proper size already but UGH let's just let pillow do it for us. EVERY. SINGLE. TIME
+    :param bytes image_bytes: PNG bytes from one of our create_*_image functions
+    :param str filename: The attachment filename
+    :rtype: discord.File
+    """
+    return discord.File(io.BytesIO(image_bytes), filename=filename)
 
-    print(f'Saving temporary Discord mission file for carrier: {mission_params.carrier_data.carrier_long_name} to: {result_name.name}')
 
-    discord_template.save(result_name.name)
+# asyncpraw's submit_image only takes a file path, so write one for the duration of the post
+@contextmanager
+def temp_image_path(image_bytes):
+    """
+    Writes image bytes to a temporary file, yields its path, and removes it afterwards.
 
-    return result_name.name
+    :param bytes image_bytes: PNG bytes from one of our create_*_image functions
+    """
+    with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as temp_file:
+        temp_file.write(image_bytes)
+    try:
+        yield temp_file.name
+    finally:
+        cleanup_temp_image_file(temp_file.name)
 
 
 # used by mission generator
@@ -369,12 +331,11 @@ async def assign_carrier_image(interaction: discord.Interaction, lookname, origi
                 print(f"Error deleting file {attachment.filename}: {e}")
 
         # now we can show the user the result in situ
-        in_image = await _overlay_reddit_mission_image(carrier_data)
-        result_name = tempfile.NamedTemporaryFile(suffix='.png', delete=False)
-        print(f'Saving temporary mission image preview file for carrier: {carrier_data.carrier_long_name} to: {result_name.name}')
-        in_image.save(result_name.name)
+        # the render workers see the new image's modification time and rebuild their cached copies of this carrier
+        preview_bytes = await image_renderer.render(render_reddit_preview, carrier_data.carrier_short_name, mission_template_filename(strftime('%B')))
+        print(f'Rendered mission image preview for carrier: {carrier_data.carrier_long_name}')
 
-        file = discord.File(result_name.name, filename="image.png")
+        file = image_file(preview_bytes)
 
         spamchannel = bot.get_channel(bot_spam_channel())
         embed = discord.Embed(
@@ -410,11 +371,6 @@ async def assign_carrier_image(interaction: discord.Interaction, lookname, origi
         if legacy_message: await legacy_message.delete()
         print("Tidied up our prompt messages")
 
-        # cleanup the tempfile
-        result_name.close()
-        os.unlink(result_name.name)
-        print("Removed the tempfile")
-
         print(f"{interaction.user.display_name} updated carrier image for {carrier_data.carrier_long_name}")
         return success_embed
 
@@ -0,0 +1,261 @@
+"""
+ImageRenderer.py
+
+Renders mission images in a pool of worker processes, so Pillow's decoding, drawing and encoding never blocks
+the event loop and several missions can be rendered at once.
+
+The render_* functions run inside the workers. Each worker keeps its own ImageAssetCache of decoded templates
+and carrier bases, and rebuilds entries whenever their source files change on disk.
+
+Depends on: constants, ErrorHandler
+"""
+
+# import libraries
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import io
+import multiprocessing
+import os
+from PIL import Image, ImageDraw
+
+# import local classes
+from ptn.missionalertbot.classes.ImageAssetCache import ImageAssetCache
+
+# import local constants
+import ptn.missionalertbot.constants as constants
+from ptn.missionalertbot.constants import REG_FONT, NAME_FONT, TITLE_FONT, NORMAL_FONT, FIELD_FONT, DISCORD_NAME_FONT, DISCORD_ID_FONT
+
+# import local modules
+from ptn.missionalertbot.modules.ErrorHandler import AsyncioTimeoutError, CustomError
+
+
+"""
+Worker side: these run inside the render processes
+"""
+
+# decoded templates and carrier images already pasted into them, one cache per worker process
+image_cache = ImageAssetCache(constants.IMAGE_CACHE_MAX_ENTRIES)
+
+# our Discord fonts resized to match the scaled Discord template, keyed by (font, scale)
+_scaled_fonts = {}
+
+
+def _scaled_font(font, scale):
+    key = (font, scale)
+    if key not in _scaled_fonts:
+        _scaled_fonts[key] = font.font_variant(size=round(font.size * scale))
+    return _scaled_fonts[key]
+
+
+def _template(filename):
+    path = os.path.join(constants.RESOURCE_PATH, filename)
+    return image_cache.get(('template', filename), [path], lambda: Image.open(path))
+
+
+def _carrier_image_path(carrier_short_name):
+    return os.path.join(constants.IMAGE_PATH, carrier_short_name + '.png')
+
+
+def _reddit_base(carrier_short_name, template_filename):
+    """
+    The Reddit template with the carrier's image pasted in.
+    """
+    carrier_image_path = _carrier_image_path(carrier_short_name)
+
+    def build():
+        reddit_template = _template(template_filename)
+        with Image.open(carrier_image_path) as carrier_image:
+            reddit_template.paste(carrier_image, (47,13))
+        return reddit_template
+
+    return image_cache.get(('reddit', carrier_short_name, template_filename),
+                           [os.path.join(constants.RESOURCE_PATH, template_filename), carrier_image_path], build)
+
+
+def _discord_base(carrier_short_name):
+    """
+    The Discord template with the carrier's image pasted in, already scaled to DISCORD_MISSION_IMAGE_SIZE.
+    The scale used is stored in its info['scale'].
+    """
+    carrier_image_path = _carrier_image_path(carrier_short_name)
+
+    def build():
+        discord_template = _template(constants.DISCORD_TEMPLATE)
+        with Image.open(carrier_image_path) as carrier_image:
+            discord_template.paste(carrier_image, (16, 0))
+        full_width = discord_template.width
+        # scale once for our embed width, so each mission only has to draw its text
+        discord_template.thumbnail(constants.DISCORD_MISSION_IMAGE_SIZE)
+        discord_template.info['scale'] = discord_template.width / full_width
+        return discord_template
+
+    return image_cache.get(('discord', carrier_short_name),
+                           [os.path.join(constants.RESOURCE_PATH, constants.DISCORD_TEMPLATE), carrier_image_path], build)
+
+
+def _encode_png(image):
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def render_reddit_preview(carrier_short_name, template_filename):
+    """
+    Render the Reddit template with a carrier's image and no mission text, used to preview new carrier images.
+
+    :returns: PNG bytes
+    :rtype: bytes
+    """
+    return _encode_png(_reddit_base(carrier_short_name, template_filename))
+
+
+def render_reddit_mission_image(job):
+    """
+    Render a mission's Reddit image.
+
+    :param dict job: Mission details, see mission_image_job()
+    :returns: PNG bytes
+    :rtype: bytes
+    """
+    reddit_template = _reddit_base(job['carrier_short_name'], job['template_filename'])
+
+    image_editable = ImageDraw.Draw(reddit_template)
+
+    mission_action = 'LOADING' if job['mission_type'] == 'load' else 'UNLOADING'
+    image_editable.text((46, 304), "PILOTS TRADE NETWORK", (255, 255, 255), font=TITLE_FONT)
+    image_editable.text((46, 327), f"CARRIER {mission_action} MISSION", (191, 53, 57), font=TITLE_FONT)
+    image_editable.text((46, 366), "FLEET CARRIER " + job['carrier_identifier'], (0, 217, 255), font=REG_FONT)
+    image_editable.text((46, 382), job['carrier_long_name'], (0, 217, 255), font=NAME_FONT)
+    image_editable.text((46, 439), "COMMODITY:", (255, 255, 255), font=FIELD_FONT)
+    image_editable.text((170, 439), job['commodity_name'].upper(), (255, 255, 255), font=NORMAL_FONT)
+    image_editable.text((46, 477), "SYSTEM:", (255, 255, 255), font=FIELD_FONT)
+    image_editable.text((170, 477), job['system'].upper(), (255, 255, 255), font=NORMAL_FONT)
+    image_editable.text((46, 514), "STATION:", (255, 255, 255), font=FIELD_FONT)
+    image_editable.text((170, 514), f"{job['station'].upper()} ({job['pads'].upper()} pads)", (255, 255, 255), font=NORMAL_FONT)
+    image_editable.text((46, 552), "PROFIT:", (255, 255, 255), font=FIELD_FONT)
+    image_editable.text((170, 552), f"{job['profit']}k per unit, {job['demand']}k units", (255, 255, 255), font=NORMAL_FONT)
+
+    return _encode_png(reddit_template)
+
+
+def render_discord_mission_image(job):
+    """
+    Render a mission's Discord image.
+
+    :param dict job: Mission details, see mission_image_job()
+    :returns: PNG bytes
+    :rtype: bytes
+    """
+    discord_template = _discord_base(job['carrier_short_name'])
+    # the template is already scaled, so our text positions and sizes need scaling to match
+    scale = discord_template.info['scale']
+
+    image_editable = ImageDraw.Draw(discord_template)
+
+    mission_action = 'LOADING: ' if job['mission_type'] == 'load' else 'UNLOADING: '
+
+    image_editable.text((17 * scale, 283 * scale), mission_action + job['carrier_long_name'], (0, 217, 255), font=_scaled_font(DISCORD_NAME_FONT, scale))
+    image_editable.text((17 * scale, 315 * scale), "FLEET CARRIER " + job['carrier_identifier'], (0, 217, 255), font=_scaled_font(DISCORD_ID_FONT, scale))
+
+    return _encode_png(discord_template)
+
+
+"""
+Bot side: submitting jobs to the workers
+"""
+
+# the mission details our render functions need, as a plain dict so it's cheap to send to a worker
+def mission_image_job(mission_params, template_filename=None):
+    """
+    :param MissionParams mission_params: The mission to render images for
+    :param str template_filename: The Reddit template to use, e.g. from mission_template_filename()
+    :rtype: dict
+    """
+    return {
+        'carrier_short_name': mission_params.carrier_data.carrier_short_name,
+        'carrier_long_name': mission_params.carrier_data.carrier_long_name,
+        'carrier_identifier': mission_params.carrier_data.carrier_identifier,
+        'mission_type': mission_params.mission_type,
+        'commodity_name': mission_params.commodity_name,
+        'system': mission_params.system,
+        'station': mission_params.station,
+        'pads': mission_params.pads,
+        'profit': mission_params.profit,
+        'demand': mission_params.demand,
+        'template_filename': template_filename
+    }
+
+
+class ImageRenderService:
+
+    def __init__(self, workers, queue_size, timeout):
+        """
+        Class represents our pool of image rendering processes.
+
+        :param int workers: Number of worker processes
+        :param int queue_size: Jobs allowed to wait for a free worker before new jobs are turned away
+        :param int timeout: Seconds to wait for a job before giving up on it
+        """
+        self.workers = workers
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.jobs = 0 # running and waiting
+        self._pool = None
+
+
+    def _get_pool(self):
+        # created on first use; spawn rather than fork, as the bot process has threads running
+        if self._pool is None:
+            print(f"Starting {self.workers} image render workers")
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+        return self._pool
+
+
+    async def render(self, function, *args):
+        """
+        Run a render function in a worker process and return its result.
+
+        :raises CustomError: if the queue is full
+        :raises AsyncioTimeoutError: if the job took longer than our timeout
+        """
+        if self.jobs >= self.workers + self.queue_size:
+            raise CustomError("Mission image rendering is busy right now, please try again in a moment.")
+
+        self.jobs += 1
+        pool = self._get_pool()
+        try:
+            future = asyncio.get_running_loop().run_in_executor(pool, function, *args)
+            return await asyncio.wait_for(future, timeout=self.timeout)
+        except asyncio.TimeoutError:
+            # the worker may be stuck, so don't send it any more jobs
+            print(f"Image render job {function.__name__} timed out after {self.timeout}s, restarting the pool")
+            self._recycle_pool(pool)
+            raise AsyncioTimeoutError(f"Mission image rendering took longer than {self.timeout} seconds.")
+        except BrokenProcessPool:
+            # a worker died, start a fresh pool for the next job
+            print("Image render pool broken, restarting it")
+            self._recycle_pool(pool)
+            raise
+        finally:
+            self.jobs -= 1
+
+
+    def _recycle_pool(self, pool):
+        # the next job starts a fresh pool; jobs still running on the old one are left to finish
+        pool.shutdown(wait=False, cancel_futures=True)
+        if self._pool is pool:
+            self._pool = None
+
+
+    def close(self):
+        """
+        Stop the worker processes on shutdown.
+        """
+        if self._pool is not None:
+            print("Closing image render workers")
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+image_renderer = ImageRenderService(constants.IMAGE_RENDER_WORKERS, constants.IMAGE_RENDER_QUEUE_SIZE, constants.IMAGE_RENDER_TIMEOUT)
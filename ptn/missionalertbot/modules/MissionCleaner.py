@@ -3,19 +3,18 @@ MissionCleaner.py
 
 Functions relating to mission clean-up.
 
-Dependencies: constants, database, helpers
+Dependencies: constants, database, helpers, ActionScheduler, ChannelPool, MissionOutbox, ProgressReporter, RedditCommentRouter, WebhookDispatcher
 
 """
 # import libraries
-import aiohttp
 import asyncio
+from datetime import datetime, timezone
 import random
 from time import strftime
 import traceback
 
 # import discord.py
 import discord
-from discord import Webhook
 from discord.errors import Forbidden, NotFound
 
 # import local classes
@@ -24,21 +23,66 @@ from ptn.missionalertbot.classes.MissionParams import MissionParams
 
 # import local constants
 import ptn.missionalertbot.constants as constants
-from ptn.missionalertbot.constants import bot, bot_spam_channel, wine_alerts_loading_channel, wine_alerts_unloading_channel, trade_alerts_channel, get_reddit, sub_reddit, \
-    reddit_flair_mission_stop, seconds_long, sub_reddit, mission_command_channel, ptn_logo_discord, reddit_flair_mission_start, channel_upvotes, trade_cat, seconds_very_short, \
-    reddit_timeout
+from ptn.missionalertbot.constants import bot, bot_spam_channel, wine_alerts_loading_channel, wine_alerts_unloading_channel, trade_alerts_channel, sub_reddit, \
+    reddit_flair_mission_stop, seconds_long, sub_reddit, mission_command_channel, ptn_logo_discord, reddit_flair_mission_start, channel_upvotes, trade_cat, seconds_very_short
 
 # import local modules
-from ptn.missionalertbot.database.database import backup_database, mission_db, missions_conn, find_carrier, CarrierDbFields
+from ptn.missionalertbot.database.database import backup_database, mission_db_executor, find_carrier, CarrierDbFields, list_scheduled_actions
 from ptn.missionalertbot.modules.DateString import get_final_delete_hammertime, get_mission_delete_hammertime
-from ptn.missionalertbot.modules.helpers import lock_mission_channel, unlock_mission_channel, clean_up_pins, ChannelDefs, check_mission_channel_lock
-from ptn.missionalertbot.modules.ErrorHandler import GenericError, CustomError, on_generic_error, AsyncioTimeoutError, SilentError
+from ptn.missionalertbot.modules.helpers import lock_mission_channel, unlock_mission_channel, clean_up_pins, ChannelDefs, channel_locks
+from ptn.missionalertbot.modules.ErrorHandler import GenericError, CustomError, on_generic_error
+from ptn.missionalertbot.modules.MissionOutbox import queue_mission_reddit_complete, queue_mission_webhook_conclusions
+from ptn.missionalertbot.modules.ActionScheduler import scheduler, scheduled_action_handler
+from ptn.missionalertbot.modules.ChannelPool import is_pool_channel
+from ptn.missionalertbot.modules.ProgressReporter import ProgressReporter
+from ptn.missionalertbot.modules.RedditCommentRouter import comment_router
+from ptn.missionalertbot.modules.WebhookDispatcher import mission_webhook_targets
 
 
 """
 MISSION COMPLETE & CLEANUP
 """
 
+def _mission_alerts_channel(mission_data: MissionData, mission_params: MissionParams):
+    if hasattr(mission_params, "booze_cruise"): # missions from 2.3.0 have this attribute
+        # 2.3.0 stores alerts channel used in params so we don't have to figure it out, just retrieve it
+        return bot.get_channel(mission_params.channel_alerts_actual)
+
+    elif mission_data.commodity.title() == 'Wine': # pre-2.3.0 wine loads were always sent to the cellar
+        if mission_data.mission_type == 'load':
+            return bot.get_channel(mission_params.channel_defs.wine_loading_channel_actual)
+        else:
+            return bot.get_channel(mission_params.channel_defs.wine_unloading_channel_actual)
+
+    else: # pre-2.3.0 non-wine loads
+        return bot.get_channel(mission_params.channel_defs.alerts_channel_actual)
+
+
+async def _run_cleanup_steps(steps):
+    """
+    Run mission cleanup steps at once, each with its own timeout from CLEANUP_STEP_TIMEOUTS, so a slow step
+    only holds up itself.
+
+    :param dict steps: Step name: (what it does, for reporting failures; coroutine returning the line to report)
+    :returns: Step name: (whether it succeeded, line to report), in the order given
+    :rtype: dict
+    """
+    async def _run_step(name, description, coro):
+        timeout = constants.CLEANUP_STEP_TIMEOUTS[name]
+        try:
+            return True, await asyncio.wait_for(coro, timeout=timeout)
+        except asyncio.TimeoutError:
+            print(f"Cleanup step {name} timed out after {timeout} seconds")
+            return False, f"⌛ {description} timed out after {timeout} seconds."
+        except Exception as e:
+            print(f"Cleanup step {name} failed: {e}")
+            traceback.print_exc()
+            return False, f"❌ {description} failed: {e}"
+
+    results = await asyncio.gather(*[_run_step(name, description, coro) for name, (description, coro) in steps.items()])
+    return dict(zip(steps, results))
+
+
 # clean up a completed mission
 async def _cleanup_completed_mission(interaction: discord.Interaction, mission_data: MissionData, reddit_complete_text, discord_complete_embed: discord.Embed, message, is_complete):
     async with interaction.channel.typing():
@@ -59,209 +103,142 @@ async def _cleanup_completed_mission(interaction: discord.Interaction, mission_d
                 error = 'No MissionParams found, unable to continue. Contact an Admin for manual mission cleanup.'
                 raise CustomError(error)
             except Exception as e:
-                await on_generic_error(interaction, e)
-
-        async with interaction.channel.typing():
-            completed_mission_channel = bot.get_channel(mission_data.channel_id)
-            mission_gen_channel = bot.get_channel(mission_params.channel_defs.mission_command_channel_actual)
-            cco = True if interaction.channel.id == mission_gen_channel.id else False
-
-            backup_database('missions')  # backup the missions database before going any further
-
-            # delete Discord trade alert
-            print("Delete Discord trade alert...")
-            if mission_data.discord_alert_id and mission_data.discord_alert_id:
-                try:  # try in case it's already been deleted, which doesn't matter to us in the slightest but we don't
-                    # want it messing up the rest of the function
+                return await on_generic_error(interaction, e)
 
-                    if hasattr(mission_params, "booze_cruise"): # missions from 2.3.0 have this attribute
-                        # 2.3.0 stores alerts channel used in params so we don't have to figure it out, just retrieve it
-                        alerts_channel = bot.get_channel(mission_params.channel_alerts_actual)
+        completed_mission_channel = bot.get_channel(mission_data.channel_id)
+        mission_gen_channel = bot.get_channel(mission_params.channel_defs.mission_command_channel_actual)
+        cco = True if interaction.channel.id == mission_gen_channel.id else False
 
-                    elif mission_data.commodity.title() == 'Wine': # pre-2.3.0 wine loads were always sent to the cellar
-                        if mission_data.mission_type == 'load':
-                            alerts_channel = bot.get_channel(mission_params.channel_defs.wine_loading_channel_actual)
-                        else:
-                            alerts_channel = bot.get_channel(mission_params.channel_defs.wine_unloading_channel_actual)
-
-                    else: # pre-2.3.0 non-wine loads
-                        alerts_channel = bot.get_channel(mission_params.channel_defs.alerts_channel_actual)
-
-                    discord_alert_id = mission_data.discord_alert_id
+        # CCOs see the results in their command's response, and everything is logged in one message in bot-spam
+        status_message = None
+        if cco:
+            try:
+                status_message = await interaction.original_response()
+            except Exception as e:
+                print(f"Couldn't get response to report progress in: {e}")
+        spamchannel = bot.get_channel(bot_spam_channel())
+        progress = ProgressReporter(
+            None, f"Closing mission for {mission_data.carrier_name}", message=status_message,
+            log_channel=spamchannel, log_title=f"Mission {status} for {mission_data.carrier_name}"
+        )
+        reason = f"\n\nReason given: `{message}`" if not message == None else "" # TODO what the unholy fuck is this Sihmm
+        # as the description, so it goes out with the log's final edit rather than in an edit of its own
+        progress.log.description = f"<@{interaction.user.id}> reported in <#{interaction.channel.id}> ({interaction.channel.name}).{reason}"
+
+        await backup_database('missions')  # backup the missions database before going any further
+
+        # delete Discord trade alert
+        async def _delete_alert():
+            try:
+                # no need to fetch it first, Discord tells us if it's already gone
+                await _mission_alerts_channel(mission_data, mission_params).get_partial_message(mission_data.discord_alert_id).delete()
+                return "🗑 Deleted Discord trade alert."
+            except NotFound:
+                print(f"Looks like this mission alert for {mission_data.carrier_name} was already deleted"
+                    f" by someone else. We'll keep going anyway.")
+                return "🗑 Discord trade alert was already deleted."
+
+        # send Discord carrier channel updates
+        async def _send_notice():
+            discord_complete_embed.set_thumbnail(url=thumb)
+            await completed_mission_channel.send(embed=discord_complete_embed)
+            return f"📨 Sent mission {status} notice to <#{completed_mission_channel.id}>."
+
+        # add comment to Reddit post, in the background so a Reddit outage doesn't hold us up
+        async def _queue_reddit():
+            await queue_mission_reddit_complete(mission_params, mission_data.reddit_post_id, reddit_complete_text)
+            return "⏳ Reddit post update queued."
+
+        # update webhooks, also in the background
+        try: # wrapping this in try for now to enable backwards compatibility. TODO: remove the 'try' wrapper after 2.1.0
+            webhook_targets = mission_webhook_targets(mission_params)
+        except: 
+            print("No mission_params found to define webhooks, pre-2.1.0 mission?")
+            webhook_targets = []
+
+        async def _queue_webhooks():
+            # the same embed replaces every webhook's mission message
+            concluded_embed = discord.Embed(title="PTN TRADE MISSION CONCLUDED",
+                                            description=f"**{mission_params.carrier_data.carrier_long_name}** finished {mission_params.mission_type}ing "
+                                                        f"{mission_params.commodity_name} from **{mission_params.station}** in **{mission_params.system}**.",
+                                            color=constants.EMBED_COLOUR_QU)
+            concluded_embed.set_footer(text=f"Join {constants.DISCORD_INVITE_URL} for more trade opportunities.")
+            concluded_embed.set_thumbnail(url=ptn_logo_discord(strftime('%B')))
+
+            reason = f"\n\n{message}" if not message == None else "" # TODO: change the reason to a separate embed or field
+
+            await queue_mission_webhook_conclusions(mission_params, concluded_embed, status, reason)
+            return f"⏳ Updates for {len(webhook_targets)} webhooks queued."
+
+        # delete mission entry from db
+        async def _remove_from_database():
+            await mission_db_executor.execute(f'''DELETE FROM missions WHERE carrier LIKE (?)''', ('%' + mission_data.carrier_name + '%',))
+            comment_router.mission_removed(mission_data.reddit_post_id)
+            return "💾 Removed from mission database."
+
+        async def _clean_up_pins():
+            await clean_up_pins(completed_mission_channel)
+            return "📌 Unpinned mission messages."
 
-                    try:
-                        msg = await alerts_channel.fetch_message(discord_alert_id)
-                        await msg.delete()
-                    except:
-                        print("No alert found, maybe user deleted it?")
-
-                except:
-                    print(f"Looks like this mission alert for {mission_data.carrier_name} was already deleted"
-                        f" by someone else. We'll keep going anyway.")
-
-                # send Discord carrier channel updates
-                # try in case channel already deleted
-                try:
-                    discord_complete_embed.set_thumbnail(url=thumb)
-                    await completed_mission_channel.send(embed=discord_complete_embed)
-                except:
-                    print(f"Unable to send completion message for {mission_data.carrier_name}, maybe channel deleted?")
-
-            # add comment to Reddit post
-            print("Add comment to Reddit post...")
-            if mission_data.reddit_post_id:
-                try:  # try in case Reddit is down
-                    async def add_reddit_comment():
-                        reddit_post_id = mission_data.reddit_post_id
-                        reddit = await get_reddit()
-                        await reddit.subreddit(mission_params.channel_defs.sub_reddit_actual)
-                        submission = await reddit.submission(reddit_post_id)
-                        await submission.reply(reddit_complete_text)
-                        # mark original post as spoiler, change its flair
-                        await submission.flair.select(mission_params.channel_defs.reddit_flair_completed)
-                        await submission.mod.spoiler()
-
-                    await asyncio.wait_for(add_reddit_comment(), timeout=reddit_timeout())
-
-                except asyncio.TimeoutError:
-                    print("❌⏲ TimeoutError while updating Reddit")
-                    error = "Timed out while trying to update Reddit."
-                    if cco:
-                        try:
-                            raise AsyncioTimeoutError(error, False)
-                        except Exception as e:
-                            await on_generic_error(interaction, e)
-                    else:
-                        try:
-                            raise SilentError(error)
-                        except Exception as e:
-                            await on_generic_error(interaction, e)
-
-
-                except Exception as e:
-                    print(f"❌ Failed updating Reddit: {e}")
-                    error = f'Failed updating Reddit {e}'
-                    if cco:
-                        try:
-                            raise CustomError(error, False)
-                        except Exception as e:
-                            await on_generic_error(interaction, e)
-                    else:
-                        try:
-                            raise SilentError(error)
-                        except Exception as e:
-                            await on_generic_error(interaction, e)
-
-
-            # update webhooks
-            print("Update sent webhooks...")
-            try: # wrapping this in try for now to enable backwards compatibility. TODO: remove the 'try' wrapper after 2.1.0
-                if mission_params.webhook_urls and mission_params.webhook_msg_ids and mission_params.webhook_jump_urls:
-                    for webhook_url, webhook_msg_id, webhook_jump_url in zip(mission_params.webhook_urls, mission_params.webhook_msg_ids, mission_params.webhook_jump_urls):
-                        try: 
-                            async with aiohttp.ClientSession() as session:
-                                print(f"Fetching webhook for {webhook_url} with jumpurl {webhook_jump_url} and ID {webhook_msg_id}")
-                                webhook = Webhook.from_url(webhook_url, session=session, client=bot)
-                                webhook_msg = await webhook.fetch_message(webhook_msg_id)
-
-                                # edit the original message
-                                print("Editing original webhook message...")
-                                embed = discord.Embed(title="PTN TRADE MISSION CONCLUDED",
-                                                        description=f"**{mission_params.carrier_data.carrier_long_name}** finished {mission_params.mission_type}ing "
-                                                                    f"{mission_params.commodity_name} from **{mission_params.station}** in **{mission_params.system}**.",
-                                                        color=constants.EMBED_COLOUR_QU)
-                                embed.set_footer(text=f"Join {constants.DISCORD_INVITE_URL} for more trade opportunities.")
-                                embed.set_thumbnail(url=ptn_logo_discord(strftime('%B')))
-                                await webhook_msg.remove_attachments(webhook_msg.attachments)
-                                await webhook_msg.edit(embed=embed)
-
-                                reason = f"\n\n{message}" if not message == None else "" # TODO: change the reason to a separate embed or field
-
-                                print("Sending webhook update message...")
-                                # send a new message to update the target channel
-                                embed = discord.Embed(title="PTN TRADE MISSION CONCLUDED",
-                                                      description=f"The mission {webhook_jump_url} posted at <t:{mission_params.timestamp}:f> (<t:{mission_params.timestamp}:R>) "
-                                                                  f"has been marked as {status} on the [PTN Discord]({constants.DISCORD_INVITE_URL}).{reason}",
-                                                      color=constants.EMBED_COLOUR_OK)
-                                await webhook.send(embed=embed, username='Pilots Trade Network', avatar_url=bot.user.avatar.url, wait=True)
-
-                        except Exception as e:
-                            error = f"Failed updating webhook message {webhook_jump_url} with URL {webhook_url}: {e}"
-                            print(error)
-                            if cco:
-                                try:
-                                    raise CustomError(error, False)
-                                except Exception as e:
-                                    await on_generic_error(interaction, e)
-                            else:
-                                try:
-                                    raise SilentError(error)
-                                except Exception as e:
-                                    await on_generic_error(interaction, e)
-
-            except: 
-                print("No mission_params found to define webhooks, pre-2.1.0 mission?")
-
-            # delete mission entry from db
-            print("Remove from mission database...")
-            mission_db.execute(f'''DELETE FROM missions WHERE carrier LIKE (?)''', ('%' + mission_data.carrier_name + '%',))
-            missions_conn.commit()
+        # notify owner if not command user
+        carrier_data = find_carrier(mission_data.carrier_name, CarrierDbFields.longname.name)
 
-            await clean_up_pins(completed_mission_channel)
+        async def _notify_owner():
+            # notify by DM
+            owner = bot.get_user(carrier_data.ownerid) or await bot.fetch_user(carrier_data.ownerid)
 
-            # command feedback
-            print("Log usage in bot spam")
-            spamchannel = bot.get_channel(bot_spam_channel())
-            reason = f"\n\nReason given: `{message}`" if not message == None else "" # TODO what the unholy fuck is this Sihmm
-            embed = discord.Embed(title=f"Mission {status} for {mission_data.carrier_name}",
-                                description=f"<@{interaction.user.id}> reported in <#{interaction.channel.id}> ({interaction.channel.name}).{reason}",
-                                color=constants.EMBED_COLOUR_OK)
-            embed.set_thumbnail(url=thumb)
-            await spamchannel.send(embed=embed)
+            hammertime = get_mission_delete_hammertime()
 
-            if cco: # tells us whether /cco complete was used or /mission complete
-                print("Send feedback to the CCO")
-                message_text = f':\nReason given: `{message}`' if message else ''
-                feedback_embed = discord.Embed(
-                    description=f"{emoji} **MISSION {status.upper()}** for **{mission_data.carrier_name}**{message_text}",
-                    color=constants.EMBED_COLOUR_OK
+            dm_embed = discord.Embed(
+                title=f"{carrier_data.carrier_long_name} MISSION {status.upper()}",
+                description=f"Ahoy CMDR! {interaction.user.display_name} has concluded the trade mission for your Fleet Carrier **{carrier_data.carrier_long_name}**. "
+                            f"Its mission channel will be removed {hammertime} unless a new mission is started.",
+                color=constants.EMBED_COLOUR_QU
                 )
-                
-                feedback_embed.set_footer(text="Updated sent alerts and removed from mission list.")
-                # feedback_embed.set_thumbnail(url=thumb)
-                await interaction.edit_original_response(embed=feedback_embed)
-
-        # notify owner if not command user
-        carrier_data = find_carrier(mission_data.carrier_name, CarrierDbFields.longname.name)
+            dm_embed.set_thumbnail(url=thumb)
+            if not message == None:
+                dm_embed.add_field(name="Explanation given", value=message, inline=True)
+            await owner.send(embed=dm_embed)
+            return f"✉ Notified carrier owner <@{carrier_data.ownerid}> by DM."
+
+        steps = {}
+        if mission_data.discord_alert_id:
+            steps['alert'] = ("Deleting the Discord trade alert", _delete_alert())
+        steps['notice'] = (f"Sending the mission {status} notice", _send_notice())
+        if mission_data.reddit_post_id:
+            steps['reddit'] = ("Queueing the Reddit update", _queue_reddit())
+        if webhook_targets:
+            steps['webhooks'] = ("Queueing webhook updates", _queue_webhooks())
+        steps['database'] = ("Removing the mission from the database", _remove_from_database())
+        steps['pins'] = ("Unpinning mission messages", _clean_up_pins())
         if not interaction.user.id == carrier_data.ownerid:
-            try:
-                print("Notify carrier owner")
-                # notify in channel - not sure this is needed anymore, leaving out for now
-                # await interaction.channel.send(f"Notifying carrier owner: <@{carrier_data.ownerid}>")
-
-                # notify by DM
-                owner = await bot.fetch_user(carrier_data.ownerid)
-
-                hammertime = get_mission_delete_hammertime()
-
-                dm_embed = discord.Embed(
-                    title=f"{carrier_data.carrier_long_name} MISSION {status.upper()}",
-                    description=f"Ahoy CMDR! {interaction.user.display_name} has concluded the trade mission for your Fleet Carrier **{carrier_data.carrier_long_name}**. "
-                                f"Its mission channel will be removed {hammertime} unless a new mission is started.",
-                    color=constants.EMBED_COLOUR_QU
-                    )
-                dm_embed.set_thumbnail(url=thumb)
-                if not message == None:
-                    dm_embed.add_field(name="Explanation given", value=message, inline=True)
-                await owner.send(embed=dm_embed)
-
-            except Exception as e: # in case the user can't be DMed
-                print(e)
-                embed = discord.Embed(
-                    description=f"Error sending mission complete DM to <@{carrier_data.ownerid}>: {e}",
-                    color=constants.EMBED_COLOUR_ERROR
-                )
-                spamchannel.send(embed=embed)
+            steps['owner_dm'] = (f"Sending mission complete DM to <@{carrier_data.ownerid}>", _notify_owner())
+
+        print(f"Running cleanup steps: {', '.join(steps)}")
+        results = await _run_cleanup_steps(steps)
+
+        # one report for the lot
+        failed = False
+        for succeeded, line in results.values():
+            progress.step(line)
+            if not succeeded:
+                failed = True
+                progress.log.step(line)
+
+        colour = constants.EMBED_COLOUR_WARNING if failed else constants.EMBED_COLOUR_OK
+
+        if cco: # tells us whether /cco complete was used or /mission complete
+            print("Send feedback to the CCO")
+            message_text = f':\nReason given: `{message}`' if message else ''
+            await progress.finish(
+                description=f"{emoji} **MISSION {status.upper()}** for **{mission_data.carrier_name}**{message_text}",
+                colour=colour,
+                footer="Some cleanup steps failed, see above." if failed else "Updated sent alerts and removed from mission list."
+            )
+
+        # command feedback
+        print("Log usage in bot spam")
+        await progress.log.finish(colour=colour, thumbnail=thumb)
 
     # remove channel
     await remove_carrier_channel(interaction, mission_data.channel_id, seconds_long())
@@ -269,30 +246,49 @@ async def _cleanup_completed_mission(interaction: discord.Interaction, mission_d
     return
 
 
-async def remove_carrier_channel(interaction: discord.Interaction, completed_mission_channel_id, seconds): # seconds is either 900 or 120 depending on scenario
-    try:
-        # get channel ID to remove
-        delchannel = bot.get_channel(completed_mission_channel_id)
-        spamchannel = bot.get_channel(bot_spam_channel())
+async def remove_carrier_channel(interaction: discord.Interaction, completed_mission_channel_id, seconds, replace=True): # seconds is either 900 or 120 depending on scenario
+    """
+    Schedule a mission channel for deletion. The deletion survives restarts, and is skipped if the channel
+    is in use for a new mission by the time it's due.
+
+    :param discord.Interaction interaction: The interaction that led to the removal, may be None
+    :param int completed_mission_channel_id: The channel to delete
+    :param int seconds: How long to wait before deleting it
+    :param bool replace: If the channel is already scheduled for deletion, restart its timer; otherwise leave it be
+    :returns: True if the deletion was scheduled, False if it already was and replace was False
+    :rtype: bool
+    """
+    print(f"Starting {seconds} second countdown for deletion of {completed_mission_channel_id}")
+    return await scheduler.schedule(f"delete_channel:{completed_mission_channel_id}", 'delete_channel',
+                                    {'channel_id': completed_mission_channel_id, 'seconds': seconds}, seconds, replace)
+
+
+@scheduled_action_handler('delete_channel')
+async def _delete_carrier_channel(payload):
+    completed_mission_channel_id, seconds = payload['channel_id'], payload['seconds']
+    delchannel = bot.get_channel(completed_mission_channel_id)
+    spamchannel = bot.get_channel(bot_spam_channel())
+    if not delchannel:
+        print(f"Channel {completed_mission_channel_id} no longer exists, nothing to remove")
+        return
 
-        # start a timer
-        print(f"Starting {seconds} second countdown for deletion of {delchannel}")
-        await asyncio.sleep(seconds)
+    try:
         print("Channel removal timer complete")
 
+        # log the whole removal in one bot-spam message
+        progress = ProgressReporter(spamchannel, f"Removing mission channel {delchannel.name}")
+        # task names are unique, so this removal only ever releases its own lock
+        lock_owner = f"removal of <#{delchannel.id}> after {seconds}-second timer ({asyncio.current_task().get_name()})"
+
         try:
             # try to acquire a channel lock, if unsuccessful after a period of time, abort and throw up an error
             try:
-                await asyncio.wait_for(lock_mission_channel(delchannel.name), timeout=120)
-                embed = discord.Embed(
-                    description=f"🔒 Lock acquired for `{delchannel.name}` (<#{delchannel.id}>) pending automatic deletion following conclusion of {seconds}-second timer.",
-                    color=constants.EMBED_COLOUR_QU
-                )
-                spamchannel = bot.get_channel(bot_spam_channel())
-                await spamchannel.send(embed=embed)
+                await lock_mission_channel(delchannel.name, lock_owner, 'removal', timeout=120)
+                progress.step(f"🔒 Lock acquired for `{delchannel.name}` (<#{delchannel.id}>) pending automatic deletion following conclusion of {seconds}-second timer.")
             except asyncio.TimeoutError:
                 print(f"No channel lock available for {delchannel}")
-                return await spamchannel.send(f"<@211891698551226368> WARNING: No channel lock available on {delchannel} after 120 seconds. Deletion aborted.")
+                return await spamchannel.send(f"<@211891698551226368> WARNING: No channel lock available on {delchannel} after 120 seconds, "
+                                              f"held by {channel_locks.holder(delchannel.name)}. Deletion aborted.")
 
             mission_gen_channel = bot.get_channel(mission_command_channel())
             print(mission_gen_channel.name, mission_gen_channel.id)
@@ -317,14 +313,14 @@ async def remove_carrier_channel(interaction: discord.Interaction, completed_mis
                 """
 
                 # check whether channel is in-use for a new mission
-                mission_db.execute(f"SELECT * FROM missions WHERE "
-                                f"channelid = {completed_mission_channel_id}")
-                mission_data = MissionData(mission_db.fetchone())
+                mission_data = MissionData(await mission_db_executor.query_one(
+                    "SELECT carrier FROM missions WHERE channelid = ?", (completed_mission_channel_id,)))
                 print(f'Mission data from remove_carrier_channel: {mission_data}')
 
                 if mission_data:
                     # abort abort abort
                     print(f'New mission underway in this channel, aborting removal')
+                    progress.step("✋ New mission underway in this channel, removal aborted.")
                 else:
                     print(f"Proceeding with channel deletion for {delchannel.name}")
                     # delete channel after a parting gift
@@ -334,35 +330,23 @@ async def remove_carrier_channel(interaction: discord.Interaction, completed_mis
                         await asyncio.sleep(seconds_very_short())
                         await delchannel.delete()
                         print(f'Deleted {delchannel}')
-                        embed = discord.Embed(
-                            description=f":put_litter_in_its_place: Deleted expired mission channel {delchannel.name}.",
-                            color=constants.EMBED_COLOUR_OK
-                        )
-                        await spamchannel.send(embed=embed)
+                        progress.step(f":put_litter_in_its_place: Deleted expired mission channel {delchannel.name}.")
                     except Forbidden:
                         raise EnvironmentError(f"Could not delete {delchannel}, reason: Bot does not have permission.")
                     except NotFound:
                         print("Channel appears to have been deleted by someone else, we'll just continue on.")
-                        embed = discord.Embed(
-                            description=f"Channel {delchannel} could not be deleted because it doesn't exist.",
-                            color=constants.EMBED_COLOUR_QU
-                        )
-                        await spamchannel.send(embed=embed)
+                        progress.step(f"Channel {delchannel} could not be deleted because it doesn't exist.")
         finally:
             try:
                 # now release the channel lock
                 print("Releasing channel lock...")
-                locked = check_mission_channel_lock(delchannel.name)
-                if locked:
-                    await unlock_mission_channel(delchannel.name)
+                released = await unlock_mission_channel(delchannel.name, lock_owner)
+                if released:
                     print("Channel lock released")
-                    embed = discord.Embed(
-                        description=f"🔓 Released lock for `{delchannel.name}` (<#{delchannel.id}>) ",
-                        color=constants.EMBED_COLOUR_OK
-                    )
-                    await spamchannel.send(embed=embed)
+                    progress.step(f"🔓 Released lock for `{delchannel.name}` (<#{delchannel.id}>)")
             except Exception as e:
                 print(e)
+            await progress.finish(colour=constants.EMBED_COLOUR_OK)
             try: 
                 print("Deleting warning message, if exists")
                 await warning.delete()
@@ -376,51 +360,119 @@ async def remove_carrier_channel(interaction: discord.Interaction, completed_mis
             error = f"Unable to delete carrier channel: {e}"
             raise CustomError(error)
         except Exception as e:
-            try: # some methods of calling this function won't have a valid interaction object to parse
-                await on_generic_error(interaction, e)
-            except:
-                print(f"Error deleting carrier channel: {e}")
-                embed = discord.Embed(
-                    description=f"❌ Error deleting carrier channel for `{delchannel.name}` (<#{delchannel.id}>:\n{e})",
-                    color=constants.EMBED_COLOUR_ERROR
-                )
-                await spamchannel.send(embed=embed)
+            # the interaction that scheduled this is long gone, so report to bot-spam
+            print(f"Error deleting carrier channel: {e}")
+            embed = discord.Embed(
+                description=f"❌ Error deleting carrier channel for `{delchannel.name}` (<#{delchannel.id}>):\n{e}",
+                color=constants.EMBED_COLOUR_ERROR
+            )
+            await spamchannel.send(embed=embed)
+
+
+@scheduled_action_handler('delete_orphan_channels')
+async def _delete_orphan_channels(payload):
+    # delete a batch of orphaned mission channels one at a time, spaced out to stay clear of Discord's rate limits
+    channel_ids, seconds = payload['channel_ids'], payload['seconds']
+    spamchannel = bot.get_channel(bot_spam_channel())
+    mission_gen_channel = bot.get_channel(mission_command_channel())
+    channels = [channel for channel in map(bot.get_channel, channel_ids) if channel]
+    if not channels:
+        print("None of the orphaned channels still exist, nothing to remove")
+        return
+
+    # one report and one warning for the whole batch
+    progress = ProgressReporter(spamchannel, f"Removing {len(channels)} orphaned mission channels")
+    lock_owner = f"orphaned channel cleanup after {seconds}-second timer ({asyncio.current_task().get_name()})"
+    warning = None
+    deleted = failed = 0
+    try:
+        embed = discord.Embed(
+            title=":warning: Channel lock engaged for channel cleanup :warning:",
+            description=f"Deleting {len(channels)} orphaned mission channels, each will be temporarily locked in turn.",
+            color=constants.EMBED_COLOUR_RP
+        )
+        warning = await mission_gen_channel.send(embed=embed)
+    except Exception as e:
+        print(f"Couldn't warn mission gen channel: {e}")
+
+    for delchannel in channels:
+        try:
+            await lock_mission_channel(delchannel.name, lock_owner, 'removal', timeout=120)
+        except asyncio.TimeoutError:
+            failed += 1
+            progress.step(f"❌ `{delchannel.name}`: no lock available after 120 seconds, held by {channel_locks.holder(delchannel.name)}.")
+            continue
+
+        try:
+            # a new mission may have taken the channel since it was found orphaned
+            mission_data = MissionData(await mission_db_executor.query_one(
+                "SELECT carrier FROM missions WHERE channelid = ?", (delchannel.id,)))
+            if mission_data:
+                progress.step(f"✋ `{delchannel.name}`: new mission underway, removal aborted.")
+                continue
+            await delchannel.delete()
+            deleted += 1
+            progress.step(f":put_litter_in_its_place: Deleted `{delchannel.name}`.")
+            await asyncio.sleep(constants.ORPHAN_DELETE_SPACING)
+        except NotFound:
+            progress.step(f"`{delchannel.name}` was already deleted.")
+        except Exception as e:
+            failed += 1
+            progress.step(f"❌ `{delchannel.name}`: {e}")
+        finally:
+            await unlock_mission_channel(delchannel.name, lock_owner)
+
+    await progress.finish(
+        description=f"Deleted {deleted} of {len(channels)} orphaned mission channels.",
+        colour=constants.EMBED_COLOUR_WARNING if failed else constants.EMBED_COLOUR_OK
+    )
+    if warning:
+        try:
+            await warning.delete()
+        except Exception as e:
+            print(e)
 
 
 async def check_trade_channels_on_startup():
     """
     This function is called on bot.on_ready() to clean up any channels
-    that had their timer lost during bot stop/restart
+    that had no deletion scheduled when the bot stopped. Channels that
+    already have one keep the time they had left; the rest are deleted
+    together in one batch, with one report.
     """
     # get all active channel IDs
     print("Fetching active mission channels from DB...")
-    mission_db.execute("SELECT channelid FROM missions")
-    rows = mission_db.fetchall()
-    trade_category = bot.get_channel(trade_cat())
-    active_channel_ids = [row['channelid'] for row in rows]
+    rows = await mission_db_executor.query("SELECT channelid FROM missions")
+    active_channel_ids = {row['channelid'] for row in rows}
+
+    # channels already waiting to be deleted
+    scheduled_channel_ids = set()
+    for action in await list_scheduled_actions():
+        if action.kind == 'delete_channel':
+            scheduled_channel_ids.add(action.payload['channel_id'])
+        elif action.kind == 'delete_orphan_channels':
+            scheduled_channel_ids.update(action.payload['channel_ids'])
 
     # get trade category as channel object
     trade_category = bot.get_channel(trade_cat())
 
-    spamchannel = bot.get_channel(bot_spam_channel())
-
     print(f"Checking against extant channels in {trade_category.name}...")
+    # spare channels in the channel pool aren't orphans
+    extant_channels = {channel.id: channel for channel in trade_category.channels if not is_pool_channel(channel)}
+    orphan_ids = sorted(set(extant_channels) - active_channel_ids - scheduled_channel_ids)
 
-    # Create a list to store the channel deletion tasks
-    deletion_tasks = []
+    if not orphan_ids:
+        print("No orphaned channels found.")
+        return
 
-    for channel in trade_category.channels:
-        if channel.id not in active_channel_ids:
-            embed = discord.Embed(
-                description=f"🧹 Startup: {channel.name} <#{channel.id}> appears orphaned, marking for cleanup.",
-                color=constants.EMBED_COLOUR_QU
-            )
-            await spamchannel.send(embed=embed)
-            print(f"{channel.name} appears orphaned, marking for cleanup")
-            # Append the channel deletion task to the list without awaiting it
-            deletion_task = remove_carrier_channel(None, channel.id, seconds_long())
-            deletion_tasks.append(deletion_task)
-
-    # Wait for all deletion tasks to complete concurrently
-    await asyncio.gather(*deletion_tasks)
-    print("Complete.")
+    print(f"{len(orphan_ids)} channels appear orphaned, marking for cleanup")
+    await scheduler.schedule(f"delete_orphan_channels:{int(datetime.now(tz=timezone.utc).timestamp())}", 'delete_orphan_channels',
+                             {'channel_ids': orphan_ids, 'seconds': seconds_long()}, seconds_long())
+
+    spamchannel = bot.get_channel(bot_spam_channel())
+    channel_list = '\n'.join(f"{extant_channels[channel_id].name} <#{channel_id}>" for channel_id in orphan_ids)
+    embed = discord.Embed(
+        description=f"🧹 Startup: {len(orphan_ids)} channels appear orphaned, marking for cleanup {get_mission_delete_hammertime()}:\n{channel_list}"[:4096],
+        color=constants.EMBED_COLOUR_QU
+    )
+    await spamchannel.send(embed=embed)
@@ -3,42 +3,87 @@ MissionEditor.py
 
 Function for editing an active mission.
 
-Dependencies: constants, database, ImageHandling, TextGen, MissionGenerator
+An edit is compared with the mission as it was before, and only the parts of the sent mission that show a changed
+field are updated: the trade alert and hauler ping, the carrier channel message and its image, webhooks, and Reddit.
+
+Dependencies: constants, database, ImageHandling, TextGen, MissionGenerator, MissionOutbox, ProgressReporter
 """
 # import libraries
-import aiohttp
 import asyncio
 import traceback
 import typing
 
 # import discord.py
 import discord
-from discord import Webhook
+from discord.errors import NotFound
 from discord.ui import View, Modal
 
 # import local constants
 import ptn.missionalertbot.constants as constants
-from ptn.missionalertbot.constants import bot, bot_spam_channel, get_reddit, upvote_emoji, wineloader_role, hauler_role, get_guild
+from ptn.missionalertbot.constants import bot, bot_spam_channel, wineloader_role, hauler_role, get_guild
 
 # import local classes
 from ptn.missionalertbot.classes.MissionParams import MissionParams
 
 # import local modules
-from ptn.missionalertbot.database.database import _update_mission_in_database
 from ptn.missionalertbot.modules.Embeds import _confirm_edit_mission_embed
-from ptn.missionalertbot.modules.ImageHandling import create_carrier_reddit_mission_image, create_carrier_discord_mission_image
+from ptn.missionalertbot.modules.ImageHandling import create_carrier_discord_mission_image, image_file
 from ptn.missionalertbot.modules.MissionGenerator import validate_pads, validate_profit, define_commodity, return_discord_alert_embed, return_discord_channel_embeds, \
-    mission_generation_complete, cleanup_temp_image_file, send_discord_alert, send_discord_channel_message
-from ptn.missionalertbot.modules.TextGen import txt_create_discord, txt_create_reddit_title, txt_create_reddit_body
+    mission_generation_complete, send_discord_alert, send_discord_channel_message, report_step
+from ptn.missionalertbot.modules.TextGen import txt_create_discord
 from ptn.missionalertbot.modules.ErrorHandler import on_generic_error, CustomError, GenericError
+from ptn.missionalertbot.modules.MissionOutbox import queue_mission_reddit_repost, queue_mission_webhook_edits, save_edited_mission
+from ptn.missionalertbot.modules.ProgressReporter import ProgressReporter
+
+
+# the mission fields shown by each part of a sent mission
+edit_target_fields = {
+    'alert': ['mission_type', 'commodity_name', 'system', 'station', 'profit', 'demand', 'pads'], # trade alert and hauler ping
+    'channel_embeds': ['mission_type', 'commodity_name', 'system', 'station', 'profit', 'demand', 'pads', 'cco_message_text'], # carrier channel and webhook embeds
+    'image': ['mission_type'], # carrier channel and webhook image
+    'reddit': ['mission_type', 'commodity_name', 'system', 'station', 'profit', 'demand', 'pads', 'cco_message_text'] # Reddit post title, image and comment
+}
+
+
+def changed_mission_fields(original_params: MissionParams, mission_params: MissionParams):
+    """
+    The displayed fields an edit changed.
+
+    :param MissionParams original_params: The mission before the edit
+    :param MissionParams mission_params: The edited mission
+    :rtype: set[str]
+    """
+    fields = {field for target_fields in edit_target_fields.values() for field in target_fields}
+    # compared as text, as edits give us numbers as typed
+    return {field for field in fields if str(getattr(original_params, field, None)) != str(getattr(mission_params, field, None))}
+
+
+def mission_edit_targets(original_params: MissionParams, mission_params: MissionParams):
+    """
+    The parts of a sent mission an edit needs to update.
+
+    :param MissionParams original_params: The mission before the edit
+    :param MissionParams mission_params: The edited mission
+    :returns: Names from edit_target_fields, plus 'webhooks' if the mission's webhook messages need updating
+    :rtype: set[str]
+    """
+    changed = changed_mission_fields(original_params, mission_params)
+    print(f"Mission edit changed: {', '.join(sorted(changed)) or 'nothing'}")
+
+    targets = {target for target, fields in edit_target_fields.items() if changed.intersection(fields)}
+    if mission_params.booze_cruise and 'cco_message_text' in changed:
+        targets.add('alert') # BC alerts carry the CCO's message
+    if targets.intersection(['channel_embeds', 'image']):
+        targets.add('webhooks') # webhooks get the channel embeds and image
+    return targets
 
 
 class EditConfirmView(View):
-    def __init__(self, mission_params, original_type, confirm_embed, author: typing.Union[discord.Member, discord.User], timeout=300):
+    def __init__(self, mission_params, original_params, confirm_embed, author: typing.Union[discord.Member, discord.User], timeout=300):
         self.spamchannel: discord.TextChannel = bot.get_channel(bot_spam_channel())
         self.confirm_embed = confirm_embed
         self.author = author
-        self.original_type = original_type
+        self.original_params: MissionParams = original_params
         self.mission_params: MissionParams = mission_params
         super().__init__(timeout=timeout)
         self.message_button.style=discord.ButtonStyle.primary if self.mission_params.cco_message_text else discord.ButtonStyle.secondary
@@ -58,19 +103,20 @@ class EditConfirmView(View):
             await interaction.response.edit_message(embed=edit_embed, view=None)
         except Exception as e:
             print(e)
+        self.stop() # the edit is underway, so don't time out over its result
 
-        alerts_channel = await edit_discord_alerts(interaction, self.mission_params, self.spamchannel)
-        await edit_discord_message(interaction, self.mission_params, self.spamchannel, self.original_type, alerts_channel)
-        await update_webhooks(interaction, self.mission_params, self.spamchannel, self.original_type)
-        await update_reddit_post(interaction, self.mission_params, self.spamchannel)
-        await update_mission_db(interaction, self.mission_params, self.spamchannel)
-
+        # report the edit's steps in the message we just edited
         try:
-            print("Calling cleanup for temp files")
-            cleanup_temp_image_file(self.mission_params.discord_img_name)
-            cleanup_temp_image_file(self.mission_params.reddit_img_name)
+            status_message = await interaction.original_response()
         except Exception as e:
-            print(e)
+            print(f"Couldn't get response to report progress in: {e}")
+            status_message = None
+        self.mission_params.progress = ProgressReporter(
+            None if status_message else interaction.channel, f"Updating mission for {self.mission_params.carrier_data.carrier_long_name}",
+            message=status_message, log_channel=self.spamchannel, log_title=f"Mission edit for {self.mission_params.carrier_data.carrier_long_name}"
+        )
+
+        await apply_mission_edit(interaction, self.mission_params, self.original_params, self.spamchannel)
 
         await mission_generation_complete(interaction, self.mission_params)
 
@@ -94,7 +140,7 @@ class EditConfirmView(View):
     async def message_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         print(f"{interaction.user.display_name} wants to add a message to their mission")
     
-        await interaction.response.send_modal(AddMessageModal(self.mission_params, self.original_type, self.confirm_embed, self.author))
+        await interaction.response.send_modal(AddMessageModal(self.mission_params, self.original_params, self.confirm_embed, self.author))
 
     async def interaction_check(self, interaction: discord.Interaction): # only allow original command user to interact with buttons
         if interaction.user.id == self.author.id:
@@ -132,9 +178,9 @@ class EditConfirmView(View):
 
 # modal for message button
 class AddMessageModal(Modal):
-    def __init__(self, mission_params, original_type, confirm_embed, author, title = 'Add message to mission', timeout = None) -> None:
+    def __init__(self, mission_params, original_params, confirm_embed, author, title = 'Add message to mission', timeout = None) -> None:
         self.mission_params: MissionParams = mission_params
-        self.original_type = original_type
+        self.original_params: MissionParams = original_params
         self.confirm_embed = confirm_embed
         self.author = author
         self.message.default = self.mission_params.cco_message_text if self.mission_params.cco_message_text else None
@@ -162,8 +208,8 @@ class AddMessageModal(Modal):
             While self.message returns the inputted text if printed, it is actually a class holding
             all the attributes of the TextInput. View shows only the text the user inputted.
 
-            This is important because it is a weak instance and cannot be pickled with mission_params,
-            and we only want the value pickled anyway
+            This is important because it is a weak instance and cannot be stored with mission_params,
+            and we only want the value stored anyway
             """
             print(self.mission_params.cco_message_text)
             message_embed.title="✍ MESSAGE SET"
@@ -183,7 +229,7 @@ class AddMessageModal(Modal):
         embeds.append(self.confirm_embed)
         embeds.append(message_embed)
 
-        view = EditConfirmView(self.mission_params, self.original_type, self.confirm_embed, self.author)
+        view = EditConfirmView(self.mission_params, self.original_params, self.confirm_embed, self.author)
 
         try:
             await interaction.response.edit_message(embeds=embeds, view=view)
@@ -192,8 +238,9 @@ class AddMessageModal(Modal):
             print(e)
 
 
-async def edit_active_mission(interaction: discord.Interaction, mission_params: MissionParams, original_commodity, original_type):
+async def edit_active_mission(interaction: discord.Interaction, mission_params: MissionParams, original_params: MissionParams):
     print("Called edit_active_mission")
+    original_commodity = original_params.commodity_name
     mission_params.returnflag = True
 
     # validate profit
@@ -230,7 +277,7 @@ async def edit_active_mission(interaction: discord.Interaction, mission_params:
 
     mission_params.edit_embed = None
 
-    view = EditConfirmView(mission_params, original_type, confirm_embed, interaction.user) # confirm/cancel buttons
+    view = EditConfirmView(mission_params, original_params, confirm_embed, interaction.user) # confirm/cancel buttons
 
     await interaction.response.send_message(embed=confirm_embed, view=view)
 
@@ -243,61 +290,106 @@ async def edit_active_mission(interaction: discord.Interaction, mission_params:
 
 
 
+async def apply_mission_edit(interaction: discord.Interaction, mission_params: MissionParams, original_params: MissionParams, spamchannel):
+    """
+    Update the parts of a sent mission that show something the edit changed, and save the edit.
+
+    Discord messages are edited at once, then the edit is saved, then webhooks and Reddit are queued to be
+    updated in the background from the saved mission.
+
+    :param discord.Interaction interaction: The interaction confirming the edit
+    :param MissionParams mission_params: The edited mission
+    :param MissionParams original_params: The mission before the edit
+    :param discord.TextChannel spamchannel: Where errors are logged
+    """
+    targets = mission_edit_targets(original_params, mission_params)
+    print(f"Mission edit targets: {', '.join(sorted(targets)) or 'none'}")
+
+    if not targets:
+        await report_step(interaction, mission_params, "Nothing shown in the mission's alerts has changed, so they were left as they are.")
+
+    # the alert text is shared by the trade alert and the hauler ping
+    mission_params.discord_text = txt_create_discord(interaction, mission_params)
+
+    discord_updates = []
+    if 'alert' in targets:
+        discord_updates.append(edit_discord_alerts(interaction, mission_params, spamchannel))
+    if targets.intersection(['alert', 'channel_embeds', 'image']):
+        discord_updates.append(edit_discord_message(interaction, mission_params, spamchannel, targets))
+    await asyncio.gather(*discord_updates)
+
+    # replacements for deleted messages are recorded too
+    await update_mission_db(interaction, mission_params, spamchannel)
+
+    # webhooks and Reddit are updated in the background from the saved mission
+    if 'webhooks' in targets:
+        await update_webhooks(interaction, mission_params, spamchannel, 'image' in targets)
+    if 'reddit' in targets:
+        await update_reddit_post(interaction, mission_params, spamchannel)
+
+
+async def _mission_owner(mission_params: MissionParams):
+    # the cached member saves an API call, so only fetch if they aren't cached
+    guild = await get_guild()
+    owner = guild.get_member(mission_params.carrier_data.ownerid)
+    if owner:
+        return owner
+    try:
+        owner = await guild.fetch_member(mission_params.carrier_data.ownerid)
+        print(f"Owner identified as {owner.display_name}")
+        return owner
+    except:
+        print("Error resolving Discord member from owner")
+        raise EnvironmentError(f'Could not find Discord user matching ID {mission_params.carrier_data.ownerid}')
+
+
 async def edit_discord_alerts(interaction: discord.Interaction, mission_params: MissionParams, spamchannel, commodities_in_stock = None):
     print("Updating Discord alert...")
 
+    alerts_channel = None
+
     async with interaction.channel.typing():
         try:
             # resolve alerts channel
-            alerts_channel = bot.get_channel(mission_params.channel_alerts_actual)          
+            alerts_channel = bot.get_channel(mission_params.channel_alerts_actual)
 
             print(alerts_channel)
             print(mission_params.discord_alert_id)
 
-            # get message object from trade alerts
-            print("Fetch alerts message from Discord by ID")
-            try:
-                discord_alert_msg = await alerts_channel.fetch_message(mission_params.discord_alert_id)
-            except:
-                print("No discord alert message found")
-                discord_alert_msg = None
-
             # get new trade alert message
-            # resolve owner
-            guild = await get_guild()
-            try:
-                owner = await guild.fetch_member(mission_params.carrier_data.ownerid)
-                print(f"Owner identified as {owner.display_name}")
-            except:
-                print("Error resolving Discord member from owner")
-                raise EnvironmentError(f'Could not find Discord user matching ID {mission_params.carrier_data.ownerid}')
+            owner = await _mission_owner(mission_params)
 
             print("Create new alert text and embed")
             mission_params.discord_text = txt_create_discord(interaction, mission_params, False, commodities_in_stock)
 
             embed = await return_discord_alert_embed(owner, mission_params)
 
-            # edit in new trade alert message
-            if discord_alert_msg:
+            # edit in new trade alert message; we don't fetch it first, Discord tells us if it's gone
+            alert_found = bool(mission_params.discord_alert_id)
+            if alert_found:
+                discord_alert_msg = alerts_channel.get_partial_message(mission_params.discord_alert_id)
                 try:
                     print("Edit alert message")
-                    await discord_alert_msg.edit(content=mission_params.discord_text, suppress=True) if mission_params.booze_cruise else await discord_alert_msg.edit(embed=embed) 
+                    await discord_alert_msg.edit(content=mission_params.discord_text, suppress=True) if mission_params.booze_cruise else await discord_alert_msg.edit(embed=embed)
+                    if mission_params.progress:
+                        mission_params.progress.step(f"✅ Trade alert updated in <#{alerts_channel.id}>.")
+
+                except NotFound:
+                    print("No discord alert message found")
+                    alert_found = False
 
                 except Exception as e:
                     print(e)
                     embed=discord.Embed(description=f"Error editing discord alert: {e}", color=constants.EMBED_COLOUR_ERROR)
                     await spamchannel.send(embed=embed)
-            else:
+
+            if not alert_found:
                 try:
                     print("Send new alert")
 
                     await send_discord_alert(interaction, owner, mission_params)
 
-                    embed = discord.Embed(
-                        description=f"Original alert not found. Replacement sent to <#{mission_params.channel_alerts_actual}>",
-                        color=constants.EMBED_COLOUR_WARNING
-                    )
-                    await interaction.channel.send(embed=embed)
+                    await report_step(interaction, mission_params, f"⚠ Original alert not found. Replacement sent to <#{mission_params.channel_alerts_actual}>")
                 except Exception as e:
                     error = f'Original alert not found and unable to send new: {e}'
                     try:
@@ -311,25 +403,31 @@ async def edit_discord_alerts(interaction: discord.Interaction, mission_params:
     return alerts_channel
 
 
-async def edit_discord_message(interaction: discord.Interaction, mission_params: MissionParams, spamchannel, original_type, alerts_channel: discord.TextChannel):
+async def edit_discord_message(interaction: discord.Interaction, mission_params: MissionParams, spamchannel, targets):
     print("Updating Discord channel embeds...")
 
     async with interaction.channel.typing():
-        try:
-            # get message object from carrier channel
-            carrier_channel = bot.get_channel(mission_params.mission_temp_channel_id)
-            try:
-                discord_channel_msg = await carrier_channel.fetch_message(mission_params.discord_msg_id)
-            except:
-                discord_channel_msg = None
+        carrier_channel = bot.get_channel(mission_params.mission_temp_channel_id)
 
-            if mission_params.notify_msg_id:
-                try:
-                    discord_notify_msg = await carrier_channel.fetch_message(mission_params.notify_msg_id)
-                except:
-                    pass
+        # the hauler ping carries the alert text
+        if 'alert' in targets and mission_params.notify_msg_id:
+            try:
+                if hasattr(mission_params, "booze_cruise"): # 2.3.0+
+                    ping_role_id = mission_params.role_ping_actual
+                else: # pre-2.3.0 compatibility
+                    ping_role_id = wineloader_role() if mission_params.commodity_name.title == 'Wine' else hauler_role()
+                discord_notify_msg = carrier_channel.get_partial_message(mission_params.notify_msg_id)
+                await discord_notify_msg.edit(content=f"<@&{ping_role_id}>: {mission_params.discord_text}", suppress=True)
+            except Exception as e:
+                print(f"Couldn't update hauler ping: {e}")
+
+        if not targets.intersection(['channel_embeds', 'image']):
+            return
 
-            if discord_channel_msg:
+        try:
+            # edit in the new channel message; we don't fetch it first, Discord tells us if it's gone
+            message_found = bool(mission_params.discord_msg_id)
+            if message_found:
                 # get new channel embeds from Mission Generator
                 print("Get new channel embeds from Mission Generator")
                 discord_embeds = await return_discord_channel_embeds(mission_params) # this function saves embeds to mission_params too
@@ -339,48 +437,33 @@ async def edit_discord_message(interaction: discord.Interaction, mission_params:
                 print("Checking for cco_message_text status...")
                 if mission_params.cco_message_text is not None: send_embeds.append(discord_embeds.owner_text_embed)
 
-                if mission_params.notify_msg_id: 
-                    if hasattr(mission_params, "booze_cruise"): # 2.3.0+
-                        ping_role_id = mission_params.role_ping_actual
-                    else: # pre-2.3.0 compatibility
-                        ping_role_id = wineloader_role() if mission_params.commodity_name.title == 'Wine' else hauler_role()
-                    await discord_notify_msg.edit(content=f"<@&{ping_role_id}>: {mission_params.discord_text}", suppress=True)
-
-                print("Checking mission_type status...")
-                if original_type != mission_params.mission_type:
-                    try:
-                        print(f"Type changed to {mission_params.mission_type} (from {original_type}), creating new image")
-                        mission_params.discord_img_name = await create_carrier_discord_mission_image(mission_params)
-
-                        file = discord.File(mission_params.discord_img_name, filename="image.png")
-                        print(file)
+                discord_channel_msg = carrier_channel.get_partial_message(mission_params.discord_msg_id)
+                try:
+                    if 'image' in targets:
+                        print(f"Type changed to {mission_params.mission_type}, creating new image")
+                        mission_params.discord_img = await create_carrier_discord_mission_image(mission_params)
 
-                        print("Uploading new image...")
-                        # await discord_channel_msg.add_files(file)
+                        print("Editing Discord channel message with new image...")
+                        await discord_channel_msg.edit(content=mission_params.discord_msg_content, embeds=send_embeds, attachments=[image_file(mission_params.discord_img)])
 
+                    else:
                         print("Editing Discord channel message...")
-                        await discord_channel_msg.edit(content=mission_params.discord_msg_content, embeds=send_embeds, attachments=[file])
+                        await discord_channel_msg.edit(content=mission_params.discord_msg_content, embeds=send_embeds)
 
-                    except Exception as e:
-                        print(e)
+                    if mission_params.progress:
+                        mission_params.progress.step(f"✅ Carrier channel message updated in <#{mission_params.mission_temp_channel_id}>.")
 
-                else:
-                    print("Editing Discord channel message...")
-                    await discord_channel_msg.edit(content=mission_params.discord_msg_content, embeds=send_embeds)
+                except NotFound:
+                    message_found = False
 
-            else: # haha did someone delete their message, who would possibly do that ZEPPTRIL
+            if not message_found: # haha did someone delete their message, who would possibly do that ZEPPTRIL
                 print("No message found, sending a new one...")
                 try:
-                    mission_temp_channel = bot.get_channel(mission_params.mission_temp_channel_id)
-                    await send_discord_channel_message(interaction, mission_params, mission_temp_channel)
+                    await send_discord_channel_message(interaction, mission_params, carrier_channel)
 
-                    discord_channel_msg = await carrier_channel.fetch_message(mission_params.discord_msg_id)
+                    discord_channel_msg = carrier_channel.get_partial_message(mission_params.discord_msg_id)
 
-                    embed = discord.Embed(
-                        description=f"Original channel message not found. Replacement sent to {discord_channel_msg.jump_url}",
-                        color=constants.EMBED_COLOUR_WARNING
-                    )
-                    await interaction.channel.send(embed=embed)
+                    await report_step(interaction, mission_params, f"⚠ Original channel message not found. Replacement sent to {discord_channel_msg.jump_url}")
                 except Exception as e:
                     error = f'Original channel message not found and unable to send new: {e}'
                     try:
@@ -388,81 +471,30 @@ async def edit_discord_message(interaction: discord.Interaction, mission_params:
                     except Exception as e:
                         await on_generic_error(interaction, e)
 
-        except Exception as e:
-            print(e)
-
-        try:
-            await discord_channel_msg.edit(embeds=send_embeds)
-            print("Feeding back to user...")
-            embed = discord.Embed(
-                title=f"Discord trade alerts updated for {mission_params.carrier_data.carrier_long_name}",
-                description=f"Check <#{alerts_channel.id}> for trade alert and "
-                            f"<#{mission_params.mission_temp_channel_id}> for image.",
-                color=constants.EMBED_COLOUR_DISCORD
-            )
-            embed.set_thumbnail(url=constants.ICON_DISCORD_CIRCLE)
-            await interaction.channel.send(embed=embed)
         except Exception as e:
             print(e)
             embed=discord.Embed(description=f"Error editing discord channel message: {e}", color=constants.EMBED_COLOUR_ERROR)
             await spamchannel.send(embed=embed)
 
 
-async def update_webhooks(interaction: discord.Interaction, mission_params, spamchannel, original_type):
+async def update_webhooks(interaction: discord.Interaction, mission_params, spamchannel, image_changed):
     print("Updating webhooks...")
     async with interaction.channel.typing():
         if mission_params.webhook_urls and mission_params.webhook_msg_ids and mission_params.webhook_jump_urls:
 
-            print("Defining Discord embeds...")
-            discord_embeds = mission_params.discord_embeds
-            webhook_embeds = [discord_embeds.buy_embed, discord_embeds.sell_embed, discord_embeds.webhook_info_embed]
-
-            if mission_params.cco_message_text: webhook_embeds.append(discord_embeds.owner_text_embed)
-
-            for webhook_name, webhook_url, webhook_msg_id, webhook_jump_url in zip(mission_params.webhook_names, mission_params.webhook_urls, mission_params.webhook_msg_ids, mission_params.webhook_jump_urls):
-                try: 
-                    async with aiohttp.ClientSession() as session:
-                        print(f"Fetching webhook for {webhook_url} with jumpurl {webhook_jump_url} and ID {webhook_msg_id}")
-                        webhook = Webhook.from_url(webhook_url, session=session, client=bot)
-                        print("Fetching webhook message object")
-                        webhook_msg = await webhook.fetch_message(webhook_msg_id)
-
-                        if original_type != mission_params.mission_type:
-                            # type has changed, need to change image too
-                            try:
-                                print(f"Type changed to {mission_params.mission_type} (from {original_type}), creating new image")
-                                mission_params.discord_img_name = await create_carrier_discord_mission_image(mission_params)
-
-                                file = discord.File(mission_params.discord_img_name, filename="image.png")
-                                print(file)
-
-                                print("Uploading new image...")
-                                # await discord_channel_msg.add_files(file)
-
-                                print("Editing Discord channel message...")
-                                await webhook_msg.edit(embeds=webhook_embeds, attachments=[file])
-                            
-                            except Exception as e:
-                                print(e)
-
-                        else:
-                            # don't need to change image
-                            print("Editing webhook message...")
-                            await webhook_msg.edit(embeds=webhook_embeds)
-
-                        print("Feeding back to user...")
-                        embed = discord.Embed(
-                            title=f"Webhook alert updated for {mission_params.carrier_data.carrier_long_name}",
-                            description=f"Sent to your webhook **{webhook_name}**: {webhook_jump_url}",
-                            color=constants.EMBED_COLOUR_DISCORD
-                        )
-                        embed.set_thumbnail(url=constants.ICON_WEBHOOK_PTN)
-                        await interaction.channel.send(embed=embed)
+            if image_changed:
+                print(f"Type changed to {mission_params.mission_type}, webhook images will be replaced")
 
-                except Exception as e:
-                    print(f"Failed updating webhook message {webhook_jump_url} with URL {webhook_url}: {e}")
-                    embed=discord.Embed(description=f"Failed updating webhook message {webhook_jump_url} with URL {webhook_url}: {e}", color=constants.EMBED_COLOUR_ERROR)
-                    await spamchannel.send(embed=embed)
+            try:
+                await queue_mission_webhook_edits(mission_params, image_changed, interaction.id, interaction.channel.id)
+
+                print("Feeding back to user...")
+                await report_step(interaction, mission_params, f"⏳ Updating {len(mission_params.webhook_msg_ids)} webhook messages in the background, results will follow here.")
+
+            except Exception as e:
+                print(f"Failed queueing webhook updates: {e}")
+                embed=discord.Embed(description=f"Failed queueing webhook updates: {e}", color=constants.EMBED_COLOUR_ERROR)
+                await spamchannel.send(embed=embed)
 
 
 async def update_reddit_post(interaction: discord.Interaction, mission_params, spamchannel):
@@ -471,81 +503,18 @@ async def update_reddit_post(interaction: discord.Interaction, mission_params, s
         if not mission_params.reddit_post_id:
             return
 
-        print("Generating new Reddit texts and image...")
-        mission_params.reddit_title = txt_create_reddit_title(mission_params)
-        mission_params.reddit_body = txt_create_reddit_body(mission_params)
-        mission_params.reddit_img_name = await create_carrier_reddit_mission_image(mission_params)
-
-        original_reddit_post_id = mission_params.reddit_post_id
-        print(original_reddit_post_id)
-
         try:
-            # post to reddit
-            print("Sending new Reddit post")
-            reddit = await get_reddit()
-            subreddit = await reddit.subreddit(mission_params.channel_defs.sub_reddit_actual)
-            submission = await subreddit.submit_image(mission_params.reddit_title, image_path=mission_params.reddit_img_name,
-                                                    flair_id=mission_params.channel_defs.reddit_flair_in_progress)
-            # save new mission_params
-            print(f"Original post ID: {original_reddit_post_id}")
-
-            mission_params.reddit_post_url = submission.permalink
-            mission_params.reddit_post_id = submission.id
-            print(f"New post ID: {mission_params.reddit_post_id}")
-
-            if mission_params.cco_message_text:
-                comment = await submission.reply(f"> {mission_params.cco_message_text}\n\n&#x200B;\n\n{mission_params.reddit_body}")
-            else:
-                comment = await submission.reply(mission_params.reddit_body)
-
-            # save new params
-            mission_params.reddit_comment_url = comment.permalink
-            mission_params.reddit_comment_id = comment.id
-            print(f"New comment ID: {mission_params.reddit_comment_id}")
+            # the new post replaces whichever is live when it's sent, and gets its texts from the saved mission
+            print("Queueing new Reddit post")
+            await queue_mission_reddit_repost(mission_params, interaction.id, interaction.channel.id)
 
             # feed back to user
-            embed = discord.Embed(
-                title=f"Reddit trade alert sent for {mission_params.carrier_data.carrier_long_name}",
-                description=f"https://www.reddit.com{mission_params.reddit_post_url}",
-                color=constants.EMBED_COLOUR_REDDIT)
-            embed.set_thumbnail(url=constants.ICON_REDDIT)
-            await interaction.channel.send(embed=embed)
-            embed = discord.Embed(title=f"{mission_params.carrier_data.carrier_long_name} REQUIRES YOUR UPDOOTS",
-                                description=f"https://www.reddit.com{mission_params.reddit_post_url}",
-                                color=constants.EMBED_COLOUR_REDDIT)
-            channel = bot.get_channel(mission_params.channel_defs.upvotes_channel_actual)
-            upvote_message = await channel.send(embed=embed)
-            emoji = bot.get_emoji(upvote_emoji())
-            await upvote_message.add_reaction(emoji)
+            await report_step(interaction, mission_params, "⏳ Updated Reddit post queued, it'll be linked here once it's up.")
 
         except Exception as e:
-            print(f"Error posting to Reddit: {e}")
-            reddit_error_embed = discord.Embed(
-                description=f"❌ Could not send to Reddit. {e}",
-                color=constants.EMBED_COLOUR_ERROR
-            )
-            reddit_error_embed.set_footer(text="Attempting to continue with updates.")
-            await interaction.channel.send(embed=reddit_error_embed)
-            embed=discord.Embed(description=f"Error sending updated Reddit post: {e}", color=constants.EMBED_COLOUR_ERROR)
-            await spamchannel.send(embed=embed)
-
-        # now update the original post
-        try:
-            print("Updating old Reddit post")
-            print(original_reddit_post_id)
-            reddit_edit_text = f"**MISSION UPDATED**\n\nNew mission details [here]({mission_params.reddit_post_url})."
-            original_post = await reddit.submission(original_reddit_post_id)
-            print("Sending comment reply")
-            await original_post.reply(reddit_edit_text)
-            # mark original post as spoiler, change its flair
-            print("Marking spoiler and setting flair")
-            await original_post.flair.select(mission_params.channel_defs.reddit_flair_completed)
-            await original_post.mod.spoiler()
-        except Exception as e:
-            embed=discord.Embed(description=f"❌ Couldn't send comment to original Reddit post: {e}", color=constants.EMBED_COLOUR_ERROR)
-            embed.set_footer(text="Attempting to continue with updates.")
-            await interaction.channel.send(embed=embed)
-            embed=discord.Embed(description=f"Error sending comment to old Reddit post on mission update: {e}", color=constants.EMBED_COLOUR_ERROR)
+            print(f"Error queueing Reddit post: {e}")
+            await report_step(interaction, mission_params, f"❌ Could not send to Reddit. {e} Attempting to continue with updates.")
+            embed=discord.Embed(description=f"Error queueing updated Reddit post: {e}", color=constants.EMBED_COLOUR_ERROR)
             await spamchannel.send(embed=embed)
 
 
@@ -553,11 +522,11 @@ async def update_mission_db(interaction: discord.Interaction, mission_params, sp
     print("Attemping to update database")
     async with interaction.channel.typing():
         try:
-            await _update_mission_in_database(mission_params)
+            await save_edited_mission(mission_params)
         except Exception as e:
             embed=discord.Embed(description=f"Error updating mission database: {e}", color=constants.EMBED_COLOUR_ERROR)
             await spamchannel.send(embed=embed)
-            await interaction.channel.send(embed=embed)
+            await report_step(interaction, mission_params, f"❌ Error updating mission database: {e}")
 
 
 async def commodity_wine_error(interaction: discord.Interaction, mission_params):
@@ -3,15 +3,13 @@ MissionGenerator.py
 
 Functions relating to mission generation, management, and clean-up.
 
-Dependencies: constants, database, helpers, Embeds, ImageHandling, MissionCleaner
+Dependencies: constants, database, helpers, ChannelIndex, ChannelPool, Embeds, ImageHandling, MissionCleaner, MissionOutbox, ProgressReporter
 
 """
 # import libraries
 from typing import List, Optional
-import aiohttp
 import asyncio
 import os
-import pickle
 from PIL import Image
 import random
 import traceback
@@ -21,44 +19,36 @@ from time import strftime
 
 # import discord.py
 import discord
-from discord import Webhook
 from discord.errors import HTTPException, Forbidden, NotFound
 from discord.ui import View, Modal
 
 # import local classes
-from ptn.missionalertbot.classes.CarrierData import CarrierData
 from ptn.missionalertbot.classes.MissionData import MissionData
 from ptn.missionalertbot.classes.MissionParams import MissionParams
 
 # import local constants
 import ptn.missionalertbot.constants as constants
-from ptn.missionalertbot.constants import bot, get_reddit, seconds_short, upvote_emoji, hauler_role, trainee_role, reddit_timeout, \
+from ptn.missionalertbot.constants import bot, seconds_short, upvote_emoji, hauler_role, trainee_role, \
     get_guild, get_overwrite_perms, ptn_logo_discord, wineloader_role, o7_emoji, bot_spam_channel, discord_emoji, training_cat, \
-    trade_cat, mcomplete_id, somm_role, pilot_role
+    trade_cat, somm_role, pilot_role
 
 # import local modules
-from ptn.missionalertbot.database.database import backup_database, mission_db, missions_conn, find_carrier, CarrierDbFields, \
-    find_commodity, find_mission, carrier_db, carriers_conn, find_webhook_from_owner, _update_carrier_last_trade
+from ptn.missionalertbot.database.database import backup_database, mission_db_executor, find_carrier, CarrierDbFields, \
+    find_commodity, find_mission, find_webhook_from_owner, _update_carrier_last_trade
 from ptn.missionalertbot.modules.DateString import get_formatted_date_string
-from ptn.missionalertbot.modules.Embeds import _mission_summary_embed
-from ptn.missionalertbot.modules.ErrorHandler import on_generic_error, CustomError, AsyncioTimeoutError, GenericError
-from ptn.missionalertbot.modules.helpers import lock_mission_channel, unlock_mission_channel, check_mission_channel_lock, flexible_carrier_search_term
-from ptn.missionalertbot.modules.ImageHandling import assign_carrier_image, create_carrier_reddit_mission_image, create_carrier_discord_mission_image
+from ptn.missionalertbot.modules.Embeds import _mission_summary_embed, return_discord_channel_embeds
+from ptn.missionalertbot.modules.ErrorHandler import on_generic_error, CustomError, GenericError
+from ptn.missionalertbot.modules.helpers import lock_mission_channel, unlock_mission_channel, channel_locks, flexible_carrier_search_term
+from ptn.missionalertbot.modules.ImageHandling import assign_carrier_image, create_carrier_reddit_mission_image, create_carrier_discord_mission_image, \
+    image_file
+from ptn.missionalertbot.modules.ChannelIndex import channel_index
+from ptn.missionalertbot.modules.ChannelPool import channel_pool
 from ptn.missionalertbot.modules.MissionCleaner import remove_carrier_channel
+from ptn.missionalertbot.modules.MissionOutbox import queue_mission_reddit_post, queue_mission_webhook_sends
+from ptn.missionalertbot.modules.ProgressReporter import ProgressReporter
 from ptn.missionalertbot.modules.TextGen import txt_create_discord, txt_create_reddit_body, txt_create_reddit_title
 
 
-# a class to hold all our Discord embeds
-class DiscordEmbeds:
-    def __init__(self, buy_embed, sell_embed, info_embed, help_embed, owner_text_embed, webhook_info_embed):
-        self.buy_embed = buy_embed
-        self.sell_embed = sell_embed
-        self.info_embed = info_embed
-        self.help_embed = help_embed
-        self.owner_text_embed = owner_text_embed
-        self.webhook_info_embed = webhook_info_embed
-
-
 """
 Mission generator views
 
@@ -301,8 +291,8 @@ class AddMessageModal(Modal):
                 While self.message returns the inputted text if printed, it is actually a class holding
                 all the attributes of the TextInput. View shows only the text the user inputted.
 
-                This is important because it is a weak instance and cannot be pickled with mission_params,
-                and we only want the value pickled anyway
+                This is important because it is a weak instance and cannot be stored with mission_params,
+                and we only want the value stored anyway
                 """
                 print(self.mission_params.cco_message_text)
                 message_embed.title="✍ MESSAGE SET"
@@ -338,7 +328,6 @@ class AddMessageModal(Modal):
             print(e)
 
 
-
 """
 Mission generator helpers
 
@@ -347,7 +336,7 @@ Mission generator helpers
 async def define_reddit_texts(mission_params):
     mission_params.reddit_title = txt_create_reddit_title(mission_params)
     mission_params.reddit_body = txt_create_reddit_body(mission_params)
-    mission_params.reddit_img_name = await create_carrier_reddit_mission_image(mission_params)
+    mission_params.reddit_img = await create_carrier_reddit_mission_image(mission_params)
     print("Defined Reddit elements")
 
 
@@ -431,138 +420,6 @@ async def return_discord_alert_embed(owner: discord.Member, mission_params: Miss
     return embed
 
 
-async def return_discord_channel_embeds(mission_params: MissionParams):
-    carrier_data: CarrierData = mission_params.carrier_data
-    print("Called return_discord_channel_embeds")
-    # generates embeds used for the PTN carrier channel as well as any webhooks
-
-    # define owner avatar
-    guild: discord.Guild = await get_guild()
-    owner: discord.Member = guild.get_member(carrier_data.ownerid)
-    owner_name = owner.display_name
-    owner_avatar = owner.display_avatar
-    pads = "**LARGE**" if 'l' in mission_params.pads.lower() else "**MEDIUM**"
-
-    # define embed content
-    print("Define buy embed")
-    if mission_params.mission_type == 'load': # embeds for a loading mission
-        buy_description=f"📌 Station: **{mission_params.station.upper()}**" \
-                        f"\n🛬 Landing Pad: {pads}" \
-                        f"\n🌟 System: **{mission_params.system.upper()}**" \
-                        f"\n📦 Commodity: **{mission_params.commodity_name.upper()}**"
-
-        buy_thumb = constants.ICON_BUY_FROM_STATION
-
-        sell_description=f"🎯 Fleet Carrier: **{carrier_data.carrier_long_name}**" \
-                         f"\n🔢 Carrier ID: **{carrier_data.carrier_identifier}**" \
-                         f"\n💰 Profit: **{mission_params.profit}K PER TON**" \
-                         f"\n📥 Demand: **{mission_params.demand}K TONS**"
-
-        sell_thumb = constants.ICON_SELL_TO_CARRIER
-
-        embed_colour = constants.EMBED_COLOUR_LOADING
-
-    else: # embeds for an unloading mission
-        buy_description=f"🎯 Fleet Carrier: **{carrier_data.carrier_long_name}**" \
-                        f"\n🔢 Carrier ID: **{carrier_data.carrier_identifier}**" \
-                        f"\n🌟 System: **{mission_params.system.upper()}**" \
-                        f"\n📦 Commodity: **{mission_params.commodity_name.upper()}**" \
-                         f"\n📤 Supply: **{mission_params.demand}K TONS**"
-
-        buy_thumb = constants.ICON_BUY_FROM_CARRIER
-
-        sell_description=f"📌 Station: **{mission_params.station.upper()}**" \
-                         f"\n🛬 Landing Pad: {pads}" \
-                         f"\n💰 Profit: **{mission_params.profit}K PER TON**" \
-
-        sell_thumb = constants.ICON_SELL_TO_STATION
-
-        embed_colour = constants.EMBED_COLOUR_UNLOADING
-
-    print("Define sell embed")
-    # desc used by the local PTN additional info embed
-    if constants.commandid_stock:
-        stock_string = f"</stock:{constants.commandid_stock}>"
-    else:
-        stock_string = "`/stock`"
-    additional_info_description = f"💎 Carrier Owner: <@{carrier_data.ownerid}>" \
-                                  f"\n🔤 Carrier information: </info:849040914948554766>" \
-                                  f"\n📊 Stock information: {stock_string}\n\n"
-
-    print("Define help embed (local)")
-    # desc used by the local PTN help embed
-    if mission_params.edmc_off:
-        edmc_text = "\n\n🤫 This mission is flagged **EDMC-OFF**. Please disable/quit **all journal reporting apps** such as EDMC, EDDiscovery, etc."
-    else:
-        edmc_text = f"\n\n:warning: cAPI stock is updated once per hour. Run [EDMC](https://github.com/EDCD/EDMarketConnector/wiki/Installation-&-Setup) " \
-                    f"and use `/stock source:Inara` for more frequent stock updates."
-    help_description = f"✅ Use </mission complete:{mcomplete_id()}> in this channel if the mission is completed, or unable to be completed (e.g. because of a station price change, or supply exhaustion)." \
-                       f"\n\n💡 Need help? Here's our [complete guide to PTN trade missions](https://pilotstradenetwork.com/fleet-carrier-trade-missions/).{edmc_text}"
-
-    print("Define descs")
-    # desc used for sending cco_message_text
-    owner_text_description = mission_params.cco_message_text
-
-    # desc used by the webhook additional info embed
-    webhook_info_description = f"💎 Carrier Owner: <@{carrier_data.ownerid}>" \
-                               f"\n🔤 [PTN Discord](https://discord.gg/ptn)" \
-                                "\n💡 [PTN trade mission guide](https://pilotstradenetwork.com/fleet-carrier-trade-missions/)"
-
-    print("Define embed objects")
-    buy_embed = discord.Embed(
-        title="BUY FROM",
-        description=buy_description,
-        color=embed_colour
-    )
-    buy_embed.set_image(url=constants.BLANKLINE_400PX)
-    buy_embed.set_thumbnail(url=buy_thumb)
-
-    sell_embed = discord.Embed(
-        title="SELL TO",
-        description=sell_description,
-        color=embed_colour
-    )
-    sell_embed.set_image(url=constants.BLANKLINE_400PX)
-    sell_embed.set_thumbnail(url=sell_thumb)
-
-    info_embed = discord.Embed(
-        title="ADDITIONAL INFORMATION",
-        description=additional_info_description,
-        color=embed_colour
-    )
-    info_embed.set_image(url=constants.BLANKLINE_400PX)
-    info_embed.set_thumbnail(url=owner_avatar)
-
-    help_embed = discord.Embed(
-        description=help_description,
-        color=embed_colour
-    )
-    help_embed.set_image(url=constants.BLANKLINE_400PX)
-
-    owner_text_embed = discord.Embed(
-        title=f"MESSAGE FROM CARRIER OWNER",
-        description=owner_text_description,
-        color=constants.EMBED_COLOUR_RP
-    )
-    owner_text_embed.set_image(url=constants.BLANKLINE_400PX)
-    owner_text_embed.set_thumbnail(url=constants.ICON_DATA)
-
-    webhook_info_embed = discord.Embed(
-        title="ADDITIONAL INFORMATION",
-        description=webhook_info_description,
-        color=embed_colour
-    )
-    webhook_info_embed.set_image(url=constants.BLANKLINE_400PX)
-    webhook_info_embed.set_thumbnail(url=owner_avatar)
-
-    print("instantiate DiscordEmbeds class")
-    discord_embeds = DiscordEmbeds(buy_embed, sell_embed, info_embed, help_embed, owner_text_embed, webhook_info_embed)
-
-    mission_params.discord_embeds = discord_embeds
-
-    return discord_embeds
-
-
 async def send_mission_to_discord(interaction: discord.Interaction, owner: discord.Member, mission_params: MissionParams):
     print("User used option d, creating mission channel")
 
@@ -571,7 +428,7 @@ async def send_mission_to_discord(interaction: discord.Interaction, owner: disco
     mission_params.mission_temp_channel_id = await create_mission_temp_channel(interaction, owner, mission_params)
     mission_temp_channel = bot.get_channel(mission_params.mission_temp_channel_id)
 
-    message_send = await interaction.channel.send("**Sending to Discord...**")
+    sending_step = mission_params.progress.step("⏳ Sending to Discord...")
     try:
         if not mission_temp_channel:
             raise RuntimeError("Failed to get mission channel")
@@ -585,14 +442,8 @@ async def send_mission_to_discord(interaction: discord.Interaction, owner: disco
         if not submit_mission: return
 
         print("Feeding back to user...")
-        embed = discord.Embed(
-            title=f"Discord trade alerts sent for {mission_params.carrier_data.carrier_long_name}",
-            description=f"Check <#{mission_params.channel_alerts_actual}> for trade alert and "
-                        f"<#{mission_params.mission_temp_channel_id}> for carrier channel alert.",
-            color=constants.EMBED_COLOUR_DISCORD)
-        embed.set_thumbnail(url=constants.ICON_DISCORD_CIRCLE)
-        await interaction.channel.send(embed=embed)
-        await message_send.delete()
+        mission_params.progress.update(sending_step, f"✅ Discord trade alerts sent: check <#{mission_params.channel_alerts_actual}> for trade alert and "
+                                                     f"<#{mission_params.mission_temp_channel_id}> for carrier channel alert.")
 
         submit_mission = True
 
@@ -600,10 +451,18 @@ async def send_mission_to_discord(interaction: discord.Interaction, owner: disco
 
     except Exception as e:
         print(f"Error sending to Discord: {e}")
-        await interaction.channel.send(f"❌ Could not send to Discord, mission generation aborted: {e}")
+        mission_params.progress.update(sending_step, f"❌ Could not send to Discord, mission generation aborted: {e}")
         return
 
 
+async def report_step(interaction: discord.Interaction, mission_params: MissionParams, line):
+    # steps are added to the progress message when the mission has one, and sent on their own when it doesn't (e.g. mission edits)
+    if mission_params.progress:
+        mission_params.progress.step(line)
+    else:
+        await interaction.channel.send(embed=discord.Embed(description=line, color=constants.EMBED_COLOUR_DISCORD))
+
+
 async def send_discord_alert(interaction: discord.Interaction, owner: discord.Member, mission_params: MissionParams):
     # generate alert text
     mission_params.discord_text = txt_create_discord(interaction, mission_params)
@@ -643,7 +502,7 @@ async def send_discord_alert(interaction: discord.Interaction, owner: discord.Me
 
     except Exception as e:
         print(f"Error sending to Discord: {e}")
-        await interaction.channel.send(f"❌ Could not send to Discord, mission generation aborted: {e}")
+        await report_step(interaction, mission_params, f"❌ Could not send to Discord, mission generation aborted: {e}")
         return True
 
 
@@ -653,8 +512,8 @@ async def send_discord_channel_message(interaction: discord.Interaction, mission
             edmc_off_banner_file = discord.File(constants.BANNER_EDMC_OFF, filename="image.png")
             await mission_temp_channel.send(file=edmc_off_banner_file)
 
-        mission_params.discord_img_name = await create_carrier_discord_mission_image(mission_params)
-        discord_file = discord.File(mission_params.discord_img_name, filename="image.png")
+        mission_params.discord_img = await create_carrier_discord_mission_image(mission_params)
+        discord_file = image_file(mission_params.discord_img)
 
         print("Defining Discord embeds...")
         discord_embeds = await return_discord_channel_embeds(mission_params)
@@ -689,16 +548,13 @@ async def send_discord_channel_message(interaction: discord.Interaction, mission
             await pin_edmc.pin()
 
             # notify user
-            embed = discord.Embed(title=f"EDMC OFF messages sent for {mission_params.carrier_data.carrier_long_name}", description='External posts (Reddit, Webhooks) will be skipped.',
-                        color=constants.EMBED_COLOUR_DISCORD)
-            embed.set_thumbnail(url=constants.EMOJI_SHUSH)
-            await interaction.channel.send(embed=embed)
+            await report_step(interaction, mission_params, "🤫 EDMC OFF messages sent, external posts (Reddit, Webhooks) will be skipped.")
 
         return True
 
     except Exception as e:
         print(f"Error sending to Discord: {e}")
-        await interaction.channel.send(f"❌ Could not send to Discord, mission generation aborted: {e}")
+        await report_step(interaction, mission_params, f"❌ Could not send to Discord, mission generation aborted: {e}")
         return False
 
 async def check_profit_margin_on_external_send(interaction, mission_params):
@@ -706,141 +562,20 @@ async def check_profit_margin_on_external_send(interaction, mission_params):
     if float(mission_params.profit) < 10:
         mission_params.returnflag = False
         print(f'Not posting the mission from {interaction.user} to reddit due to low profit margin <10k/t.')
-        embed = discord.Embed(
-            description=f"Skipped external send as {mission_params.profit}K/TON is below the PTN 10K/TON minimum profit margin."
-        )
-        embed.set_footer(text="Whoopsie-daisy.")
-        embed.set_thumbnail(url=constants.ICON_FC_EMPTY)
-        await interaction.channel.send(embed=embed)
+        mission_params.progress.step(f"✖ Skipped external send as {mission_params.profit}K/TON is below the PTN 10K/TON minimum profit margin.")
     else:
         mission_params.returnflag = True
 
 
-async def send_mission_to_subreddit(interaction, mission_params):
+async def queue_mission_to_subreddit(interaction: discord.Interaction, mission_params: MissionParams):
     print("User used option r")
-    await check_profit_margin_on_external_send(interaction, mission_params)
-
-    if mission_params.returnflag == False:
-        return
-
-    else:
-        print("Profit OK, proceeding")
-
-    message_send = await interaction.channel.send("**Sending to Reddit...**")
-
-    if not mission_params.reddit_title: await define_reddit_texts(mission_params)
-
-    try:
-        # post to reddit
-        print("Defining Reddit elements")
-        reddit = await get_reddit()
-        subreddit = await reddit.subreddit(mission_params.channel_defs.sub_reddit_actual)
-        try:
-            async def _post_submission_to_reddit():
-                print("⏳ Attempting Reddit post...")
-                await subreddit.submit_image(mission_params.reddit_title, image_path=mission_params.reddit_img_name,
-                                                flair_id=mission_params.channel_defs.reddit_flair_in_progress,
-                                                without_websockets=True) # temporary ? workaround for PRAW error
-                return
-
-            await asyncio.wait_for(_post_submission_to_reddit(), timeout=reddit_timeout())
-
-        except asyncio.TimeoutError:
-            print("❌⏲ Reddit post send timed out.")
-            await message_send.delete()
-            error = "Timed out while trying to send to Reddit."
-            try:
-                raise AsyncioTimeoutError(error, False)
-            except Exception as e:
-                await on_generic_error(interaction, e)
-            return
-
-        except Exception as e:
-            print(f"❌ Error posting to Reddit: {e}")
-            traceback.print_exc()
-
-        try:
-            print("⏳ Attempting to retrieve Reddit post...")
-            async def _get_new_reddit_post(): # temporary ? workaround for PRAW error
-                submission = None
-                while True:
-                    async for new_post in subreddit.new():
-                        print(f"⏳ Testing submission {new_post}")
-                        if new_post.title == mission_params.reddit_title:
-                            print(f'✅ Found the matching submission: {new_post.title}')
-                            submission = new_post
-                            break
-                    if submission:
-                        break
-                    await asyncio.sleep(5)  # how long to wait before trying again
-                return submission
-
-            submission = await asyncio.wait_for(_get_new_reddit_post(), timeout=reddit_timeout())
-
-        except asyncio.TimeoutError:
-            print("❌⏲ Reddit post retrieval timed out")
-            await message_send.delete()
-            error = "Timed out while trying to get Reddit post link. Reddit URL will not be saved to missions database."
-            try:
-                raise AsyncioTimeoutError(error, False)
-            except Exception as e:
-                await on_generic_error(interaction, e)
-            return
 
+    await queue_mission_reddit_post(mission_params, interaction.channel.id)
 
-        mission_params.reddit_post_url = submission.permalink
-        mission_params.reddit_post_id = submission.id
+    mission_params.progress.step("⏳ Reddit trade alert queued, it'll be linked here once it's up.")
 
-        try:
-            async def post_comment_to_reddit():
-                print("⏳ Attempting to reply to Reddit post...")
-                if mission_params.cco_message_text:
-                    comment = await submission.reply(f"> {mission_params.cco_message_text}\n\n&#x200B;\n\n{mission_params.reddit_body}")
-                else:
-                    comment = await submission.reply(mission_params.reddit_body)
-                mission_params.reddit_comment_url = comment.permalink
-                mission_params.reddit_comment_id = comment.id
-                print(f"✅ Submitted Reddit comment {comment}")
-
-            await asyncio.wait_for(post_comment_to_reddit(), timeout=reddit_timeout())
-
-        except Exception as e:
-            print(f"❌ Reddit comment post failed: {e}")
-            reddit_error_embed = discord.Embed(
-                description=f"❌ Couldn't reply to Reddit post with trade details.",
-                color=constants.EMBED_COLOUR_ERROR
-            )
-            reddit_error_embed.set_footer(text="Attempting to continue with other sends.")
-            await interaction.channel.send(embed=reddit_error_embed)
-
-        embed = discord.Embed(
-            title=f"Reddit trade alert sent for {mission_params.carrier_data.carrier_long_name}",
-            description=f"https://www.reddit.com{mission_params.reddit_post_url}",
-            color=constants.EMBED_COLOUR_REDDIT)
-        embed.set_thumbnail(url=constants.ICON_REDDIT)
-        await interaction.channel.send(embed=embed)
-        await message_send.delete()
-        embed = discord.Embed(title=f"{mission_params.carrier_data.carrier_long_name} REQUIRES YOUR UPDOOTS",
-                            description=f"https://www.reddit.com{mission_params.reddit_post_url}",
-                            color=constants.EMBED_COLOUR_REDDIT)
-        channel = bot.get_channel(mission_params.channel_defs.upvotes_channel_actual)
-        upvote_message = await channel.send(embed=embed)
-        emoji = bot.get_emoji(upvote_emoji())
-        await upvote_message.add_reaction(emoji)
-        return
-    except Exception as e:
-        print(f"Error posting to Reddit: {e}")
-        traceback.print_exc()
-        reddit_error_embed = discord.Embed(
-            description=f"❌ Could not send to Reddit. {e}",
-            color=constants.EMBED_COLOUR_ERROR
-        )
-        reddit_error_embed.set_footer(text="Attempting to continue with other sends.")
-        await interaction.channel.send(embed=reddit_error_embed)
-        await message_send.delete()
 
-
-async def send_mission_to_webhook(interaction: discord.Interaction, mission_params: MissionParams):
+async def queue_mission_to_webhook(interaction: discord.Interaction, mission_params: MissionParams):
     print("Processing option w")
 
     print("Checking if user has any webhooks...")
@@ -851,71 +586,10 @@ async def send_mission_to_webhook(interaction: discord.Interaction, mission_para
     else:
         print("Webhooks found for user, continuing")
 
-    await check_profit_margin_on_external_send(interaction, mission_params)
-
-    if mission_params.returnflag == False:
-        return
-
-    else:
-        print("Profit OK, proceeding")
-
-    message_send = await interaction.channel.send("**Sending to Webhooks...**")
-
-    print("Defining Discord embeds...")
-    discord_embeds = mission_params.discord_embeds
-    webhook_embeds = [discord_embeds.buy_embed, discord_embeds.sell_embed, discord_embeds.webhook_info_embed]
-
-    if mission_params.cco_message_text: webhook_embeds.append(discord_embeds.owner_text_embed)
-
-    try:
-        async with aiohttp.ClientSession() as session: # send messages to each webhook URL
-            for webhook_url, webhook_name in zip(mission_params.webhook_urls, mission_params.webhook_names):
-                try:
-                    print(f"Sending webhook to {webhook_url}")
-                    # insert webhook URL
-                    webhook = Webhook.from_url(webhook_url, session=session, client=bot)
-
-                    discord_file = discord.File(mission_params.discord_img_name, filename="image.png")
-
-                    # send embeds and image to webhook
-                    webhook_sent = await webhook.send(file=discord_file, embeds=webhook_embeds, username='Pilots Trade Network', avatar_url=bot.user.avatar.url, wait=True)
-                    """
-                    To return to the message later, we need its ID which is the .id attribute
-                    By default, the object returned from webhook.send is only partial, which limits what we can do with it.
-                    To access all its attributes and methods like a regular sent message, we first have to fetch it using its ID.
-                    """
-                    mission_params.webhook_msg_ids.append(webhook_sent.id) # add the message ID to our MissionParams
-                    mission_params.webhook_jump_urls.append(webhook_sent.jump_url) # add the jump_url to our MissionParams for convenience
-
-                    print(f"Sent webhook trade alert with ID {webhook_sent.id} for webhook URL {webhook_url}")
-
-                    embed = discord.Embed(
-                        title=f"Webhook trade alert sent for {mission_params.carrier_data.carrier_long_name}:",
-                        description=f"Sent to your webhook **{webhook_name}**: {webhook_sent.jump_url}",
-                        color=constants.EMBED_COLOUR_DISCORD)
-                    embed.set_thumbnail(url=constants.ICON_WEBHOOK_PTN)
-
-                    await interaction.channel.send(embed=embed)
-
-                except Exception as e:
-                    print(f"Error sending webhooks: {e}")
-                    inloop_webhook_error_embed = discord.Embed(
-                        description=f"❌ Could not send to Webhook {webhook_name}. {e}",
-                        color=constants.EMBED_COLOUR_ERROR
-                    )
-                    inloop_webhook_error_embed.set_footer(text="Attempting to continue with other sends.")
-                    await interaction.channel.send(embed=inloop_webhook_error_embed)
-
-    except Exception as e:
-        print(f"Error sending webhooks: {e}")
-        webhook_error_embed = discord.Embed(
-            description=f"❌ Could not send to Webhooks. {e}",
-            color=constants.EMBED_COLOUR_ERROR
-        )
-        webhook_error_embed.set_footer(text="Attempting to continue with other sends.")
-        await interaction.channel.send(embed=webhook_error_embed)
+    # the embeds are built when the messages are sent, so an edit made while they wait is sent as edited
+    await queue_mission_webhook_sends(mission_params, interaction.channel.id)
 
-    await message_send.delete()
+    mission_params.progress.step(f"⏳ Sending to {len(mission_params.webhook_names)} webhooks in the background, results will follow here.")
 
 
 async def notify_hauler_role(interaction: discord.Interaction, mission_params: MissionParams, mission_temp_channel: discord.TextChannel):
@@ -942,12 +616,34 @@ async def notify_hauler_role(interaction: discord.Interaction, mission_params: M
     notify_msg = await mission_temp_channel.send(f"<@&{mission_params.role_ping_actual}>: {mission_params.discord_text}", suppress_embeds=True)
     mission_params.notify_msg_id = notify_msg.id
 
-    embed = discord.Embed(
-        title=f"Mission notification sent for {mission_params.carrier_data.carrier_long_name}",
-        description=f"Pinged <@&{mission_params.role_ping_actual}> in <#{mission_params.mission_temp_channel_id}>.",
-        color=constants.EMBED_COLOUR_DISCORD)
-    embed.set_thumbnail(url=constants.ICON_DISCORD_PING)
-    await interaction.channel.send(embed=embed)
+    mission_params.progress.step(f"📣 Pinged <@&{mission_params.role_ping_actual}> in <#{mission_params.mission_temp_channel_id}>.")
+
+
+async def queue_external_sends(interaction: discord.Interaction, mission_params: MissionParams):
+    """
+    Queue a new mission's Reddit post and webhook messages for our outbox, so mission generation doesn't wait on them.
+    Called once the mission is in the database, as the outbox records what it sends there.
+
+    :param discord.Interaction interaction: The interaction that started mission generation; results are reported in its channel
+    :param MissionParams mission_params: The mission being sent
+    """
+    send_reddit = "r" in mission_params.sendflags and not mission_params.edmc_off
+    send_webhooks = "w" in mission_params.sendflags and not mission_params.edmc_off
+
+    if not (send_reddit or (send_webhooks and mission_params.webhook_names)):
+        return
+
+    # the profit check is shared by Reddit and webhooks, so run it once for both
+    await check_profit_margin_on_external_send(interaction, mission_params)
+    if mission_params.returnflag == False:
+        return
+    print("Profit OK, proceeding")
+
+    if send_reddit: # send to subreddit
+        await queue_mission_to_subreddit(interaction, mission_params)
+
+    if send_webhooks: # send to webhook
+        await queue_mission_to_webhook(interaction, mission_params)
 
 
 async def send_mission_text_to_user(interaction: discord.Interaction, mission_params: MissionParams):
@@ -996,7 +692,7 @@ async def send_mission_text_to_user(interaction: discord.Interaction, mission_pa
     embed.set_footer(text="**REMEMBER TO USE MARKDOWN MODE WHEN PASTING TEXT TO REDDIT.**")
     await interaction.channel.send(embed=embed)
 
-    file = discord.File(mission_params.reddit_img_name, filename="image.png")
+    file = image_file(mission_params.reddit_img)
     embed = discord.Embed(
         title="Image with mission details",
         color=constants.EMBED_COLOUR_REDDIT
@@ -1157,7 +853,7 @@ async def prepare_for_gen_mission(interaction: discord.Interaction, mission_para
     print(f"Returnflag status: {mission_params.returnflag}")
 
     # check carrier isn't already on a mission TODO change to ID lookup
-    mission_data = find_mission(carrier_data.carrier_long_name, "carrier")
+    mission_data = await find_mission(carrier_data.carrier_long_name, "carrier")
     if mission_data:
         mission_error_embed = discord.Embed(
             description=f"{mission_data.carrier_name} is already on a mission, please "
@@ -1222,7 +918,7 @@ async def prepare_for_gen_mission(interaction: discord.Interaction, mission_para
             # this only returns true if commodity is wine AND the BC channels are open, otherwise it is false
 
     # add any webhooks to mission_params
-    webhook_data = find_webhook_from_owner(carrier_data.ownerid)
+    webhook_data = await find_webhook_from_owner(carrier_data.ownerid)
     if webhook_data:
         for webhook in webhook_data:
             mission_params.webhook_urls.append(webhook.webhook_url)
@@ -1252,6 +948,13 @@ async def gen_mission(interaction: discord.Interaction, owner: discord.Member, m
     if mission_params.training:
         print("Training mode is active.")
 
+    # steps are reported in one status message here, and one log message in bot-spam
+    mission_params.progress = ProgressReporter(
+        current_channel, f"Sending mission for {mission_params.carrier_data.carrier_long_name}",
+        log_channel=bot.get_channel(bot_spam_channel()),
+        log_title=f"Mission generation for {mission_params.carrier_data.carrier_long_name}"
+    )
+
     try: # this try/except block is to try and ensure the channel lock is released if something breaks during mission gen
          # otherwise the bot freezes next time the lock is attempted
 
@@ -1273,37 +976,21 @@ async def gen_mission(interaction: discord.Interaction, owner: discord.Member, m
                 await send_mission_text_to_user(interaction, mission_params)
             if not "d" in mission_params.sendflags: # skip the rest of mission gen as sending to Discord is required
                 print("No discord send option selected, ending here")
-                cleanup_temp_image_file(mission_params.reddit_img_name)
                 return
 
         if "d" in mission_params.sendflags: # send to discord and save to mission database
             async with interaction.channel.typing():
                 submit_mission, mission_temp_channel = await send_mission_to_discord(interaction, owner, mission_params)
                 if not submit_mission: # error condition, cleanup after ourselves
-                    cleanup_temp_image_file(mission_params.discord_img_name)
                     if mission_params.mission_temp_channel_id:
                         await remove_carrier_channel(interaction, mission_params.mission_temp_channel_id, seconds_short())
 
-            if "r" in mission_params.sendflags and not mission_params.edmc_off: # send to subreddit
-                async with interaction.channel.typing():
-                    await send_mission_to_subreddit(interaction, mission_params)
-
-            if "w" in mission_params.sendflags and "d" in mission_params.sendflags and not mission_params.edmc_off: # send to webhook
-                async with interaction.channel.typing():
-                    await send_mission_to_webhook(interaction, mission_params)
-
-            if ("n" in mission_params.sendflags or "b" in mission_params.sendflags) and "d" in mission_params.sendflags: # notify role ping
+            if submit_mission and ("n" in mission_params.sendflags or "b" in mission_params.sendflags): # notify role ping
                 async with interaction.channel.typing():
                     await notify_hauler_role(interaction, mission_params, mission_temp_channel)
 
             if any(letter in mission_params.sendflags for letter in ["r", "w"]) and mission_params.edmc_off: # scold the user for being very silly
-                embed = discord.Embed(
-                    title=f"EXTERNAL SENDS SKIPPED FOR {mission_params.carrier_data.carrier_long_name}",
-                    description="Cannot send to Reddit or Webhooks as you flagged the mission as **EDMC-OFF**.",
-                    color=constants.EMBED_COLOUR_ERROR
-                )
-                embed.set_footer(text="You silly billy.")
-                await interaction.channel.send(embed=embed)
+                mission_params.progress.step("❌ External sends skipped: cannot send to Reddit or Webhooks as you flagged the mission as **EDMC-OFF**, you silly billy.")
 
         else: # for mission gen to work and be stored in the database, the d option MUST be selected.
             embed = discord.Embed(
@@ -1318,14 +1005,11 @@ async def gen_mission(interaction: discord.Interaction, owner: discord.Member, m
 
         if submit_mission:
             await mission_add(mission_params)
+            # Reddit and webhooks are sent in the background from here
+            await queue_external_sends(interaction, mission_params)
             await mission_generation_complete(interaction, mission_params)
-        try:
-            print("Calling cleanup for temp files")
-            cleanup_temp_image_file(mission_params.discord_img_name)
-            cleanup_temp_image_file(mission_params.reddit_img_name)
-        except Exception as e:
-            print(e)
-
+        else:
+            await mission_params.progress.finish(colour=constants.EMBED_COLOUR_ERROR)
         print("Reached end of mission generator")
         return
 
@@ -1335,7 +1019,7 @@ async def gen_mission(interaction: discord.Interaction, owner: discord.Member, m
         traceback.print_exc()
         mission_data = None
         try:
-            mission_data = find_mission(mission_params.carrier_data.carrier_long_name, "carrier")
+            mission_data = await find_mission(mission_params.carrier_data.carrier_long_name, "carrier")
             print("Mission data found, mission was added to the database before exception")
         except:
             print("No mission data found, mission was not added to database")
@@ -1346,40 +1030,39 @@ async def gen_mission(interaction: discord.Interaction, owner: discord.Member, m
         else:
             text = "Mission was **not** entered into the database. It may require manual cleanup of channels etc."
 
-        embed = discord.Embed(
-            description=f"❌ {e}\n\n{text}",
-            color=constants.EMBED_COLOUR_ERROR
-        )
-        await interaction.channel.send(embed=embed)
-
         # notify bot spam
-        spamchannel = bot.get_channel(bot_spam_channel())
-
-        message = await interaction.original_response()
-
-        embed = discord.Embed(
-            description=f"Error on mission generation by <@{interaction.user.id}> at {message.jump_url}:\n\n{e}\n\n{text}",
-            color=constants.EMBED_COLOUR_ERROR
-        )
-        await spamchannel.send(embed=embed)
+        try:
+            message = await interaction.original_response()
+            mission_params.progress.log.step(f"❌ Error on mission generation by <@{interaction.user.id}> at {message.jump_url}:\n\n{e}\n\n{text}")
+        except Exception as original_response_error:
+            print(original_response_error)
+            mission_params.progress.log.step(f"❌ Error on mission generation by <@{interaction.user.id}>:\n\n{e}\n\n{text}")
 
         try:
             print("Releasing channel lock...")
-            locked = check_mission_channel_lock(mission_params.carrier_data.discord_channel)
-            if locked:
-                await unlock_mission_channel(mission_params.carrier_data.discord_channel)
+            released = await unlock_mission_channel(mission_params.carrier_data.discord_channel, generation_lock_owner(mission_params))
+            if released:
                 print("Channel lock released")
-                embed = discord.Embed(
-                    description=f"🔓 Released lock for `{mission_params.carrier_data.discord_channel}` (<#{mission_params.mission_temp_channel.id}>) because of error in mission generation.",
-                    color=constants.EMBED_COLOUR_OK
-                )
-                await spamchannel.send(embed=embed)
-        except Exception as e:
-            print(e)
+                mission_params.progress.log.step(f"🔓 Released lock for `{mission_params.carrier_data.discord_channel}` (<#{mission_params.mission_temp_channel_id}>) because of error in mission generation.")
+        except Exception as lock_error:
+            print(lock_error)
+
+        await mission_params.progress.log.finish(colour=constants.EMBED_COLOUR_ERROR)
+        await mission_params.progress.finish(description=f"❌ {e}\n\n{text}", colour=constants.EMBED_COLOUR_ERROR)
         if mission_params.mission_temp_channel_id:
             await remove_carrier_channel(interaction, mission_params.mission_temp_channel_id, seconds_short())
 
 
+def generation_lock_owner(mission_params):
+    """
+    Who a mission generation holds its channel lock as, so it only ever releases its own lock.
+
+    :param MissionParams mission_params: The mission being generated
+    :rtype: str
+    """
+    return f"mission generation for {mission_params.carrier_data.carrier_long_name} at <t:{mission_params.timestamp}:T>"
+
+
 async def create_mission_temp_channel(interaction, owner: discord.Member, mission_params):
     # create the carrier's channel for the mission
 
@@ -1387,36 +1070,23 @@ async def create_mission_temp_channel(interaction, owner: discord.Member, missio
 
     # we need to lock the channel to stop it being deleted mid process
     print("Waiting for Mission Generator channel lock...")
-    embed = discord.Embed(
-        description=f"⏳ Waiting to acquire lock for `{mission_params.carrier_data.discord_channel}`...",
-        color=constants.EMBED_COLOUR_QU
-    )
-    lockwait_msg = await interaction.channel.send(embed=embed)
-    spamchannel = bot.get_channel(bot_spam_channel())
+    progress: ProgressReporter = mission_params.progress
+    lock_step = progress.step(f"⏳ Waiting to acquire lock for `{mission_params.carrier_data.discord_channel}`...")
     try:
-        await asyncio.wait_for(lock_mission_channel(mission_params.carrier_data.discord_channel), timeout=20)
-        embed = discord.Embed(
-            description=f"🔒 Lock acquired for `{mission_params.carrier_data.discord_channel}` for mission creation.",
-            color=constants.EMBED_COLOUR_QU
-        )
-        await spamchannel.send(embed=embed)
-    except asyncio.TimeoutError as e:
-        embed = discord.Embed(
-            description=f"❌ Could not acquire lock for `{mission_params.carrier_data.discord_channel}` after 20 seconds: {e}",
-            color=constants.EMBED_COLOUR_ERROR
-        )
-        await spamchannel.send(embed=embed)
+        await lock_mission_channel(mission_params.carrier_data.discord_channel, generation_lock_owner(mission_params), 'generation', timeout=20)
+        progress.update(lock_step, f"🔒 Lock acquired for `{mission_params.carrier_data.discord_channel}`.")
+        progress.log.step(f"🔒 Lock acquired for `{mission_params.carrier_data.discord_channel}` for mission creation.")
+    except asyncio.TimeoutError:
+        holder = channel_locks.holder(mission_params.carrier_data.discord_channel)
+        progress.log.step(f"❌ Could not acquire lock for `{mission_params.carrier_data.discord_channel}` after 20 seconds, held by {holder}.")
         print(f"No channel lock available for {mission_params.carrier_data.discord_channel} after 20 seconds, giving up.")
-        embed = discord.Embed(
-            description=f"❌ Could not acquire lock for `{mission_params.carrier_data.discord_channel}` after 10 seconds. Please try mission generation again. If the problem persists, contact an Admin.",
-            color=constants.EMBED_COLOUR_ERROR
-        )
-        await interaction.channel.send("❌ Channel lock could not be acquired, please try again. If the problem persists please contact an Admin.")
-
-    await lockwait_msg.delete()
+        progress.update(lock_step, "❌ Channel lock could not be acquired, please try again. If the problem persists please contact an Admin.")
+        # carrying on without the lock would let a pending removal delete the channel from under us
+        raise EnvironmentError(f"Could not acquire lock for {mission_params.carrier_data.discord_channel}")
 
     mission_channel_name = mission_params.carrier_data.discord_channel
-    mission_temp_channel = False
+    pooled = False
+    overwrite = await get_overwrite_perms()
 
     # only check for the channel in the target category
     if mission_params.training:
@@ -1426,19 +1096,14 @@ async def create_mission_temp_channel(interaction, owner: discord.Member, missio
         # check for the channel in the trade carriers category
         category = bot.get_channel(trade_cat())
 
-    for channel in category.channels:
-        if channel.name == mission_channel_name:
-            print(f"Found existing channel in category {category}")
-            mission_temp_channel = channel
+    mission_temp_channel = channel_index.find(category, mission_channel_name) or False
+    if mission_temp_channel:
+        print(f"Found existing channel in category {category}")
 
     if mission_temp_channel:
         # channel exists, so reuse it
         mission_temp_channel_id = mission_temp_channel.id
-        embed = discord.Embed(
-            description=f"Found existing mission channel <#{mission_temp_channel_id}>.",
-            color=constants.EMBED_COLOUR_DISCORD
-        )
-        await interaction.channel.send(embed=embed)
+        progress.step(f"Found existing mission channel <#{mission_temp_channel_id}>.")
         print(f"Found existing {mission_temp_channel}")
     else:
         # channel does not exist, create it
@@ -1446,9 +1111,17 @@ async def create_mission_temp_channel(interaction, owner: discord.Member, missio
         topic = f"Use '/stock' to retrieve stock levels for this carrier."
 
         category = discord.utils.get(interaction.guild.categories, id=mission_params.channel_defs.category_actual)
-        mission_temp_channel = await interaction.guild.create_text_channel(mission_params.carrier_data.discord_channel, category=category, topic=topic)
+        # a pooled channel is renamed and given its permissions in one go
+        mission_temp_channel = await channel_pool.claim(category, mission_params.carrier_data.discord_channel, topic, owner, overwrite)
+        if mission_temp_channel:
+            pooled = True
+            progress.step(f"Set up mission channel <#{mission_temp_channel.id}>.")
+            print(f"Claimed pooled channel {mission_temp_channel}")
+        else:
+            mission_temp_channel = await interaction.guild.create_text_channel(mission_params.carrier_data.discord_channel, category=category, topic=topic)
+            progress.step(f"Created mission channel <#{mission_temp_channel.id}>.")
+            print(f"Created {mission_temp_channel}")
         mission_temp_channel_id = mission_temp_channel.id
-        print(f"Created {mission_temp_channel}")
 
     if not mission_temp_channel:
         raise EnvironmentError(f'Could not create carrier channel {mission_params.carrier_data.discord_channel}')
@@ -1456,7 +1129,9 @@ async def create_mission_temp_channel(interaction, owner: discord.Member, missio
     # we made it this far, we can change the returnflag
     gen_mission.returnflag = True
 
-    overwrite = await get_overwrite_perms()
+    if pooled:
+        # permissions were set when we claimed it
+        return mission_temp_channel_id
 
     try:
         # first make sure it has the default permissions for the category
@@ -1481,22 +1156,6 @@ async def create_mission_temp_channel(interaction, owner: discord.Member, missio
     return mission_temp_channel_id
 
 
-def cleanup_temp_image_file(file_name):
-    """
-    Takes an input file path and removes it.
-
-    :param str file_name: The file path
-    :returns: None
-    """
-    # Now we delete the temp file, clean up after ourselves!
-    try:
-        print(f'Deleting the temp file at: {file_name}')
-        os.remove(file_name)
-    except Exception as e:
-        print(f'There was a problem removing the temp image file located {file_name}')
-        print(e)
-
-
 """
 Mission database
 """
@@ -1505,46 +1164,37 @@ Mission database
 # add mission to DB, called from mission generator
 async def mission_add(mission_params):
     print("Called mission_add")
-    backup_database('missions')  # backup the missions database before going any further
+    await backup_database('missions')  # backup the missions database before going any further
 
-    # pickle the mission_params
-    print("Pickle the params")
+    # serialise the mission_params
+    print("Serialise the params")
     attrs = vars(mission_params)
     print(attrs)
-    pickled_mission_params = pickle.dumps(mission_params)
+    serialised_mission_params = mission_params.to_json()
 
     print("Called mission_add to write to database")
-    mission_db.execute(''' INSERT INTO missions VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) ''', (
+    await mission_db_executor.execute(''' INSERT INTO missions VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) ''', (
         mission_params.carrier_data.carrier_long_name, mission_params.carrier_data.carrier_identifier, mission_params.mission_temp_channel_id,
         mission_params.commodity_name.title(), mission_params.mission_type.lower(), mission_params.system.title(), mission_params.station.title(),
         mission_params.profit, mission_params.pads.upper(), mission_params.demand, mission_params.cco_message_text, mission_params.reddit_post_id,
-        mission_params.reddit_post_url, mission_params.reddit_comment_id, mission_params.reddit_comment_url, mission_params.discord_alert_id, pickled_mission_params
+        mission_params.reddit_post_url, mission_params.reddit_comment_id, mission_params.reddit_comment_url, mission_params.discord_alert_id, serialised_mission_params
     ))
-    missions_conn.commit()
     print("Mission added to db")
 
     print("Updating last trade timestamp for carrier")
     await _update_carrier_last_trade(mission_params.carrier_data.pid)
 
-    spamchannel = bot.get_channel(bot_spam_channel())
+    progress: ProgressReporter = mission_params.progress
+    progress.step("💾 Mission added to the database.")
 
     # now we can release the channel lock
     try:
-        locked = check_mission_channel_lock(mission_params.carrier_data.discord_channel)
-        if locked: # this SHOULD be locked at this point, but we'll still check
-            await unlock_mission_channel(mission_params.carrier_data.discord_channel)
+        released = await unlock_mission_channel(mission_params.carrier_data.discord_channel, generation_lock_owner(mission_params))
+        if released: # this SHOULD be locked at this point, but we'll still check
             print("Channel lock released")
-            embed = discord.Embed(
-                description=f"🔓 Released lock for `{mission_params.carrier_data.discord_channel}`",
-                color=constants.EMBED_COLOUR_OK
-            )
-            await spamchannel.send(embed=embed)
+            progress.log.step(f"🔓 Released lock for `{mission_params.carrier_data.discord_channel}`")
     except Exception as e:
-        embed = discord.Embed(
-            description=f"❌ Could not release lock for `{mission_params.carrier_data.discord_channel}`: {e}",
-            color=constants.EMBED_COLOUR_ERROR
-        )
-        await spamchannel.send(embed=embed)
+        progress.log.step(f"❌ Could not release lock for `{mission_params.carrier_data.discord_channel}`: {e}")
         print(f"Couldn't release lock for {mission_params.carrier_data.discord_channel}: {e}")
     return
 
@@ -1554,22 +1204,21 @@ async def mission_generation_complete(interaction: discord.Interaction, mission_
 
     try:
         print("Making absolutely sure channel lock isn't engaged")
-        locked = check_mission_channel_lock(mission_params.carrier_data.discord_channel)
-        if locked:
-            await unlock_mission_channel(mission_params.carrier_data.discord_channel)
-            embed = discord.Embed(
-                description=f"🔓 Released lock for `{mission_params.carrier_data.discord_channel}`",
-                color=constants.EMBED_COLOUR_OK
-            )
-            spamchannel = bot.get_channel(bot_spam_channel())
-            await spamchannel.send(embed=embed)
+        released = await unlock_mission_channel(mission_params.carrier_data.discord_channel, generation_lock_owner(mission_params))
+        if released:
+            line = f"🔓 Released lock for `{mission_params.carrier_data.discord_channel}`"
+            if mission_params.progress:
+                mission_params.progress.log.step(line)
+            else:
+                spamchannel = bot.get_channel(bot_spam_channel())
+                await spamchannel.send(embed=discord.Embed(description=line, color=constants.EMBED_COLOUR_OK))
     finally:
         # nothing to do here, lock should already be disengaged
         pass
 
     # fetch data we just committed back
 
-    mission_data = find_mission(mission_params.carrier_data.carrier_long_name, 'carrier')
+    mission_data = await find_mission(mission_params.carrier_data.carrier_long_name, 'carrier')
 
     # return result to user
 
@@ -1592,20 +1241,23 @@ async def mission_generation_complete(interaction: discord.Interaction, mission_
 
     embed.set_footer(text="You can use /cco complete <carrier> to mark the mission complete.")
 
-    await interaction.channel.send(embed=embed)
-
     # notify bot spam
     try:
-        spamchannel = bot.get_channel(bot_spam_channel())
-
         message = await interaction.original_response()
-
-        embed = discord.Embed(
-            description=f"<@{interaction.user.id}> started or updated a mission for {mission_data.carrier_name} from <#{interaction.channel.id}>: {message.jump_url}",
-            color=constants.EMBED_COLOUR_QU
-        )
-        await spamchannel.send(embed=embed)
+        log_line = f"<@{interaction.user.id}> started or updated a mission for {mission_data.carrier_name} from <#{interaction.channel.id}>: {message.jump_url}"
     except Exception as e:
         print(e)
+        log_line = None
+
+    if mission_params.progress:
+        # the progress message becomes the result, keeping its steps under the mission details
+        if log_line: mission_params.progress.log.step(log_line)
+        await mission_params.progress.finish(title=embed.title, description=embed.description, colour=embed_colour,
+                                             thumbnail=thumbnail_url, footer=embed.footer.text)
+    else:
+        await interaction.channel.send(embed=embed)
+        if log_line:
+            spamchannel = bot.get_channel(bot_spam_channel())
+            await spamchannel.send(embed=discord.Embed(description=log_line, color=constants.EMBED_COLOUR_QU))
     print("Mission generation complete")
     return
@@ -0,0 +1,458 @@
+"""
+MissionOutbox.py
+
+The external sends for missions, queued by mission generation, editing and cleanup and made in the background
+by our outbox workers (see Outbox.py).
+
+Sends for a live mission record what they've sent on it, so their handlers first check the mission is still the
+one they were queued for: the carrier may have finished it, or finished it and started another, in the meantime.
+The mission is read when the send is made rather than when it's queued, so a mission edited before its Reddit post
+went out is posted as edited.
+
+Each handler records its completed steps in its payload, so a retry carries on from where the last attempt failed.
+
+Depends on: constants, database, Embeds, ImageHandling, Outbox, RedditCommentRouter, RedditPublisher, TextGen, WebhookDispatcher
+"""
+
+# import libraries
+import asyncio
+import time
+
+# import discord.py
+import discord
+from discord import Webhook
+
+# import local classes
+from ptn.missionalertbot.classes.MissionParams import MissionParams
+
+# import local constants
+import ptn.missionalertbot.constants as constants
+from ptn.missionalertbot.constants import bot, get_reddit, upvote_emoji
+
+# import local modules
+from ptn.missionalertbot.database.database import find_mission, _update_mission_in_database
+from ptn.missionalertbot.modules.Embeds import return_discord_channel_embeds, webhook_mission_embeds
+from ptn.missionalertbot.modules.ImageHandling import create_carrier_reddit_mission_image, create_carrier_discord_mission_image, image_file
+from ptn.missionalertbot.modules.Outbox import outbox_handler, queue_outbox_entry
+from ptn.missionalertbot.modules.RedditCommentRouter import comment_router
+from ptn.missionalertbot.modules.RedditPublisher import submit_mission_image, find_own_submission
+from ptn.missionalertbot.modules.TextGen import txt_create_reddit_title, txt_create_reddit_body
+from ptn.missionalertbot.modules.WebhookDispatcher import dispatch_webhooks, mission_webhook_targets, WebhookTarget
+
+
+# one lock per carrier, so two sends for the same mission never overwrite each other's changes to it
+_mission_locks = {}
+
+# one lock per carrier around its Reddit posts, so two edits queued close together don't both replace the same post
+_reddit_locks = {}
+
+# the mission fields our handlers fill in as they send
+outbox_fields = ['reddit_title', 'reddit_body', 'reddit_post_id', 'reddit_post_url', 'reddit_comment_id', 'reddit_comment_url',
+                 'webhook_names', 'webhook_urls', 'webhook_msg_ids', 'webhook_jump_urls']
+
+
+"""
+Helpers
+"""
+
+
+async def _current_mission_params(payload):
+    """
+    The mission a payload was queued for, if it's still active.
+
+    :param dict payload: Holds the mission's 'carrier' and 'timestamp'
+    :returns: The mission's MissionParams, or None if it's gone
+    """
+    mission_data = await find_mission(payload['carrier'], 'carrier')
+    if not mission_data:
+        print(f"Mission for {payload['carrier']} has gone, nothing more to send")
+        return None
+    mission_params: MissionParams = mission_data.mission_params
+    if mission_params.timestamp != payload['timestamp']:
+        print(f"Mission for {payload['carrier']} has been replaced by a newer one, nothing more to send")
+        return None
+    return mission_params
+
+
+async def _update_mission(payload, update):
+    """
+    Change the mission a payload was queued for, and save it.
+
+    :param dict payload: Holds the mission's 'carrier' and 'timestamp'
+    :param update: A function taking the mission's MissionParams to change
+    :returns: The updated MissionParams, or None if the mission has gone
+    """
+    async with _mission_locks.setdefault(payload['carrier'], asyncio.Lock()):
+        mission_params = await _current_mission_params(payload)
+        if mission_params:
+            update(mission_params)
+            await _update_mission_in_database(mission_params)
+            comment_router.mission_posted(mission_params)
+        return mission_params
+
+
+async def save_edited_mission(mission_params: MissionParams):
+    """
+    Save an edited mission without losing anything our handlers have sent since it was loaded for editing:
+    the saved mission's outbox_fields are kept, and copied onto mission_params.
+
+    :param MissionParams mission_params: The edited mission
+    """
+    async with _mission_locks.setdefault(mission_params.carrier_data.carrier_long_name, asyncio.Lock()):
+        mission_data = await find_mission(mission_params.carrier_data.carrier_long_name, 'carrier')
+        if mission_data and mission_data.mission_params.timestamp == mission_params.timestamp:
+            for field in outbox_fields:
+                setattr(mission_params, field, getattr(mission_data.mission_params, field))
+        await _update_mission_in_database(mission_params)
+
+
+async def _feed_back(payload, embed):
+    # let the user know how their send went; this is only a courtesy, so never fail a send over it
+    channel = bot.get_channel(payload.get('feedback_channel_id')) if payload.get('feedback_channel_id') else None
+    if not channel:
+        return
+    try:
+        await channel.send(embed=embed)
+    except Exception as e:
+        print(f"Couldn't send outbox feedback to {channel}: {e}")
+
+
+def _targets(payload):
+    return [WebhookTarget(*target) for target in payload['targets']]
+
+
+def _target_row(target: WebhookTarget, message=None):
+    return [target.webhook_name, target.webhook_url, message.id if message else target.message_id,
+            message.jump_url if message else target.jump_url]
+
+
+"""
+Reddit
+"""
+
+
+async def _publish_reddit_post(payload, mission_params: MissionParams):
+    # post the mission image and record it on the mission, then reply with the trade details
+
+    channel_defs = mission_params.channel_defs
+
+    if not payload.get('post_id'):
+        # texts for the mission as it is now, so an edit made while this waited is posted as edited
+        mission_params.reddit_title = txt_create_reddit_title(mission_params)
+        mission_params.reddit_body = txt_create_reddit_body(mission_params)
+
+        submission = None
+        if payload.get('post_attempted'):
+            # our last attempt may have posted before it failed, don't post twice; look for the title it used,
+            # as the mission may have been edited since
+            submission = await find_own_submission(channel_defs.sub_reddit_actual, payload.get('post_title', mission_params.reddit_title),
+                                                   payload['post_attempted'])
+
+        if not submission:
+            payload['post_attempted'] = time.time() - 60 # a minute's grace in case our clock and Reddit's disagree
+            payload['post_title'] = mission_params.reddit_title
+            reddit_img = await create_carrier_reddit_mission_image(mission_params)
+            submission = await submit_mission_image(channel_defs.sub_reddit_actual, mission_params.reddit_title, reddit_img,
+                                                    channel_defs.reddit_flair_in_progress)
+
+        payload['post_id'] = submission.id
+        payload['post_url'] = submission.permalink
+
+        def _save_post(params: MissionParams):
+            # the title the post went up with, which may be from before an edit if an earlier attempt made it
+            params.reddit_title = payload.get('post_title', mission_params.reddit_title)
+            params.reddit_body = mission_params.reddit_body
+            params.reddit_post_id = payload['post_id']
+            params.reddit_post_url = payload['post_url']
+
+        if not await _update_mission(payload, _save_post):
+            return False
+
+    if not payload.get('comment_id'):
+        print("⏳ Attempting to reply to Reddit post...")
+        reddit = await get_reddit()
+        submission = await reddit.submission(payload['post_id'])
+        if mission_params.cco_message_text:
+            comment = await submission.reply(f"> {mission_params.cco_message_text}\n\n&#x200B;\n\n{mission_params.reddit_body}")
+        else:
+            comment = await submission.reply(mission_params.reddit_body)
+        print(f"✅ Submitted Reddit comment {comment}")
+
+        payload['comment_id'] = comment.id
+        payload['comment_url'] = comment.permalink
+
+        def _save_comment(params: MissionParams):
+            params.reddit_comment_id = payload['comment_id']
+            params.reddit_comment_url = payload['comment_url']
+
+        if not await _update_mission(payload, _save_comment):
+            return False
+
+    if not payload.get('upvotes_sent'):
+        embed = discord.Embed(
+            title=f"Reddit trade alert sent for {mission_params.carrier_data.carrier_long_name}",
+            description=f"https://www.reddit.com{payload['post_url']}",
+            color=constants.EMBED_COLOUR_REDDIT)
+        embed.set_thumbnail(url=constants.ICON_REDDIT)
+        await _feed_back(payload, embed)
+
+        embed = discord.Embed(title=f"{mission_params.carrier_data.carrier_long_name} REQUIRES YOUR UPDOOTS",
+                              description=f"https://www.reddit.com{payload['post_url']}",
+                              color=constants.EMBED_COLOUR_REDDIT)
+        channel = bot.get_channel(channel_defs.upvotes_channel_actual)
+        upvote_message = await channel.send(embed=embed)
+        payload['upvotes_sent'] = True
+        await upvote_message.add_reaction(bot.get_emoji(upvote_emoji()))
+
+    return True
+
+
+@outbox_handler('reddit_post')
+async def send_reddit_post(payload):
+    async with _reddit_locks.setdefault(payload['carrier'], asyncio.Lock()):
+        mission_params = await _current_mission_params(payload)
+        if mission_params:
+            await _publish_reddit_post(payload, mission_params)
+
+
+@outbox_handler('reddit_repost')
+async def send_reddit_repost(payload):
+    # read the mission inside the lock, so we replace the post the last repost left live
+    async with _reddit_locks.setdefault(payload['carrier'], asyncio.Lock()):
+        await _repost_reddit_post(payload)
+
+
+async def _repost_reddit_post(payload):
+    mission_params = await _current_mission_params(payload)
+    if not mission_params:
+        return
+
+    if not payload.get('post_id'):
+        # whichever post is live when we get to it is the one we're replacing
+        payload['original_post_id'] = mission_params.reddit_post_id
+
+    if not await _publish_reddit_post(payload, mission_params):
+        return
+
+    if payload.get('original_post_id') and not payload.get('original_replied'):
+        print(f"Updating old Reddit post {payload['original_post_id']}")
+        reddit = await get_reddit()
+        original_post = await reddit.submission(payload['original_post_id'])
+        await original_post.reply(f"**MISSION UPDATED**\n\nNew mission details [here]({payload['post_url']}).")
+        payload['original_replied'] = True
+        # mark original post as spoiler, change its flair
+        await original_post.flair.select(mission_params.channel_defs.reddit_flair_completed)
+        await original_post.mod.spoiler()
+
+
+@outbox_handler('reddit_complete')
+async def send_reddit_complete(payload):
+    reddit = await get_reddit()
+    submission = await reddit.submission(payload['post_id'])
+    if not payload.get('replied'):
+        await submission.reply(payload['text'])
+        payload['replied'] = True
+    # mark original post as spoiler, change its flair
+    await submission.flair.select(payload['flair_id'])
+    await submission.mod.spoiler()
+
+
+"""
+Webhooks
+"""
+
+
+@outbox_handler('webhook_send')
+async def send_webhooks(payload):
+    mission_params = await _current_mission_params(payload)
+    if not mission_params:
+        return
+
+    # embeds and image for the mission as it is now, so an edit made while this waited is sent as edited
+    discord_img = await create_carrier_discord_mission_image(mission_params)
+    webhook_embeds = webhook_mission_embeds(await return_discord_channel_embeds(mission_params), mission_params)
+
+    async def _send_webhook(webhook: Webhook, target: WebhookTarget):
+        # send embeds and image to webhook
+        return await webhook.send(file=image_file(discord_img), embeds=webhook_embeds, username='Pilots Trade Network',
+                                  avatar_url=bot.user.avatar.url, wait=True)
+
+    dispatch = await dispatch_webhooks(_targets(payload), _send_webhook)
+
+    payload['sent'] += [_target_row(result.target, result.message) for result in dispatch.sent]
+    payload['targets'] = [_target_row(result.target) for result in dispatch.failed]
+
+    def _save_webhooks(params: MissionParams):
+        # to return to the messages later we need their IDs; only keep the webhooks we actually sent to,
+        # so our stored URLs and message IDs stay in step
+        params.webhook_names = [row[0] for row in payload['sent']]
+        params.webhook_urls = [row[1] for row in payload['sent']]
+        params.webhook_msg_ids = [row[2] for row in payload['sent']]
+        params.webhook_jump_urls = [row[3] for row in payload['sent']]
+
+    if dispatch.sent:
+        await _update_mission(payload, _save_webhooks)
+
+    await _feed_back(payload, dispatch.summary_embed(f"Webhook trade alerts sent for {mission_params.carrier_data.carrier_long_name}"))
+
+    if dispatch.failed:
+        raise RuntimeError(f"{len(dispatch.failed)} webhooks failed, will retry")
+
+
+@outbox_handler('webhook_edit')
+async def send_webhook_edits(payload):
+    mission_params = await _current_mission_params(payload)
+    if not mission_params:
+        return
+
+    if payload['targets'] is None:
+        # the messages as they are when we get to it, including any a queued send has made since the edit
+        payload['targets'] = [_target_row(target) for target in mission_webhook_targets(mission_params)]
+
+    webhook_embeds = webhook_mission_embeds(await return_discord_channel_embeds(mission_params), mission_params)
+    # type has changed, need to change image too
+    discord_img = await create_carrier_discord_mission_image(mission_params) if payload['type_changed'] else None
+
+    async def _edit_webhook_message(webhook: Webhook, target: WebhookTarget):
+        print(f"Editing webhook message {target.jump_url} with ID {target.message_id}")
+        if discord_img:
+            return await webhook.edit_message(target.message_id, embeds=webhook_embeds, attachments=[image_file(discord_img)])
+        # don't need to change image
+        return await webhook.edit_message(target.message_id, embeds=webhook_embeds)
+
+    dispatch = await dispatch_webhooks(_targets(payload), _edit_webhook_message)
+    payload['targets'] = [_target_row(result.target) for result in dispatch.failed]
+
+    await _feed_back(payload, dispatch.summary_embed(f"Webhook alerts updated for {mission_params.carrier_data.carrier_long_name}"))
+
+    if dispatch.failed:
+        raise RuntimeError(f"{len(dispatch.failed)} webhooks failed, will retry")
+
+
+@outbox_handler('webhook_conclude')
+async def send_webhook_conclusions(payload):
+    concluded_embed = discord.Embed.from_dict(payload['concluded_embed'])
+
+    async def _conclude_webhook_message(webhook: Webhook, target: WebhookTarget):
+        # edit the original message, dropping its image
+        print(f"Editing webhook message {target.jump_url} with ID {target.message_id}")
+        await webhook.edit_message(target.message_id, embed=concluded_embed, attachments=[])
+
+        print("Sending webhook update message...")
+        # send a new message to update the target channel
+        embed = discord.Embed(title="PTN TRADE MISSION CONCLUDED",
+                              description=f"The mission {target.jump_url} posted at <t:{payload['timestamp']}:f> (<t:{payload['timestamp']}:R>) "
+                                          f"has been marked as {payload['status']} on the [PTN Discord]({constants.DISCORD_INVITE_URL}).{payload['reason']}",
+                              color=constants.EMBED_COLOUR_OK)
+        return await webhook.send(embed=embed, username='Pilots Trade Network', avatar_url=bot.user.avatar.url, wait=True)
+
+    dispatch = await dispatch_webhooks(_targets(payload), _conclude_webhook_message)
+    payload['targets'] = [_target_row(result.target) for result in dispatch.failed]
+
+    if dispatch.failed:
+        raise RuntimeError("Failed updating webhook messages:\n" + '\n'.join(
+            f"{result.target.jump_url} with URL {result.target.webhook_url}: {result.error}" for result in dispatch.failed))
+
+
+"""
+Queueing
+"""
+
+
+def _mission_key(kind, mission_params: MissionParams):
+    return f"{kind}:{mission_params.carrier_data.carrier_long_name}:{mission_params.timestamp}"
+
+
+def _mission_payload(mission_params: MissionParams, feedback_channel_id=None):
+    return {
+        'carrier': mission_params.carrier_data.carrier_long_name,
+        'timestamp': mission_params.timestamp,
+        'feedback_channel_id': feedback_channel_id
+    }
+
+
+async def queue_mission_reddit_post(mission_params: MissionParams, feedback_channel_id):
+    """
+    Queue a new mission's Reddit post. The mission must already be in the database.
+
+    :param MissionParams mission_params: The mission
+    :param int feedback_channel_id: Where to tell the user it's been sent
+    """
+    return await queue_outbox_entry(_mission_key('reddit_post', mission_params), 'reddit_post',
+                                    _mission_payload(mission_params, feedback_channel_id))
+
+
+async def queue_mission_reddit_repost(mission_params: MissionParams, edit_id, feedback_channel_id):
+    """
+    Queue a replacement Reddit post for an edited mission. The edit must already be saved to the database.
+
+    :param MissionParams mission_params: The mission
+    :param int edit_id: Identifies the edit, e.g. the confirming interaction's ID
+    :param int feedback_channel_id: Where to tell the user it's been sent
+    """
+    return await queue_outbox_entry(f"reddit_repost:{edit_id}", 'reddit_repost', _mission_payload(mission_params, feedback_channel_id))
+
+
+async def queue_mission_reddit_complete(mission_params: MissionParams, reddit_post_id, reddit_complete_text):
+    """
+    Queue the closing comment, flair and spoiler for a finished mission's Reddit post.
+
+    :param MissionParams mission_params: The finished mission
+    :param str reddit_post_id: Its Reddit post
+    :param str reddit_complete_text: The closing comment
+    """
+    payload = {
+        'post_id': reddit_post_id,
+        'text': reddit_complete_text,
+        'flair_id': mission_params.channel_defs.reddit_flair_completed
+    }
+    return await queue_outbox_entry(f"reddit_complete:{reddit_post_id}", 'reddit_complete', payload)
+
+
+async def queue_mission_webhook_sends(mission_params: MissionParams, feedback_channel_id):
+    """
+    Queue a new mission's webhook messages. The mission must already be in the database; its embeds and image
+    are built from the mission as it is when they're sent.
+
+    :param MissionParams mission_params: The mission, with the CCO's webhook_names and webhook_urls
+    :param int feedback_channel_id: Where to tell the user how it went
+    """
+    payload = _mission_payload(mission_params, feedback_channel_id)
+    payload['targets'] = [[webhook_name, webhook_url] for webhook_name, webhook_url in zip(mission_params.webhook_names, mission_params.webhook_urls)]
+    payload['sent'] = []
+    return await queue_outbox_entry(_mission_key('webhook_send', mission_params), 'webhook_send', payload)
+
+
+async def queue_mission_webhook_edits(mission_params: MissionParams, type_changed, edit_id, feedback_channel_id):
+    """
+    Queue edits to an edited mission's webhook messages. The edit must already be saved to the database; the
+    messages to edit and their embeds are taken from the mission as it is when the edits are made.
+
+    :param MissionParams mission_params: The mission
+    :param bool type_changed: Whether the mission type changed, so the image needs replacing too
+    :param int edit_id: Identifies the edit, e.g. the confirming interaction's ID
+    :param int feedback_channel_id: Where to tell the user how it went
+    """
+    payload = _mission_payload(mission_params, feedback_channel_id)
+    payload['targets'] = None # filled in on the first attempt
+    payload['type_changed'] = type_changed
+    return await queue_outbox_entry(f"webhook_edit:{edit_id}", 'webhook_edit', payload)
+
+
+async def queue_mission_webhook_conclusions(mission_params: MissionParams, concluded_embed, status, reason):
+    """
+    Queue the closing edits and messages for a finished mission's webhook messages.
+
+    :param MissionParams mission_params: The finished mission
+    :param discord.Embed concluded_embed: Replaces each webhook's mission message
+    :param str status: How the mission finished, e.g. "complete"
+    :param str reason: Any message from the CCO, already formatted for the end of the update message
+    """
+    payload = {
+        'targets': [_target_row(target) for target in mission_webhook_targets(mission_params)],
+        'concluded_embed': concluded_embed.to_dict(),
+        'timestamp': mission_params.timestamp,
+        'status': status,
+        'reason': reason
+    }
+    return await queue_outbox_entry(_mission_key('webhook_conclude', mission_params), 'webhook_conclude', payload)
@@ -0,0 +1,201 @@
+"""
+Outbox.py
+
+Makes external sends (Reddit posts and comments, webhook messages) in the background, so commands can finish as
+soon as their Discord work is done and an outage elsewhere costs retries rather than a failed command.
+
+Sends are queued in the outbox table of the missions database with an idempotency key, so queueing the same send
+twice only makes it once and queued sends survive a restart. A pool of workers sends whatever is due, retrying
+failures with exponential backoff until constants.OUTBOX_MAX_ATTEMPTS is reached.
+
+Each kind of send has a handler registered with @outbox_handler. A handler is given the entry's payload and may
+update it as it goes: the payload is saved after a failed attempt, so a handler can record the steps it has
+already completed and skip them on its next attempt.
+
+Depends on: constants, database
+"""
+
+# import libraries
+import asyncio
+from datetime import datetime, timedelta, timezone
+import random
+import traceback
+
+# import discord.py
+import discord
+
+# import local classes
+from ptn.missionalertbot.classes.OutboxEntry import OutboxEntry
+
+# import local constants
+import ptn.missionalertbot.constants as constants
+from ptn.missionalertbot.constants import bot, bot_spam_channel
+
+# import local modules
+from ptn.missionalertbot.database.database import add_outbox_entry, claim_outbox_entry, next_outbox_attempt, _update_outbox_entry, \
+    prune_outbox
+
+
+# kind: async handler function taking the entry's payload
+outbox_handlers = {}
+
+
+def outbox_handler(kind):
+    """
+    Register the function that sends a kind of outbox entry.
+
+    :param str kind: The entry kind
+    """
+    def register(function):
+        outbox_handlers[kind] = function
+        return function
+    return register
+
+
+def retry_delay(attempts):
+    """
+    How long to wait before the next attempt: exponential backoff, capped at OUTBOX_BACKOFF_MAX,
+    with half of it jittered so entries that failed together don't all retry together.
+
+    :param int attempts: Attempts made so far
+    :rtype: float
+    """
+    ceiling = min(constants.OUTBOX_BACKOFF_MAX, constants.OUTBOX_BACKOFF_BASE * 2 ** (attempts - 1))
+    return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+
+class OutboxWorkers:
+
+    def __init__(self, workers):
+        """
+        Class represents the background workers sending our outbox.
+
+        :param int workers: Number of entries sent at once
+        """
+        self.workers = workers
+        self._tasks = []
+        self._wake = asyncio.Event()
+
+
+    def start(self):
+        """
+        Start the workers, if they aren't running already.
+        """
+        if any(not task.done() for task in self._tasks):
+            return
+        print(f"Starting {self.workers} outbox workers")
+        self._tasks = [asyncio.create_task(self._work(number)) for number in range(self.workers)]
+
+
+    def wake(self):
+        """
+        Tell sleeping workers there's something new to send.
+        """
+        self._wake.set()
+
+
+    async def stop(self):
+        """
+        Stop the workers on shutdown. Anything they were sending is sent again on next startup.
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+
+    async def _sleep(self):
+        # sleep until the next entry is due, or we're woken by a new one
+        next_attempt = await next_outbox_attempt()
+        now = datetime.now(tz=timezone.utc).timestamp()
+        delay = constants.OUTBOX_POLL_INTERVAL if next_attempt is None else min(constants.OUTBOX_POLL_INTERVAL, max(0, next_attempt - now))
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            pass
+        self._wake.clear()
+
+
+    async def _work(self, number):
+        print(f"Outbox worker {number} started")
+        while True:
+            try:
+                entry = await claim_outbox_entry()
+                if entry:
+                    await self._send(entry)
+                else:
+                    if number == 0:
+                        await prune_outbox((datetime.now(tz=timezone.utc) - timedelta(days=constants.OUTBOX_RETENTION_DAYS)).timestamp())
+                    await self._sleep()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # never let a database hiccup kill the worker
+                print(f"Outbox worker {number} error: {e}")
+                traceback.print_exc()
+                await asyncio.sleep(constants.OUTBOX_POLL_INTERVAL)
+
+
+    async def _send(self, entry: OutboxEntry):
+        handler = outbox_handlers.get(entry.kind)
+        entry.attempts += 1
+        print(f"⏳ Sending outbox entry {entry.idempotency_key} (attempt {entry.attempts}/{constants.OUTBOX_MAX_ATTEMPTS})")
+
+        try:
+            if handler is None:
+                raise LookupError(f"No outbox handler for {entry.kind}")
+            await asyncio.wait_for(handler(entry.payload), timeout=constants.OUTBOX_SEND_TIMEOUT)
+
+        except Exception as e:
+            entry.last_error = str(e) or type(e).__name__
+            print(f"❌ Outbox entry {entry.idempotency_key} failed: {entry.last_error}")
+            traceback.print_exc()
+
+            if entry.attempts >= constants.OUTBOX_MAX_ATTEMPTS or handler is None:
+                entry.status = 'failed'
+                await _update_outbox_entry(entry)
+                await self._report_failure(entry)
+            else:
+                entry.status = 'pending'
+                delay = retry_delay(entry.attempts)
+                entry.next_attempt = datetime.now(tz=timezone.utc).timestamp() + delay
+                print(f"Retrying {entry.idempotency_key} in {int(delay)}s")
+                await _update_outbox_entry(entry)
+            return
+
+        entry.status = 'sent'
+        entry.last_error = None
+        await _update_outbox_entry(entry)
+        print(f"✅ Outbox entry {entry.idempotency_key} sent")
+
+
+    async def _report_failure(self, entry: OutboxEntry):
+        description = f"❌ Gave up on `{entry.idempotency_key}` after {entry.attempts} attempts:\n{entry.last_error}"
+        for channel_id in [entry.payload.get('feedback_channel_id'), bot_spam_channel()]:
+            channel = bot.get_channel(channel_id) if channel_id else None
+            if not channel:
+                continue
+            try:
+                embed = discord.Embed(description=description, color=constants.EMBED_COLOUR_ERROR)
+                await channel.send(embed=embed)
+            except Exception as e:
+                print(f"Couldn't report outbox failure to {channel_id}: {e}")
+
+
+outbox = OutboxWorkers(constants.OUTBOX_WORKERS)
+
+
+async def queue_outbox_entry(idempotency_key, kind, payload):
+    """
+    Queue an external send for our workers.
+
+    :param str idempotency_key: Identifies this send, so queueing it twice only sends it once
+    :param str kind: Which handler sends it
+    :param dict payload: What the handler needs, must be JSON serialisable
+    :returns: True if it was queued, False if it already had been
+    :rtype: bool
+    """
+    queued = await add_outbox_entry(idempotency_key, kind, payload)
+    print(f"Queued outbox entry {idempotency_key}" if queued else f"Outbox entry {idempotency_key} already queued")
+    outbox.wake()
+    return queued
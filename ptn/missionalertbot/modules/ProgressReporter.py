@@ -0,0 +1,179 @@
+"""
+ProgressReporter.py
+
+Reports the steps of a long-running operation (mission generation, mission cleanup, channel removal) in a single
+status message per channel, instead of a message for every step.
+
+Steps are added to the reporter as they happen and batched into edits of its message: one message is edited at
+most every PROGRESS_EDIT_INTERVAL seconds, and edits to progress messages in the same channel are spaced at least
+PROGRESS_CHANNEL_EDIT_SPACING seconds apart, so several operations running at once stay clear of the channel's
+rate limit. Reporting never raises, so a Discord hiccup can't break the operation it reports on.
+
+Depends on: constants
+"""
+
+# import libraries
+import asyncio
+
+# import discord.py
+import discord
+
+# import local constants
+import ptn.missionalertbot.constants as constants
+
+
+# channel ID: loop time at which the next progress edit in that channel may be made
+_channel_next_edit = {}
+
+
+class ProgressReporter:
+
+    def __init__(self, channel, title, message=None, log_channel=None, log_title=None):
+        """
+        Class represents the status message of an operation, and optionally its log message in bot-spam.
+
+        Nothing is sent until the first step is added.
+
+        :param discord.TextChannel channel: Where the status message is sent; may be None to only print steps
+        :param str title: The status message title
+        :param discord.Message message: An existing message to use as the status message instead of sending one
+        :param discord.TextChannel log_channel: Where the log message is sent
+        :param str log_title: The log message title; the reporter only has a log if this is given
+        """
+        self.channel = channel
+        self.title = title
+        self.message = message
+        self.description = None
+        self.colour = constants.EMBED_COLOUR_QU
+        self.thumbnail = None
+        self.footer = None
+        self.lines = []
+        self.finished = False
+        self.log = ProgressReporter(log_channel, log_title) if log_title else None
+
+        target = message or channel
+        self._channel_id = getattr(getattr(target, 'channel', target), 'id', None)
+        self._lock = asyncio.Lock()
+        self._pending = None
+        self._sleeping = False
+        self._dirty = False
+        self._last_edit = 0
+
+
+    def step(self, line):
+        """
+        Add a step to the status message.
+
+        :param str line: The step, one line of text
+        :returns: The step's index, to update it later
+        :rtype: int
+        """
+        print(f"{self.title}: {line}")
+        self.lines.append(line)
+        self._schedule()
+        return len(self.lines) - 1
+
+
+    def update(self, index, line):
+        """
+        Replace an earlier step, e.g. once something we were waiting on has finished.
+
+        :param int index: The index step() returned
+        :param str line: The new text for the step
+        """
+        print(f"{self.title}: {line}")
+        self.lines[index] = line
+        self._schedule()
+
+
+    def embed(self):
+        """
+        The status message as it stands.
+
+        :rtype: discord.Embed
+        """
+        lines = list(self.lines)
+        header = f"{self.description}\n\n" if self.description else ""
+        # keep the newest steps if we run out of room
+        while len(lines) > 1 and len(header) + len('\n'.join(lines)) > 4096:
+            lines = ["…"] + lines[2:]
+        embed = discord.Embed(title=self.title, description=(header + '\n'.join(lines))[:4096] or None, color=self.colour)
+        if self.thumbnail:
+            embed.set_thumbnail(url=self.thumbnail)
+        if self.footer:
+            embed.set_footer(text=self.footer)
+        return embed
+
+
+    async def finish(self, title=None, description=None, colour=None, thumbnail=None, footer=None):
+        """
+        Give the status message its final form and send it straight away. Also finishes the log, if it isn't already.
+
+        :param str title: A new title
+        :param str description: Text shown above the steps
+        :param int colour: The final embed colour
+        :param str thumbnail: URL of a thumbnail
+        :param str footer: Footer text
+        """
+        if any(value is not None for value in [title, description, colour, thumbnail, footer]):
+            self._dirty = True
+        if title is not None: self.title = title
+        if description is not None: self.description = description
+        if colour is not None: self.colour = colour
+        if thumbnail is not None: self.thumbnail = thumbnail
+        if footer is not None: self.footer = footer
+        self.finished = True
+
+        if self._pending and not self._pending.done():
+            if self._sleeping:
+                self._pending.cancel()
+            else:
+                # an edit is in flight, let it land before ours
+                await asyncio.gather(self._pending, return_exceptions=True)
+        self._pending = None
+        if self._dirty:
+            await self._flush()
+
+        if self.log and not self.log.finished:
+            await self.log.finish()
+
+
+    def _schedule(self):
+        self._dirty = True
+        if self._pending and not self._pending.done():
+            return # the pending edit will pick this step up
+        if self._channel_id is None:
+            return # nowhere to send it
+
+        now = asyncio.get_running_loop().time()
+        when = max(now, self._last_edit + constants.PROGRESS_EDIT_INTERVAL, _channel_next_edit.get(self._channel_id, 0))
+        # claim our slot in the channel now, so reporters sharing it queue up behind each other
+        _channel_next_edit[self._channel_id] = when + constants.PROGRESS_CHANNEL_EDIT_SPACING
+        self._sleeping = True
+        self._pending = asyncio.create_task(self._flush_at(when))
+
+
+    async def _flush_at(self, when):
+        await asyncio.sleep(max(0, when - asyncio.get_running_loop().time()))
+        self._sleeping = False
+        await self._flush()
+        self._pending = None
+        if self._dirty and not self.finished:
+            # steps added while we were editing
+            self._schedule()
+
+
+    async def _flush(self):
+        async with self._lock:
+            if self._channel_id is None or not (self.message or self.lines or self.description):
+                return
+            self._dirty = False
+            embed = self.embed()
+            try:
+                if self.message:
+                    await self.message.edit(embed=embed)
+                else:
+                    self.message = await self.channel.send(embed=embed)
+            except Exception as e:
+                print(f"Couldn't update progress message {self.title}: {e}")
+            self._last_edit = asyncio.get_running_loop().time()
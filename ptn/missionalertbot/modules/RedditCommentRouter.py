@@ -0,0 +1,115 @@
+"""
+RedditCommentRouter.py
+
+Works out which mission a new Reddit comment is on, without a database query or a Reddit fetch for every comment.
+
+The router maps the Reddit post ID of each active mission to a summary of the mission (carrier name and owner). The
+map is loaded from the missions database when the comment stream starts, and kept up to date as missions get their
+Reddit post and are removed. Post titles come from the comment itself where Reddit includes them, otherwise from an
+LRU cache, so a post's title is fetched at most once while it's cached.
+
+Depends on: constants, database
+"""
+
+# import libraries
+from collections import OrderedDict
+
+# import local classes
+from ptn.missionalertbot.classes.MissionParams import MissionParams
+
+# import local constants
+import ptn.missionalertbot.constants as constants
+
+# import local modules
+from ptn.missionalertbot.database.database import mission_db_executor, find_carrier, CarrierDbFields
+
+
+class RedditCommentRouter:
+
+    def __init__(self, max_titles):
+        """
+        Class represents the map from our Reddit posts to their missions.
+
+        :param int max_titles: Most post titles to cache
+        """
+        self.max_titles = max_titles
+        self.posts = {} # reddit post ID: {'carrier': carrier long name, 'owner_id': owner's Discord ID}
+        self.titles = OrderedDict() # reddit post ID: post title, least recently used first
+        self.title_fetches = 0
+
+
+    async def load(self):
+        """
+        Rebuild the map from the missions database, e.g. when the comment stream (re)starts.
+        """
+        rows = await mission_db_executor.query("SELECT carrier, reddit_post_id FROM missions WHERE reddit_post_id IS NOT NULL")
+        self.posts = {row['reddit_post_id']: self._summary(row['carrier']) for row in rows}
+        print(f"Reddit comment router loaded {len(self.posts)} mission posts")
+
+
+    def mission_posted(self, mission_params: MissionParams):
+        """
+        Route comments on a mission's Reddit post to it, once it has one, and stop routing those on any post it replaced.
+
+        :param MissionParams mission_params: The mission
+        """
+        if not mission_params.reddit_post_id:
+            return
+        carrier_name = mission_params.carrier_data.carrier_long_name
+        # a repost replaces the mission's old post, whose comments now go unrouted like any finished mission's
+        for post_id in [post_id for post_id, summary in self.posts.items() if summary['carrier'] == carrier_name]:
+            del self.posts[post_id]
+        self.posts[mission_params.reddit_post_id] = self._summary(carrier_name)
+        if mission_params.reddit_title:
+            self._cache_title(mission_params.reddit_post_id, mission_params.reddit_title)
+
+
+    def mission_removed(self, reddit_post_id):
+        """
+        Stop routing comments on a post to its mission, once the mission's over. Its title stays cached.
+
+        :param str reddit_post_id: The mission's Reddit post ID, may be None
+        """
+        if reddit_post_id:
+            self.posts.pop(reddit_post_id, None)
+
+
+    async def route(self, comment, reddit):
+        """
+        Find the mission and post title for a comment.
+
+        :param asyncpraw.models.Comment comment: A comment from the subreddit stream
+        :param asyncpraw.Reddit reddit: Our Reddit client, only used if the title isn't known
+        :returns: The mission's summary dict, or None if the mission's over; and the post's title
+        :rtype: tuple
+        """
+        post_id = str(comment.submission)
+        summary = self.posts.get(post_id)
+
+        # comments from the stream usually carry their post's title
+        title = getattr(comment, 'link_title', None) or self.titles.get(post_id)
+        if title:
+            self._cache_title(post_id, title)
+        else:
+            self.title_fetches += 1
+            submission = await reddit.submission(post_id)
+            title = submission.title
+            self._cache_title(post_id, title)
+
+        return summary, title
+
+
+    def _summary(self, carrier_name):
+        # the carrier registry is in memory, so this doesn't touch the database
+        carrier_data = find_carrier(carrier_name, CarrierDbFields.longname.name)
+        return {'carrier': carrier_name, 'owner_id': carrier_data.ownerid}
+
+
+    def _cache_title(self, post_id, title):
+        self.titles[post_id] = title
+        self.titles.move_to_end(post_id)
+        while len(self.titles) > self.max_titles:
+            self.titles.popitem(last=False)
+
+
+comment_router = RedditCommentRouter(constants.REDDIT_TITLE_CACHE_SIZE)
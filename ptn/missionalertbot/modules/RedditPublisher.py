@@ -0,0 +1,84 @@
+"""
+RedditPublisher.py
+
+Posts mission images to Reddit and hands back the new submission.
+
+Image posts are submitted with asyncpraw's websocket, which tells us the new post's URL as soon as Reddit has
+processed it. If the websocket fails or times out after the post was made, we look for it among the bot account's own
+newest posts rather than polling the whole subreddit.
+
+Depends on: constants, ImageHandling
+"""
+
+# import libraries
+import asyncio
+import time
+from asyncpraw.exceptions import WebSocketException
+
+# import local constants
+import ptn.missionalertbot.constants as constants
+from ptn.missionalertbot.constants import get_reddit
+
+# import local modules
+from ptn.missionalertbot.modules.ImageHandling import temp_image_path
+
+
+async def find_own_submission(subreddit_name, title, submitted_after):
+    """
+    Find a post among the bot account's newest posts.
+
+    :param str subreddit_name: The subreddit it was posted to
+    :param str title: The post title
+    :param float submitted_after: Unix time before which the post can't have been made
+    :returns: The newest matching post, or None if it hasn't appeared in time
+    :rtype: asyncpraw.models.Submission
+    """
+    reddit = await get_reddit()
+    me = await reddit.user.me() # cached by asyncpraw after the first call
+
+    for attempt in range(constants.REDDIT_OWN_POST_LOOKUP_ATTEMPTS):
+        print(f"⏳ Looking for our Reddit post in our own submissions ({attempt + 1}/{constants.REDDIT_OWN_POST_LOOKUP_ATTEMPTS})...")
+        async for submission in me.submissions.new(limit=constants.REDDIT_OWN_POST_LOOKUP_LIMIT):
+            if (submission.title == title and submission.created_utc >= submitted_after
+                and submission.subreddit.display_name.lower() == subreddit_name.lower()):
+                print(f"✅ Found our submission {submission.id}")
+                return submission
+        await asyncio.sleep(constants.REDDIT_OWN_POST_LOOKUP_INTERVAL)
+
+    return None
+
+
+async def submit_mission_image(subreddit_name, title, image_bytes, flair_id):
+    """
+    Post a mission image to Reddit.
+
+    :param str subreddit_name: The subreddit to post to
+    :param str title: The post title
+    :param bytes image_bytes: The mission image as PNG bytes
+    :param str flair_id: The flair to give the post
+    :returns: The new post
+    :rtype: asyncpraw.models.Submission
+    :raises WebSocketException or asyncio.TimeoutError: if the websocket failed or timed out and the post couldn't be found afterwards
+    """
+    reddit = await get_reddit()
+    subreddit = await reddit.subreddit(subreddit_name)
+
+    # a minute's grace in case our clock and Reddit's disagree
+    submitted_after = time.time() - 60
+
+    try:
+        print("⏳ Attempting Reddit post...")
+        with temp_image_path(image_bytes) as image_path:
+            # asyncpraw's own timeout only covers closing the websocket, not waiting on it
+            submission = await asyncio.wait_for(subreddit.submit_image(title, image_path=image_path, flair_id=flair_id),
+                                                constants.REDDIT_WEBSOCKET_TIMEOUT)
+        print(f"✅ Reddit post {submission.id} submitted")
+        return submission
+
+    except (WebSocketException, asyncio.TimeoutError) as e:
+        # the post may still have been made, we just weren't told where it is
+        print(f"Reddit websocket failed ({str(e) or 'timed out'}), looking for the post we made")
+        submission = await find_own_submission(subreddit_name, title, submitted_after)
+        if not submission:
+            raise
+        return submission
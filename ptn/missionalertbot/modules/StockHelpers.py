@@ -1,14 +1,14 @@
 """
 A module for helper functions specifically for the Stock Tracker function.
 
-Depends on: constants, ErrorHandler
+Depends on: constants, ErrorHandler, HttpClient
 
 """
 
 # import libraries
+import asyncio
 import json
 from bs4 import BeautifulSoup
-import requests
 import traceback
 
 # import discord.py
@@ -17,6 +17,7 @@ from discord import Forbidden
 
 # import local classes
 from ptn.missionalertbot.classes.CarrierData import CarrierData
+from ptn.missionalertbot.classes.MarketDataCache import MarketDataCache
 from ptn.missionalertbot.classes.WMMData import WMMData
 
 # import local constants
@@ -25,13 +26,18 @@ from ptn.missionalertbot.constants import bot, API_TOKEN, API_HOST, channel_cco_
 
 # import local modules
 from ptn.missionalertbot.modules.ErrorHandler import CommandChannelError, CommandRoleError, CustomError, GenericError, on_generic_error
+from ptn.missionalertbot.modules.HttpClient import http_get
 
 
-def inara_find_fc_system(fcid):
+# shared market data cache, so repeat /stock calls and WMM ticks don't refetch the same carrier
+market_cache = MarketDataCache(constants.MARKET_CACHE_TTL, constants.MARKET_CACHE_MAX_ENTRIES)
+
+
+async def inara_find_fc_system(fcid):
     #print("Searching inara for carrier %s" % ( fcid ))
     URL = "https://inara.cz/elite/station-market/?search=%s" % (fcid)
     try:
-        page = requests.get(URL, headers={'User-Agent': 'PTNStockBot'})
+        page = await http_get(URL)
         soup = BeautifulSoup(page.content, "html.parser")
         header = soup.find_all("div", class_="headercontent")
         header_info = header[0].find("h2")
@@ -50,12 +56,12 @@ def inara_find_fc_system(fcid):
         return False
 
 
-def inara_fc_market_data(fcid):
+async def inara_fc_market_data(fcid):
     print("Searching inara market data for station: %s " % ( fcid ))
     try:
         url = "https://inara.cz/elite/station-market/?search=%s" % (fcid)
         print(url)
-        page = requests.get(url, headers={'User-Agent': 'PTNStockBot'})
+        page = await http_get(url)
         soup = BeautifulSoup(page.content, "html.parser")
         mainblock = soup.find_all('div', class_='mainblock')
 
@@ -104,9 +110,9 @@ def inara_fc_market_data(fcid):
         return False
 
 
-def capi_fc_market_data(fcid):
+async def capi_fc_market_data(fcid):
     # get stocks from capi and format as inara data.
-    capi_response = capi(fcid)
+    capi_response = await cached_capi(fcid)
     if capi_response.status_code != 200:
         print(f"Error from CAPI for {fcid}: {capi_response.status_code}")
         return False
@@ -126,36 +132,101 @@ def capi_fc_market_data(fcid):
     return stn_data
 
 
-def get_fc_stock(fccode, source='inara'):
+async def get_fc_stock(fccode, source='inara'):
     if source == 'inara':
         print("⏳ Attempting to fetch inara stock data for %s", ( fccode ))
-        stn_data = inara_fc_market_data(fccode)
+        stn_data = await market_cache.get(fccode, 'inara', lambda: inara_fc_market_data(fccode))
         if not stn_data:
             return False
     elif source == 'capi':
         print("⏳ Attempting to fetch capi stock data for %s", ( fccode ))
-        stn_data = capi_fc_market_data(fccode)
+        stn_data = await capi_fc_market_data(fccode)
         if not stn_data:
             return False
     return stn_data
 
 
-def oauth_new(carrierid, force=False):
+async def oauth_new(carrierid, force=False):
     pmeters = {'token': API_TOKEN}
     if force:
         pmeters['force'] = "true"
-    r = requests.get(f"{API_HOST}/generate/{carrierid}",params=pmeters)
+    r = await http_get(f"{API_HOST}/generate/{carrierid}",params=pmeters)
     return r
 
 
-def capi(carrierid, dev=False):
+async def capi(carrierid, dev=False):
     pmeters = {'token': API_TOKEN}
     if dev:
         pmeters['dev'] = "true"
-    r = requests.get(f"{API_HOST}/capi/{carrierid}",params=pmeters)
+    r = await http_get(f"{API_HOST}/capi/{carrierid}",params=pmeters)
     return r
 
 
+async def cached_capi(carrierid):
+    # cAPI market request via the market cache. only successful responses are cached so errors are always rechecked
+    return await market_cache.get(carrierid, 'capi', lambda: capi(carrierid), cacheable=lambda r: r.status_code == 200)
+
+
+async def _fetch_wmm_carrier_stock(index, carrier: WMMData, worker_pool, source_limits):
+    """
+    Fetch market data for a single WMM carrier.
+
+    If cAPI auth has failed (400/401) we also fetch from Inara here, so the caller can fall back without another round trip.
+
+    :returns: tuple of (index, carrier, capi_status, capi_data, inara_data)
+    """
+    capi_status, capi_data, inara_data = None, None, None
+    async with worker_pool:
+        try:
+            if carrier.capi:
+                async with source_limits['capi']:
+                    print(f"Calling CAPI for {carrier.carrier_name}")
+                    capi_response = await cached_capi(carrier.carrier_identifier)
+                capi_status = capi_response.status_code
+                try:
+                    capi_data = capi_response.json()
+                except ValueError:
+                    capi_data = capi_response.text
+
+            if not carrier.capi or capi_status in [400, 401]:
+                async with source_limits['inara']:
+                    inara_data = await get_fc_stock(carrier.carrier_identifier, 'inara')
+
+        except Exception as e:
+            print(f"Error fetching stock for {carrier.carrier_name} ({carrier.carrier_identifier}): {e}")
+
+    return index, carrier, capi_status, capi_data, inara_data
+
+
+async def fetch_wmm_stock(wmm_carriers):
+    """
+    Fetch market data for all WMM carriers concurrently, bounded by constants.wmm_fetch_workers overall
+    and by per-source caps for cAPI and Inara.
+
+    Use with contextlib.aclosing() so any outstanding fetches are cancelled if the caller stops early.
+
+    :returns: (index, carrier, capi_status, capi_data, inara_data) tuples, yielded as each fetch completes
+    :rtype: async iterator
+    """
+    worker_pool = asyncio.Semaphore(constants.wmm_fetch_workers)
+    source_limits = {
+        'capi': asyncio.Semaphore(constants.wmm_capi_concurrency),
+        'inara': asyncio.Semaphore(constants.wmm_inara_concurrency)
+    }
+
+    tasks = [
+        asyncio.create_task(_fetch_wmm_carrier_stock(index, carrier, worker_pool, source_limits))
+        for index, carrier in enumerate(wmm_carriers)
+    ]
+
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            yield await next_result
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
 # function taken from FCMS
 def from_hex(mystr):
     try:
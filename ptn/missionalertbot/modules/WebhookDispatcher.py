@@ -0,0 +1,191 @@
+"""
+WebhookDispatcher.py
+
+Delivers mission alerts to CCOs' webhooks.
+
+All of a mission's webhooks are handled at once over our shared HTTP session, and their results are gathered
+into a single WebhookDispatch so callers can report back with one embed instead of one per webhook.
+
+discord.py already waits out 429s for each rate limit bucket. On top of that we only send one request at a time
+to any one webhook, retry a webhook that is still rate limited after discord.py gives up, and cap how many
+webhooks a single dispatch talks to at once.
+
+Depends on: constants, HttpClient
+"""
+
+# import libraries
+import asyncio
+
+# import discord.py
+import discord
+from discord import Webhook
+from discord.errors import HTTPException
+
+# import local constants
+import ptn.missionalertbot.constants as constants
+from ptn.missionalertbot.constants import bot
+
+# import local modules
+from ptn.missionalertbot.modules.HttpClient import get_http_session
+
+
+# one lock per webhook URL, so two missions never hit the same webhook's rate limit bucket at the same time
+_webhook_locks = {}
+
+
+class WebhookTarget:
+
+    def __init__(self, webhook_name, webhook_url, message_id=None, jump_url=None):
+        """
+        Class represents a webhook we're sending to, and the message we sent it previously if any.
+
+        :param str webhook_name: The CCO's name for the webhook
+        :param str webhook_url: The webhook URL
+        :param int message_id: The ID of the mission message previously sent to this webhook
+        :param str jump_url: The jump URL of that message
+        """
+        self.webhook_name = webhook_name
+        self.webhook_url = webhook_url
+        self.message_id = message_id
+        self.jump_url = jump_url
+
+
+    def __str__(self):
+        """
+        Overloads str to return a readable object
+
+        :rtype: str
+        """
+        return 'WebhookTarget: Name:{0.webhook_name} URL:{0.webhook_url} MessageID:{0.message_id}'.format(self)
+
+
+class WebhookResult:
+
+    def __init__(self, target: WebhookTarget, message=None, error=None):
+        """
+        Class represents the outcome of dispatching to a single webhook.
+
+        :param WebhookTarget target: The webhook
+        :param discord.WebhookMessage message: The message returned by the action, if any
+        :param Exception error: The error that stopped the action, if any
+        """
+        self.target = target
+        self.message = message
+        self.error = error
+
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+class WebhookDispatch:
+
+    def __init__(self, results):
+        """
+        Class represents the aggregated outcome of dispatching to a set of webhooks.
+
+        :param list[WebhookResult] results: One result per target, in the order the targets were given
+        """
+        self.results = results
+
+
+    @property
+    def sent(self):
+        return [result for result in self.results if result.ok]
+
+
+    @property
+    def failed(self):
+        return [result for result in self.results if not result.ok]
+
+
+    def summary_embed(self, title):
+        """
+        A single embed listing every webhook and what happened to it.
+
+        :param str title: The embed title
+        :rtype: discord.Embed
+        """
+        lines = []
+        for result in self.results:
+            if result.ok:
+                jump_url = result.message.jump_url if result.message else result.target.jump_url
+                lines.append(f"✅ **{result.target.webhook_name}**: {jump_url}" if jump_url else f"✅ **{result.target.webhook_name}**")
+            else:
+                lines.append(f"❌ **{result.target.webhook_name}**: {result.error}")
+
+        embed = discord.Embed(
+            title=title,
+            description='\n'.join(lines)[:4096],
+            color=constants.EMBED_COLOUR_ERROR if self.failed else constants.EMBED_COLOUR_DISCORD
+        )
+        embed.set_thumbnail(url=constants.ICON_WEBHOOK_PTN)
+        if self.failed:
+            embed.set_footer(text=f"{len(self.sent)} of {len(self.results)} webhooks succeeded.")
+        return embed
+
+
+    def __bool__(self):
+        return bool(self.results)
+
+
+def mission_webhook_targets(mission_params):
+    """
+    The webhooks a mission was already sent to, with the messages we sent them.
+
+    :param MissionParams mission_params: The mission
+    :rtype: list[WebhookTarget]
+    """
+    if not (mission_params.webhook_urls and mission_params.webhook_msg_ids and mission_params.webhook_jump_urls):
+        return []
+    # missions from before webhook names were stored fall back to their URL
+    names = mission_params.webhook_names or mission_params.webhook_urls
+    return [WebhookTarget(name, url, message_id, jump_url) for name, url, message_id, jump_url in
+            zip(names, mission_params.webhook_urls, mission_params.webhook_msg_ids, mission_params.webhook_jump_urls)]
+
+
+async def _run_action(webhook: Webhook, target: WebhookTarget, action):
+    # discord.py has already retried 429s by the time it raises one, so only try again after the time it gives us
+    for attempt in range(constants.WEBHOOK_RATE_LIMIT_RETRIES + 1):
+        try:
+            return await action(webhook, target)
+        except HTTPException as e:
+            if e.status != 429 or attempt == constants.WEBHOOK_RATE_LIMIT_RETRIES:
+                raise
+            retry_after = float(e.response.headers.get('Retry-After', 1))
+            print(f"Webhook {target.webhook_name} rate limited, retrying in {retry_after}s ({attempt + 1}/{constants.WEBHOOK_RATE_LIMIT_RETRIES})")
+            await asyncio.sleep(retry_after)
+
+
+async def dispatch_webhooks(targets, action):
+    """
+    Run an action against every webhook at once.
+
+    The action is given a discord.Webhook on our shared session and its WebhookTarget, and may return a message.
+    It runs once per webhook, so anything it sends that can only be read once, like a discord.File, must be
+    created inside it.
+
+    :param list[WebhookTarget] targets: The webhooks to dispatch to
+    :param action: An async callable taking (webhook, target)
+    :returns: The result for every webhook; errors are caught and recorded, never raised
+    :rtype: WebhookDispatch
+    """
+    session = await get_http_session()
+    limit = asyncio.Semaphore(constants.WEBHOOK_CONCURRENCY)
+
+    async def _dispatch_one(target: WebhookTarget):
+        lock = _webhook_locks.setdefault(target.webhook_url, asyncio.Lock())
+        async with limit, lock:
+            try:
+                print(f"Dispatching to webhook {target.webhook_name}")
+                webhook = Webhook.from_url(target.webhook_url, session=session, client=bot)
+                message = await _run_action(webhook, target, action)
+                return WebhookResult(target, message=message)
+            except Exception as e:
+                print(f"❌ Webhook {target.webhook_name} ({target.webhook_url}) failed: {e}")
+                return WebhookResult(target, error=e)
+
+    dispatch = WebhookDispatch(await asyncio.gather(*[_dispatch_one(target) for target in targets]))
+    print(f"Webhook dispatch finished: {len(dispatch.sent)} sent, {len(dispatch.failed)} failed")
+    return dispatch
@@ -21,6 +21,7 @@ from discord.ext import commands
 
 # import local classes
 from ptn.missionalertbot.classes.ChannelDefs import ChannelDefs
+from ptn.missionalertbot.classes.ChannelLockManager import ChannelLockManager
 from ptn.missionalertbot.classes.CommunityCarrierData import CommunityCarrierData
 
 # import local constants
@@ -31,7 +32,7 @@ from ptn.missionalertbot.constants import bot, cc_role, get_overwrite_perms, get
     reddit_flair_mission_start, reddit_flair_mission_stop
 
 # import local modules
-from ptn.missionalertbot.database.database import find_community_carrier, CCDbFields, carrier_db, carrier_db_lock, carriers_conn, delete_community_carrier_from_db, \
+from ptn.missionalertbot.database.database import find_community_carrier, CCDbFields, carrier_db_executor, delete_community_carrier_from_db, \
     find_carrier, CarrierDbFields
 from ptn.missionalertbot.modules.ErrorHandler import CommandChannelError, CommandRoleError, CustomError, on_generic_error
 
@@ -135,40 +136,75 @@ def check_text_command_channel(permitted_channel):
             return True
     return commands.check(check_text_channel)
 
-channel_locks = {} # define dictionary for channel lock/unlock names
+def _report_expired_lock(lock):
+    # tell bot-spam when a lock had to be taken back from its holder
+    # read the lock now, as it's released (and maybe handed on) before the report is sent
+    channel, owner, acquired_at = lock.channel, lock.owner, lock.acquired_at
+    lease = lock.lease_expires_at - lock.acquired_at
+
+    async def report():
+        try:
+            spamchannel = bot.get_channel(bot_spam_channel())
+            embed = discord.Embed(
+                description=f"⚠ Lock for `{channel}` held by {owner} since <t:{int(acquired_at)}:T> ran out "
+                            f"after {lease:.0f} seconds and was released automatically.",
+                color=constants.EMBED_COLOUR_WARNING
+            )
+            await spamchannel.send(embed=embed)
+        except Exception as e:
+            print(f"Couldn't report expired lock for {channel}: {e}")
+    asyncio.create_task(report())
 
-async def lock_mission_channel(channel):
-    print(f"Attempting channel lock for {channel}...")
-    # Create a lock if it doesn't exist for the given fruit
-    if channel not in channel_locks:
-        channel_locks[channel] = asyncio.Lock()
 
-    lock = channel_locks[channel]
-    await lock.acquire()
-    print(f"Channel lock acquired for {channel}.")
+channel_locks = ChannelLockManager(constants.CHANNEL_LOCK_LEASE, constants.CHANNEL_LOCK_WAIT_BUCKETS, on_expire=_report_expired_lock)
 
 
-async def unlock_mission_channel(channel):
+async def lock_mission_channel(channel, owner, purpose, timeout=None, lease=...):
+    """
+    Wait our turn for the lock on a mission channel name, so it can't be created and deleted at the same time.
+
+    :param str channel: The channel name
+    :param str owner: Description of who's taking the lock, must be passed again to release it
+    :param str purpose: What the lock is for e.g. 'generation', 'removal', 'admin'
+    :param float timeout: Seconds to wait before raising asyncio.TimeoutError, None to wait forever
+    :param float lease: Seconds the lock may be held before it's released automatically, None for no lease
+    """
+    print(f"Attempting channel lock for {channel} by {owner}...")
+    await channel_locks.acquire(channel, owner, purpose, timeout, lease)
+
+
+async def unlock_mission_channel(channel, owner=None):
+    """
+    Release the lock on a mission channel name.
+
+    :param str channel: The channel name
+    :param str owner: Only release the lock if this is who holds it; None releases it whoever holds it
+    :returns: True if the lock was released
+    :rtype: bool
+    """
     print(f"Attempting to release channel lock for {channel}...")
-    if channel in channel_locks:
-        lock = channel_locks[channel]
-        lock.release()
-        del channel_locks[channel]
-    print(f"Channel lock released for {channel}.")
+    return channel_locks.release(channel, owner)
 
 
-def check_mission_channel_lock(channel):
+def check_mission_channel_lock(channel, owner=None):
+    """
+    :param str channel: The channel name
+    :param str owner: Only count the lock if this is who holds it
+    :returns: Whether the channel is locked
+    :rtype: bool
+    """
     print(f"Checking status of channel lock for {channel}...")
-    if channel in channel_locks:
-        print(f"{channel} is locked.")
-        return True
-    else:
-        print(f"{channel} is not locked.")
-        return False
+    locked = channel_locks.is_locked(channel) and (owner is None or channel_locks.holder(channel) == owner)
+    print(f"{channel} is locked." if locked else f"{channel} is not locked.")
+    return locked
 
 
 def list_active_locks():
-    return channel_locks
+    """
+    :returns: The ChannelLock of every channel that's locked or queued for
+    :rtype: list
+    """
+    return list(channel_locks.locks.values())
 
 
 # function to stop and quit
@@ -220,7 +256,7 @@ Include some database-related functions which have too many dependencies to go i
 
 # helper function to validate CC owner, returns False if owner already in db or True if check passes
 async def _cc_owner_check(interaction, owner):
-    community_carrier_data = find_community_carrier(owner.id, CCDbFields.ownerid.name)
+    community_carrier_data = await find_community_carrier(owner.id, CCDbFields.ownerid.name)
     if community_carrier_data:
         # TODO: this should be fetchone() not fetchall but I can't make it work otherwise
         for community_carrier in community_carrier_data:
@@ -309,20 +345,12 @@ async def _cc_assign_permissions(interaction, owner, new_channel):
 
 async def _cc_db_enter(interaction, owner, new_channel, new_role):
     # now we enter everything into the community carriers table
-    print("Locking carrier db...")
-    await carrier_db_lock.acquire()
-    print("Carrier DB locked.")
     try:
-        carrier_db.execute(''' INSERT INTO community_carriers VALUES(?, ?, ?) ''',
-                           (owner.id, new_channel.id, new_role.id))
-        carriers_conn.commit()
+        await carrier_db_executor.execute(''' INSERT INTO community_carriers VALUES(?, ?, ?) ''',
+                                          (owner.id, new_channel.id, new_role.id))
         print("Added new community carrier to database")
     except:
         raise EnvironmentError("Error: failed to update community channels database.")
-    finally:
-        print("Unlocking carrier db...")
-        carrier_db_lock.release()
-        print("Carrier DB unlocked.")
 
     # tell the user what's going on
     embed = discord.Embed(description=f"<@{owner.id}> is now a <@&{cc_role()}> and owns <#{new_channel.id}> with notification role <@&{new_role.id}>."
@@ -340,9 +368,8 @@ Helpers for /remove_community_channel
 # function called by button responses to process channel deletion
 async def _remove_cc_manager(interaction: discord.Interaction, delete_channel, button_self):
     # get the carrier data again because I can't figure out how to penetrate callbacks with additional variables or vice versa
-    carrier_db.execute(f"SELECT * FROM community_carriers WHERE "
-                    f"channelid = {interaction.channel.id}")
-    community_carrier = CommunityCarrierData(carrier_db.fetchone())
+    community_carrier = CommunityCarrierData(await carrier_db_executor.query_one(
+        "SELECT * FROM community_carriers WHERE channelid = ?", (interaction.channel.id,)))
     # error if not
     if not community_carrier:
         embed = discord.Embed(description=f"❌ This somehow does not appear to be a community channel anymore(?).", color=constants.EMBED_COLOUR_ERROR, ephemeral=True)
@@ -638,9 +665,8 @@ CC authority checker
 # helper function shared by the various CC commands
 async def _community_channel_owner_check(interaction):
     # check if we're in a community channel
-    carrier_db.execute(f"SELECT * FROM community_carriers WHERE "
-                    f"channelid = {interaction.channel.id}")
-    community_carrier = CommunityCarrierData(carrier_db.fetchone())
+    community_carrier = CommunityCarrierData(await carrier_db_executor.query_one(
+        "SELECT * FROM community_carriers WHERE channelid = ?", (interaction.channel.id,)))
     # error if not
     if not community_carrier:
         error = "This does not appear to be a community channel."
@@ -38,7 +38,7 @@ setup(
     author='Charlie Tosh',
     url='',
     install_requires=[
-        # 'aiohttp==3.7.4.post0',
+        'aiohttp>=3.7.4',
         'async-timeout==3.0.1',
         # 'attrs==20.3.0',
         # 'chardet==4.0.0',
@@ -72,5 +72,5 @@ setup(
     project_urls={
         "Source": "https://github.com/PilotsTradeNetwork/MissionAlertBot",
     },
-    python_required='>=3.9',
+    python_requires='>=3.10',
 )